@@ -24,9 +24,11 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# import your metadata
+# import your metadata (app.models is lazy, so load every model module explicitly)
+from app.models import import_all
 from app.models.mixins import Base
 
+import_all()
 target_metadata = Base.metadata
 
 
@@ -0,0 +1,28 @@
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003_users_search_indexes"
+down_revision = "0002_add_password_hash"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_users_email_trgm",
+        "users",
+        ["email"],
+        postgresql_using="gin",
+        postgresql_ops={"email": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_users_full_name_trgm",
+        "users",
+        ["full_name"],
+        postgresql_using="gin",
+        postgresql_ops={"full_name": "gin_trgm_ops"},
+    )
+
+def downgrade() -> None:
+    op.drop_index("ix_users_full_name_trgm", table_name="users")
+    op.drop_index("ix_users_email_trgm", table_name="users")
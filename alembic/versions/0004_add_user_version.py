@@ -0,0 +1,18 @@
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004_add_user_version"
+down_revision = "0003_users_search_indexes"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.add_column(
+        "users",
+        sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("1")),
+    )
+
+def downgrade() -> None:
+    op.drop_column("users", "version")
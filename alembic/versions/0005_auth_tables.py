@@ -0,0 +1,90 @@
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005_auth_tables"
+down_revision = "0004_add_user_version"
+branch_labels = None
+depends_on = None
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("NOW()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("NOW()"),
+            nullable=False,
+        ),
+    ]
+
+def upgrade() -> None:
+    op.create_table(
+        "roles",
+        sa.Column("id", sa.String(length=36), primary_key=True),
+        sa.Column("name", sa.String(length=128), nullable=False, unique=True),
+        sa.Column("description", sa.String(length=255), nullable=False),
+        sa.Column("assign_to_new_users", sa.Boolean(), nullable=False),
+        sa.Column("is_default", sa.Boolean(), nullable=False),
+        sa.Column("order", sa.Integer(), nullable=False),
+        sa.Column("type", sa.String(length=64), nullable=False),
+        *_timestamps(),
+    )
+    op.create_table(
+        "permissions",
+        sa.Column("id", sa.String(length=36), primary_key=True),
+        sa.Column("name", sa.String(length=128), nullable=False, unique=True),
+        sa.Column("description", sa.String(length=255), nullable=False),
+        sa.Column("is_default", sa.Boolean(), nullable=False),
+        sa.Column("order", sa.Integer(), nullable=False),
+        sa.Column("type", sa.String(length=64), nullable=False),
+        *_timestamps(),
+    )
+    op.create_table(
+        "role_permissions",
+        sa.Column("id", sa.String(length=36), primary_key=True),
+        sa.Column(
+            "role_id", sa.String(length=36), sa.ForeignKey("roles.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column(
+            "permission_id",
+            sa.String(length=36),
+            sa.ForeignKey("permissions.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.UniqueConstraint("role_id", "permission_id", name="uq_role_permission"),
+    )
+    op.create_table(
+        "user_roles",
+        sa.Column("id", sa.String(length=36), primary_key=True),
+        sa.Column(
+            "user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column(
+            "role_id", sa.String(length=36), sa.ForeignKey("roles.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.UniqueConstraint("user_id", "role_id", name="uq_user_role"),
+    )
+    op.create_table(
+        "passwords",
+        sa.Column(
+            "user_id",
+            sa.Integer(),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("hash", sa.String(length=255), nullable=False),
+    )
+
+def downgrade() -> None:
+    op.drop_table("passwords")
+    op.drop_table("user_roles")
+    op.drop_table("role_permissions")
+    op.drop_table("permissions")
+    op.drop_table("roles")
@@ -0,0 +1,27 @@
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0006_audit_events"
+down_revision = "0005_auth_tables"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_events",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("action", sa.String(length=64), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("data", postgresql.JSONB(), nullable=True),
+    )
+    op.create_index(
+        "ix_audit_events_user_id_occurred_at", "audit_events", ["user_id", "occurred_at"]
+    )
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_events_user_id_occurred_at", table_name="audit_events")
+    op.drop_table("audit_events")
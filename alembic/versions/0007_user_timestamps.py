@@ -0,0 +1,25 @@
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007_user_timestamps"
+down_revision = "0006_audit_events"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # created_at comes from 0001; existing rows get the migration time as updated_at,
+    # which then drives ETag/Last-Modified
+    op.add_column(
+        "users",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("NOW()"),
+            nullable=False,
+        ),
+    )
+
+def downgrade() -> None:
+    op.drop_column("users", "updated_at")
@@ -1,30 +1,108 @@
+from datetime import datetime
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core.auth import create_access_token, verify_password
-from ..deps import get_db
+from ..core.auth import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token, hashing_pool
+from ..core.config import settings
+from ..core.hashing import PasswordHashingBusyError
+from ..core.ratelimit import parse_rate
+from ..deps import enforce_rate_limit, get_current_user, get_db, rate_limit
+from ..models.auth import Role, UserRole
 from ..models.user import User as UserModel
-from ..schemas.auth import LoginRequest, RegisterRequest, Token
+from ..schemas.auth import LoginRequest, RefreshRequest, RegisterRequest, Token
 from ..schemas.user import User
+from ..services.tokens import RefreshTokenService, invalid_refresh_token
 from ..services.user_service import UserService
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+LOGIN_RATE_PER_IP = parse_rate(settings.login_rate_limit_per_ip)
+LOGIN_RATE_PER_EMAIL = parse_rate(settings.login_rate_limit_per_email)
+REGISTER_RATE_PER_IP = parse_rate(settings.register_rate_limit_per_ip)
 
-@router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
+
+@router.post(
+    "/register",
+    response_model=User,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("register", REGISTER_RATE_PER_IP))],
+)
 async def register(payload: RegisterRequest, db: Annotated[AsyncSession, Depends(get_db)]) -> User:
     service = UserService(db)
     return await service.create(payload)
 
 
-@router.post("/login", response_model=Token)
+@router.post(
+    "/login",
+    response_model=Token,
+    dependencies=[Depends(rate_limit("login", LOGIN_RATE_PER_IP))],
+)
 async def login(payload: LoginRequest, db: Annotated[AsyncSession, Depends(get_db)]) -> Token:
+    # Per-account limit stops distributed guessing against one email; both run before the DB
+    await enforce_rate_limit(f"login:email:{payload.email.lower()}", LOGIN_RATE_PER_EMAIL)
     res = await db.execute(select(UserModel).where(UserModel.email == payload.email))
     user = res.scalar_one_or_none()
-    if not user or not verify_password(payload.password, user.password_hash):
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    try:
+        valid, new_hash = await hashing_pool.verify(payload.password, user.password_hash)
+    except PasswordHashingBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        ) from None
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    token = create_access_token({"sub": user.id, "email": user.email})
-    return {"access_token": token, "token_type": "bearer"}
+    if new_hash:
+        # Transparently upgrade legacy or outdated hashes. The user resource is unchanged,
+        # so keep updated_at (Last-Modified) and version (ETag, caches) as they are
+        await db.execute(
+            update(UserModel)
+            .where(UserModel.id == user.id)
+            .values(password_hash=new_hash, updated_at=UserModel.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    refresh_token = await RefreshTokenService(db).issue(user.id)
+    return await _token_response(db, user, refresh_token)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(payload: RefreshRequest, db: Annotated[AsyncSession, Depends(get_db)]) -> Token:
+    """Swap a refresh token for a new access token and refresh token (each works once)"""
+    user_id, refresh_token = await RefreshTokenService(db).rotate(payload.refresh_token)
+    user = await db.get(UserModel, user_id)
+    if user is None:
+        raise invalid_refresh_token
+    return await _token_response(db, user, refresh_token)
+
+
+async def _token_response(db: AsyncSession, user: UserModel, refresh_token: str) -> Token:
+    # Embed role names so permission checks need no DB lookup while the token is valid
+    roles = await db.scalars(
+        select(Role.name)
+        .join(UserRole, UserRole.role_id == Role.id)
+        .where(UserRole.user_id == user.id)
+    )
+    claims: dict[str, str | int | datetime | list[str]] = {
+        "sub": str(user.id),
+        "email": user.email,
+        "ver": user.version,
+        "roles": sorted(roles),
+    }
+    if user.full_name:
+        claims["name"] = user.full_name
+    return Token(
+        access_token=create_access_token(claims),
+        expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        refresh_token=refresh_token,
+    )
+
+
+@router.get("/me", response_model=User)
+async def me(current_user: Annotated[User, Depends(get_current_user)]) -> User:
+    return current_user
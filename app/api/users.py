@@ -1,15 +1,42 @@
-from typing import Annotated
+from collections.abc import AsyncIterator, Awaitable
+from datetime import datetime
+from typing import Annotated, Any, TypeVar
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..deps import get_db
+from ..core.config import settings
+from ..core.http_cache import http_date, if_match_version, is_not_modified, make_etag
+from ..core.responses import ORJSON_OPTIONS, FastJSONResponse
+from ..deps import get_db, get_read_db, get_user_loader
 from ..schemas.auth import RegisterRequest
-from ..schemas.user import UpdateUserDto, User
-from ..services.user_service import UserService
+from ..schemas.user import BulkImportResponse, UpdateUserDto, User, UserPage
+from ..services.bulk_import import SUPPORTED_CONTENT_TYPES, parse_upload
+from ..services.user_loader import UserLoader
+from ..services.user_service import UserService, VersionConflictError
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+T = TypeVar("T")
+
+# Clients may keep a single user but must revalidate (cheap: usually a 304);
+# collections change with every write anywhere, so they are never stored
+USER_CACHE_CONTROL = "private, no-cache"
+COLLECTION_CACHE_CONTROL = "no-store"
+NO_STORE = {"Cache-Control": COLLECTION_CACHE_CONTROL}
+
+
+async def _ndjson_lines(users: AsyncIterator[User]) -> AsyncIterator[str]:
+    async for user in users:
+        yield user.model_dump_json() + "\n"
+
+
+async def _ndjson_rows(rows: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    async for row in rows:
+        yield orjson.dumps(row, option=ORJSON_OPTIONS) + b"\n"
+
 
 @router.post("", response_model=User, status_code=status.HTTP_201_CREATED)
 async def create_user_endpoint(
@@ -21,87 +48,236 @@ async def create_user_endpoint(
     return await service.create(payload)
 
 
-@router.get("", response_model=list[User])
-async def list_users_endpoint(
+@router.post(
+    "/bulk",
+    response_model=BulkImportResponse,
+    openapi_extra={
+        "requestBody": {
+            "content": {media_type: {} for media_type in SUPPORTED_CONTENT_TYPES},
+            "required": True,
+        }
+    },
+)
+async def bulk_create_users_endpoint(
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> list[User]:
-    """Get all users"""
+    chunk_size: int = Query(1000, ge=1, le=10_000, description="Rows validated per batch"),
+) -> BulkImportResponse:
+    """Import users from a JSON array, NDJSON or CSV upload (streamed for NDJSON/CSV)"""
+    content_type = request.headers.get("content-type", "application/json")
+    if content_type.split(";")[0].strip().lower() not in SUPPORTED_CONTENT_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Use one of: {', '.join(SUPPORTED_CONTENT_TYPES)}",
+        )
     service = UserService(db)
-    users: list[User] = await service.find_all()
-    return users
+    try:
+        return await service.bulk_create(
+            parse_upload(content_type, request.stream()), chunk_size=chunk_size
+        )
+    except ValueError as e:
+        # Only raised before anything is written (JSON body, CSV header); malformed
+        # records later in a stream come back as invalid rows instead
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
 
 
-@router.get("/{user_id}", response_model=User)
-async def get_user_endpoint(
-    user_id: int,
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
-    """Get user by ID"""
+@router.get("/export", responses={200: {"content": {"text/csv": {}}}})
+async def export_users_endpoint(
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+) -> StreamingResponse:
+    """Stream all users as CSV"""
+    service = UserService(db)
+    return StreamingResponse(
+        service.export_csv(),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": 'attachment; filename="users.csv"',
+            **NO_STORE,
+        },
+    )
+
+
+@router.get(
+    "",
+    response_model=UserPage,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def list_users_endpoint(
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of users per page"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    stream: bool = Query(False, description="Stream every user as NDJSON instead of paging"),
+) -> UserPage | StreamingResponse | FastJSONResponse:
+    """Get users one page at a time, or stream all of them as NDJSON"""
+    service = UserService(db)
+    if stream:
+        lines = (
+            _ndjson_rows(service.stream_all_rows())
+            if settings.fast_json_responses
+            else _ndjson_lines(service.stream_all())
+        )
+        return StreamingResponse(lines, media_type="application/x-ndjson", headers=NO_STORE)
+    if settings.fast_json_responses:
+        return FastJSONResponse(await service.find_page_rows(limit, cursor), headers=NO_STORE)
+    response.headers.update(NO_STORE)
+    return await service.find_page(limit, cursor)
+
+
+@router.get("/search", response_model=list[User])
+async def search_users_endpoint(
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_read_db)],
+    q: str = Query(..., min_length=1, max_length=255, description="Search query"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of results"),
+    prefix: bool = Query(False, description="Match only from the start (autocomplete)"),
+) -> list[User] | FastJSONResponse:
+    """Search users by name or email"""
     service = UserService(db)
-    user = await service.find_by_id(user_id)
+    if settings.fast_json_responses:
+        return FastJSONResponse(
+            await service.search_rows(q, limit=limit, prefix=prefix), headers=NO_STORE
+        )
+    response.headers.update(NO_STORE)
+    users: list[User] = await service.search(q, limit=limit, prefix=prefix)
+    return users
+
+
+def _validator_headers(user_id: int, version: int, updated_at: datetime | None) -> dict[str, str]:
+    headers = {"ETag": make_etag(f"user-{user_id}", version), "Cache-Control": USER_CACHE_CONTROL}
+    if updated_at is not None:
+        headers["Last-Modified"] = http_date(updated_at)
+    return headers
+
+
+async def _conditional_get(
+    request: Request, response: Response, loader: UserLoader, key: int | str
+) -> User | Response:
+    """The user with this id (int) or email (str), or 304 when the client's copy is current.
+
+    Conditional requests first check the validators alone (from the user cache
+    or a query reading three columns), so a 304 never loads the full row.
+    """
+    if "if-none-match" in request.headers or "if-modified-since" in request.headers:
+        current = await (
+            loader.service.find_validators(user_id=key)
+            if isinstance(key, int)
+            else loader.service.find_validators(email=key)
+        )
+        if current is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        headers = _validator_headers(current.id, current.version, current.updated_at)
+        if is_not_modified(request.headers, headers["ETag"], current.updated_at):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    user = await (loader.load(key) if isinstance(key, int) else loader.load_by_email(key))
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    response.headers.update(_validator_headers(user.id, user.version, user.updated_at))
     return user
 
 
+def _expected_version(request: Request, user_id: int, body_version: int | None) -> int | None:
+    """Version a write must find: from If-Match, else from the request body / query"""
+    version: int | None = if_match_version(request.headers, f"user-{user_id}")
+    if version is None:
+        return body_version
+    if body_version is not None and body_version != version:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match and version disagree",
+        )
+    return version
+
+
+async def _precondition(request: Request, write: Awaitable[T]) -> T:
+    """Report a lost optimistic-concurrency race as 412 when the client sent If-Match"""
+    try:
+        return await write
+    except VersionConflictError as e:
+        if "if-match" in request.headers:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED, detail=e.detail
+            ) from None
+        raise
+
+
+@router.get("/{user_id}", response_model=User)
+async def get_user_endpoint(
+    user_id: int,
+    request: Request,
+    response: Response,
+    loader: Annotated[UserLoader, Depends(get_user_loader)],
+) -> User | Response:
+    """Get user by ID (conditional: If-None-Match / If-Modified-Since)"""
+    return await _conditional_get(request, response, loader, user_id)
+
+
 @router.get("/{user_id}/details", response_model=User)
 async def get_user_details_endpoint(
     user_id: int,
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
+    request: Request,
+    response: Response,
+    loader: Annotated[UserLoader, Depends(get_user_loader)],
+) -> User | Response:
     """Get user with details"""
-    service = UserService(db)
-    user = await service.find_by_id(user_id)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return user
+    return await _conditional_get(request, response, loader, user_id)
 
 
 @router.get("/email/{email}", response_model=User)
 async def get_user_by_email_endpoint(
     email: str,
-    db: Annotated[AsyncSession, Depends(get_db)],
-) -> User:
+    request: Request,
+    response: Response,
+    loader: Annotated[UserLoader, Depends(get_user_loader)],
+) -> User | Response:
     """Get user by email"""
-    service = UserService(db)
-    user = await service.find_by_email(email)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    return user
+    return await _conditional_get(request, response, loader, email)
 
 
-@router.get("/search", response_model=list[User])
-async def search_users_endpoint(
+@router.put("/{user_id}", response_model=User)
+async def update_user_endpoint(
+    user_id: int,
+    payload: UpdateUserDto,
+    request: Request,
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
-    q: str = Query(..., description="Search query"),
-    limit: int = Query(10, description="Maximum number of results"),
-) -> list[User]:
-    """Search users by name or email"""
-    # For now, return all users since search functionality is not implemented in the simple service
+) -> User:
+    """Update user (If-Match: ETag from a GET rejects the write with 412 if it changed)"""
     service = UserService(db)
-    users: list[User] = await service.find_all()
-    return users
+    payload.version = _expected_version(request, user_id, payload.version)
+    user = await _precondition(request, service.update(user_id, payload))
+    response.headers.update(_validator_headers(user.id, user.version, user.updated_at))
+    return user
 
 
-@router.put("/{user_id}", response_model=User)
-async def update_user_endpoint(
+@router.patch("/{user_id}", response_model=User)
+async def patch_user_endpoint(
     user_id: int,
     payload: UpdateUserDto,
+    request: Request,
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> User:
-    """Update user"""
+    """Partially update user (send version or If-Match to reject concurrent edits)"""
     service = UserService(db)
-    return await service.update(user_id, payload)
+    payload.version = _expected_version(request, user_id, payload.version)
+    user = await _precondition(request, service.patch(user_id, payload))
+    response.headers.update(_validator_headers(user.id, user.version, user.updated_at))
+    return user
 
 
 @router.delete("/{user_id}")
 async def delete_user_endpoint(
     user_id: int,
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
+    version: int | None = Query(None, description="Only delete if still at this version"),
 ) -> dict[str, str]:
-    """Delete user"""
+    """Delete user (If-Match or version: only if unchanged)"""
     service = UserService(db)
-    await service.remove(user_id)
+    expected = _expected_version(request, user_id, version)
+    await _precondition(request, service.remove(user_id, expected_version=expected))
     return {"message": "User deleted successfully"}
 
 
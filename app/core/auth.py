@@ -1,30 +1,82 @@
 import hashlib
+import secrets
+import time
 from datetime import UTC, datetime, timedelta
 
-from jose import jwt
+from .cache import PrincipalCache, TTLCache
+from .config import settings
+from .hashing import Argon2Hasher, BcryptHasher, Hasher, HashingPool, Sha256Hasher
+from .token_codec import HmacKey, SigningKey, TokenCodec, load_pem_file
 
-SECRET_KEY = "CHANGE_ME_SUPER_SECRET"  # replace via env/secret manager
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
+REFRESH_TOKEN_EXPIRE_DAYS = settings.refresh_token_expire_days
+
+
+def _build_hashers() -> list[Hasher]:
+    """Preferred hasher first, followed by schemes still accepted for verification"""
+    bcrypt_hasher = BcryptHasher(rounds=settings.bcrypt_rounds)
+    if settings.password_hash_scheme == "argon2":
+        return [Argon2Hasher(), bcrypt_hasher, Sha256Hasher()]
+    return [bcrypt_hasher, Sha256Hasher()]
+
+
+def _build_token_codec() -> TokenCodec:
+    """Sign with the configured private key (or the shared secret), verify with any listed key"""
+    signing_key: SigningKey = (
+        load_pem_file(settings.jwt_private_key_file)
+        if settings.jwt_private_key_file
+        else HmacKey(settings.jwt_secret_key)
+    )
+    verify_keys = [load_pem_file(path) for path in settings.jwt_verify_key_file_list]
+    return TokenCodec(signing_key, verify_keys)
+
+
+token_codec = _build_token_codec()
+
+hashing_pool = HashingPool(
+    _build_hashers(),
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+)
+
+principal_cache = PrincipalCache(
+    max_size=settings.auth_cache_size, ttl=settings.auth_cache_ttl_seconds
+)
+# Role names from verified token claims, keyed by bearer token
+role_claims_cache: TTLCache[str, frozenset[str]] = TTLCache(
+    max_size=settings.auth_cache_size, ttl=settings.auth_cache_ttl_seconds
+)
 
 
 def hash_password(password: str) -> str:
-    """Hash password using SHA-256 (for simplicity in starter template)"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Hash password with the preferred scheme (blocking; prefer hashing_pool.hash)"""
+    return hashing_pool.preferred.hash(password)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    """Verify password against hash"""
-    return hash_password(password) == password_hash
+    """Verify password against hash (blocking; prefer hashing_pool.verify)"""
+    hasher = hashing_pool.identify(password_hash)
+    return hasher is not None and hasher.verify(password, password_hash)
 
 
 def create_access_token(
-    data: dict[str, str | int | datetime], expires_delta: timedelta | None = None
+    data: dict[str, str | int | datetime | list[str]], expires_delta: timedelta | None = None
 ) -> str:
-    to_encode = data.copy()
+    to_encode: dict[str, object] = dict(data)
     expire = datetime.now(tz=UTC) + (
         expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
-    to_encode.update({"exp": expire})
-    encoded_jwt: str = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+    # Fractional iat so a revocation and a re-login within the same second are told apart
+    to_encode.update({"exp": expire, "iat": round(time.time(), 3)})
+    return token_codec.encode(to_encode)
+
+
+def new_refresh_token() -> tuple[str, str]:
+    """An opaque refresh token and the hash stored in its place"""
+    token = secrets.token_urlsafe(32)
+    return token, hash_refresh_token(token)
+
+
+def hash_refresh_token(token: str) -> str:
+    # 256 random bits need no salt or slow hash: the digest only hides tokens at rest
+    return hashlib.sha256(token.encode()).hexdigest()
@@ -0,0 +1,111 @@
+"""
+In-process caches
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+from ..schemas.user import User
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Bounded LRU cache whose entries also expire after a TTL"""
+
+    def __init__(
+        self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _on_remove(self, key: K, value: V) -> None:
+        """Hook for subclasses that keep secondary indexes"""
+
+    def get(self, key: K) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            self.pop(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        if key in self._data:
+            self.pop(key)
+        self._data[key] = (self._clock() + ttl, value)
+        while len(self._data) > self.max_size:
+            old_key, (_, old_value) = self._data.popitem(last=False)
+            self.evictions += 1
+            self._on_remove(old_key, old_value)
+
+    def pop(self, key: K) -> V | None:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return None
+        self._on_remove(key, entry[1])
+        return entry[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 6) if lookups else 0.0,
+        }
+
+
+class PrincipalCache(TTLCache[str, User]):
+    """Verified principals keyed by bearer token, invalidated per user"""
+
+    def __init__(
+        self, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        super().__init__(max_size, ttl, clock)
+        self._tokens_by_user: dict[int, set[str]] = {}
+
+    def _on_remove(self, key: str, value: User) -> None:
+        tokens = self._tokens_by_user.get(value.id)
+        if tokens is not None:
+            tokens.discard(key)
+            if not tokens:
+                del self._tokens_by_user[value.id]
+
+    def set(self, key: str, value: User, ttl: float | None = None) -> None:
+        super().set(key, value, ttl)
+        if key in self._data:
+            self._tokens_by_user.setdefault(value.id, set()).add(key)
+
+    def invalidate_user(self, user_id: int) -> None:
+        for token in list(self._tokens_by_user.get(user_id, ())):
+            self.pop(token)
+
+    def clear(self) -> None:
+        super().clear()
+        self._tokens_by_user.clear()
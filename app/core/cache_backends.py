@@ -0,0 +1,360 @@
+"""
+Byte-oriented cache backends: in-process, shared across workers on one host, or Redis
+"""
+
+import asyncio
+import fcntl
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Protocol, Self
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .cache import TTLCache
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    async def delete(self, *keys: str) -> None: ...
+
+    async def close(self) -> None: ...
+
+    def stats(self) -> dict[str, float]: ...
+
+
+class MemoryBackend:
+    """Per-process LRU; every worker keeps (and invalidates) its own copy"""
+
+    def __init__(self, max_size: int = 10_000, clock: Callable[[], float] = time.monotonic) -> None:
+        # Callers pass a TTL on every set; the cache-wide TTL is only a ceiling
+        self._cache: TTLCache[str, bytes] = TTLCache(max_size, ttl=float("inf"), clock=clock)
+
+    async def get(self, key: str) -> bytes | None:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._cache.pop(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict[str, float]:
+        return self._cache.stats()
+
+
+# Slot header: expiry (wall clock, shared across processes), key length, value length
+_SLOT_HEADER = struct.Struct("<dHI")
+
+
+class SharedMemoryBackend:
+    """Fixed-size hash table in a memory-mapped file shared by every worker on the host.
+
+    Each key hashes to a single slot, so a colliding key evicts the previous entry
+    and entries larger than a slot are not stored. Access is serialized across
+    processes with flock on the file, taken without blocking the event loop.
+    """
+
+    # Retry delays while another worker holds the lock; critical sections are a
+    # few memory copies, so the first retry almost always succeeds
+    LOCK_RETRY_MIN = 0.0005
+    LOCK_RETRY_MAX = 0.01
+
+    def __init__(
+        self,
+        path: str,
+        slots: int = 65_536,
+        slot_size: int = 512,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.oversized = 0
+        self.lock_waits = 0
+        size = slots * slot_size
+        self._file = open(path, "a+b")
+        # Blocking is fine here: this runs once, before the worker serves requests
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._file.fileno()).st_size < size:
+                self._file.truncate(size)
+        finally:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+    @asynccontextmanager
+    async def _locked(self, operation: int) -> AsyncIterator[None]:
+        """Hold flock for the block; while another process has it, sleep and retry"""
+        delay = self.LOCK_RETRY_MIN
+        while True:
+            try:
+                fcntl.flock(self._file.fileno(), operation | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                self.lock_waits += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.LOCK_RETRY_MAX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def _offset(self, key: bytes) -> int:
+        return (zlib.crc32(key) % self.slots) * self.slot_size
+
+    def _matches(self, offset: int, key: bytes) -> tuple[float, int] | None:
+        """(expiry, value length) if the slot at offset holds key"""
+        expires_at, key_len, value_len = _SLOT_HEADER.unpack_from(self._map, offset)
+        start = offset + _SLOT_HEADER.size
+        if key_len != len(key) or self._map[start : start + key_len] != key:
+            return None
+        return expires_at, value_len
+
+    async def get(self, key: str) -> bytes | None:
+        encoded = key.encode()
+        offset = self._offset(encoded)
+        async with self._locked(fcntl.LOCK_SH):
+            entry = self._matches(offset, encoded)
+            if entry is None or entry[0] <= self._clock():
+                self.misses += 1
+                return None
+            start = offset + _SLOT_HEADER.size + len(encoded)
+            value = self._map[start : start + entry[1]]
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        encoded = key.encode()
+        if _SLOT_HEADER.size + len(encoded) + len(value) > self.slot_size:
+            self.oversized += 1
+            return
+        offset = self._offset(encoded)
+        async with self._locked(fcntl.LOCK_EX):
+            _SLOT_HEADER.pack_into(self._map, offset, self._clock() + ttl, len(encoded), len(value))
+            start = offset + _SLOT_HEADER.size
+            self._map[start : start + len(encoded) + len(value)] = encoded + value
+
+    async def delete(self, *keys: str) -> None:
+        async with self._locked(fcntl.LOCK_EX):
+            for key in keys:
+                encoded = key.encode()
+                offset = self._offset(encoded)
+                if self._matches(offset, encoded) is not None:
+                    _SLOT_HEADER.pack_into(self._map, offset, 0.0, 0, 0)
+
+    async def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "slots": self.slots,
+            "slot_size": self.slot_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "oversized": self.oversized,
+            "lock_waits": self.lock_waits,
+            "hit_rate": round(self.hits / lookups, 6) if lookups else 0.0,
+        }
+
+
+class RedisError(RuntimeError):
+    """Error reply from the server"""
+
+
+RespValue = bytes | int | str | RedisError | None | list["RespValue"]
+
+
+def _encode_command(*args: bytes) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> RespValue:
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by server")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        return RedisError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        return None if length < 0 else (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(payload)
+        return None if length < 0 else [await _read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected reply {line!r}")
+
+
+class RedisBackend:
+    """Minimal RESP2 client for GET / SET PX / DEL over one pipelined connection.
+
+    Commands are written as they arrive and replies are matched to callers in
+    order by a reader task, so concurrent requests share the connection without
+    waiting on each other. A dropped connection fails the pending calls and is
+    reopened on the next one.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: str | None = None,
+        timeout: float = 1.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.errors = 0
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task[None] | None = None
+        self._pending: deque[asyncio.Future[RespValue]] = deque()
+        self._connect_lock = asyncio.Lock()
+
+    @classmethod
+    def from_url(cls, url: str) -> Self:
+        parts = urlsplit(url)
+        query = parse_qs(parts.query)
+        return cls(
+            host=parts.hostname or "localhost",
+            port=parts.port or 6379,
+            db=int(parts.path.lstrip("/") or 0),
+            password=unquote(parts.password) if parts.password else None,
+            timeout=float(query.get("timeout", ["1.0"])[0]),
+        )
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        async with self._connect_lock:
+            if self._writer is not None:
+                return self._writer
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout
+            )
+            self._reader_task = asyncio.create_task(self._read_replies(reader))
+            handshake: list[tuple[bytes, ...]] = []
+            if self.password:
+                handshake.append((b"AUTH", self.password.encode()))
+            if self.db:
+                handshake.append((b"SELECT", str(self.db).encode()))
+            # Queue the handshake before publishing the writer so it precedes other commands
+            self._writer = writer
+            replies = [self._send(writer, *command) for command in handshake]
+            for reply in replies:
+                await asyncio.wait_for(reply, self.timeout)
+            return writer
+
+    def _send(self, writer: asyncio.StreamWriter, *args: bytes) -> "asyncio.Future[RespValue]":
+        future: asyncio.Future[RespValue] = asyncio.get_running_loop().create_future()
+        self._pending.append(future)
+        writer.write(_encode_command(*args))
+        return future
+
+    async def _read_replies(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                reply = await _read_reply(reader)
+                future = self._pending.popleft()
+                if not future.done():
+                    if isinstance(reply, RedisError):
+                        future.set_exception(reply)
+                    else:
+                        future.set_result(reply)
+        except (ConnectionError, OSError, asyncio.IncompleteReadError) as e:
+            self._reset(e)
+
+    def _reset(self, exc: BaseException) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError(f"Redis connection lost: {exc!s}"))
+
+    async def _execute(self, *args: bytes) -> RespValue:
+        writer = self._writer or await self._connect()
+        future = self._send(writer, *args)
+        try:
+            await writer.drain()
+            return await asyncio.wait_for(future, self.timeout)
+        except Exception:
+            self.errors += 1
+            raise
+
+    async def get(self, key: str) -> bytes | None:
+        reply = await self._execute(b"GET", key.encode())
+        return reply if isinstance(reply, bytes) else None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._execute(
+            b"SET", key.encode(), value, b"PX", str(max(1, int(ttl * 1000))).encode()
+        )
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._execute(b"DEL", *(key.encode() for key in keys))
+
+    async def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        self._reset(ConnectionError("closed"))
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "connected": self._writer is not None,
+            "pending": len(self._pending),
+            "errors": self.errors,
+        }
+
+
+def create_backend(url: str) -> CacheBackend | None:
+    """Backend for a cache URL; an empty URL or none:// disables caching.
+
+    memory://?size=10000
+    shm:///dev/shm/app-cache?slots=65536&slot_size=512
+    redis://:password@host:6379/0?timeout=1.0
+    """
+    parts = urlsplit(url)
+    query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+    if parts.scheme in ("", "none"):
+        return None
+    if parts.scheme == "memory":
+        return MemoryBackend(max_size=int(query.get("size", 10_000)))
+    if parts.scheme == "shm":
+        return SharedMemoryBackend(
+            parts.path,
+            slots=int(query.get("slots", 65_536)),
+            slot_size=int(query.get("slot_size", 512)),
+        )
+    if parts.scheme == "redis":
+        return RedisBackend.from_url(url)
+    raise ValueError(f"Unsupported cache URL scheme {parts.scheme!r}")
@@ -0,0 +1,214 @@
+"""
+Response compression negotiated via Accept-Encoding, incremental for streamed bodies
+"""
+
+import zlib
+from collections.abc import Callable, Sequence
+from typing import Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .http_cache import coded_etag
+
+# Media types worth compressing; everything else (images, archives) passes through
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "application/problem+json",
+)
+
+
+class Encoder(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class GzipEncoder:
+    def __init__(self, level: int) -> None:
+        # wbits 16 + MAX_WBITS writes the gzip header and trailer
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int) -> None:
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError("zstd compression requires the zstandard package") from e
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        out: bytes = self._compressor.compress(data)
+        return out
+
+    def finish(self) -> bytes:
+        out: bytes = self._compressor.flush()
+        return out
+
+
+class BrotliEncoder:
+    def __init__(self, level: int) -> None:
+        try:
+            import brotli
+        except ImportError as e:
+            raise RuntimeError("br compression requires the brotli package") from e
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        out: bytes = self._compressor.process(data)
+        return out
+
+    def finish(self) -> bytes:
+        out: bytes = self._compressor.finish()
+        return out
+
+
+ENCODERS: dict[str, Callable[[int], Encoder]] = {
+    "zstd": ZstdEncoder,
+    "br": BrotliEncoder,
+    "gzip": GzipEncoder,
+}
+
+
+def negotiate(accept_encoding: str, offered: Sequence[str]) -> str | None:
+    """Best of offered (server preference breaks ties) that the client accepts with q > 0"""
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        weights[coding.strip()] = q
+    best: tuple[float, str] | None = None
+    for coding in offered:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > 0 and (best is None or q > best[0]):
+            best = (q, coding)
+    return best[1] if best else None
+
+
+class CompressionMiddleware:
+    """Compresses response bodies with the best encoding both sides support.
+
+    Single-message bodies shorter than minimum_size are sent as-is. Streamed
+    bodies (StreamingResponse) are always compressed, chunk by chunk as they are
+    produced, so memory stays bounded by the encoder window rather than the
+    response size. Responses that already have a Content-Encoding, are not a
+    text-like media type, or carry Cache-Control: no-transform are untouched.
+    A compressed response's ETag gets the coding appended (see
+    http_cache.coded_etag), since its bytes differ from the identity
+    representation; it stays strong, so If-Match writes and 304 checks accept it.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Sequence[str] = ("gzip",),
+        minimum_size: int = 1024,
+        levels: dict[str, int] | None = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": 6, "zstd": 3, "br": 4, **(levels or {})}
+        unknown = [name for name in encodings if name not in ENCODERS]
+        if unknown:
+            raise ValueError(f"Unsupported encodings {unknown}; choose from {list(ENCODERS)}")
+        self.encodings = tuple(encodings)
+        # Fail at startup rather than on the first request if a library is missing
+        for name in self.encodings:
+            ENCODERS[name](self.levels[name])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressingResponder(self, coding, send).run(self.app, scope, receive)
+
+
+class _CompressingResponder:
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.coding = coding
+        self.send = send
+        self.start: Message | None = None
+        self.encoder: Encoder | None = None
+        self.passthrough = False
+
+    async def run(self, app: ASGIApp, scope: Scope, receive: Receive) -> None:
+        await app(scope, receive, self.on_message)
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        content_type = headers.get("content-type", "")
+        return (
+            "content-encoding" not in headers
+            and "no-transform" not in headers.get("cache-control", "")
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        )
+
+    async def on_message(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = MutableHeaders(raw=message["headers"])
+            self.passthrough = not self._compressible(headers)
+            if self.passthrough:
+                await self.send(message)
+            elif "vary" in headers:
+                headers.add_vary_header("Accept-Encoding")
+            else:
+                headers["Vary"] = "Accept-Encoding"
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        assert self.start is not None
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        if self.encoder is None:
+            headers = MutableHeaders(raw=self.start["headers"])
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            self.encoder = ENCODERS[self.coding](self.middleware.levels[self.coding])
+            headers["Content-Encoding"] = self.coding
+            etag = headers.get("etag")
+            if etag is not None:
+                headers["ETag"] = coded_etag(etag, self.coding)
+            if not more_body:
+                compressed = self.encoder.compress(body) + self.encoder.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            # Streamed: the final length is unknown until the encoder finishes
+            del headers["Content-Length"]
+            await self.send(self.start)
+
+        chunk = self.encoder.compress(body)
+        if not more_body:
+            chunk += self.encoder.finish()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,8 +12,149 @@ class Settings(BaseSettings):
         alias="DATABASE_URL",
     )
     database_url_sync: str | None = Field(default=None, alias="DATABASE_URL_SYNC")
+
+    # Connection pool / engine tuning
+    db_echo: bool = Field(default=False, alias="DB_ECHO")
+    db_pool_size: int = Field(default=5, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, alias="DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(default=30.0, alias="DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(default=1800, alias="DB_POOL_RECYCLE")
+    db_pool_pre_ping: bool = Field(default=True, alias="DB_POOL_PRE_PING")
+    # asyncpg statement caches; DB_PGBOUNCER disables both for transaction pooling
+    db_statement_cache_size: int = Field(default=100, alias="DB_STATEMENT_CACHE_SIZE")
+    db_prepared_statement_cache_size: int = Field(
+        default=100, alias="DB_PREPARED_STATEMENT_CACHE_SIZE"
+    )
+    db_pgbouncer: bool = Field(default=False, alias="DB_PGBOUNCER")
+    # SQLAlchemy compiled-SQL cache entries per engine (query_cache_size); 0 disables it
+    db_compiled_cache_size: int = Field(default=1200, alias="DB_COMPILED_CACHE_SIZE")
+
+    # Startup: verify (check the Alembic revision only), create_all (development) or skip
+    db_startup_mode: Literal["create_all", "verify", "skip"] = Field(
+        default="verify", alias="DB_STARTUP_MODE"
+    )
+    # Connections opened (and hot queries prepared on) before serving; capped at DB_POOL_SIZE
+    db_pool_min_size: int = Field(default=0, alias="DB_POOL_MIN_SIZE")
+
+    # Read replicas (comma-separated async URLs); empty routes reads to the primary
+    database_replica_urls: str = Field(default="", alias="DATABASE_REPLICA_URLS")
+    db_replica_strategy: Literal["round_robin", "least_connections"] = Field(
+        default="round_robin", alias="DB_REPLICA_STRATEGY"
+    )
+    db_replica_eject_seconds: float = Field(default=30.0, alias="DB_REPLICA_EJECT_SECONDS")
+    # How long a client reads from the primary after one of its writes
+    db_read_your_writes_seconds: int = Field(default=5, alias="DB_READ_YOUR_WRITES_SECONDS")
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.database_replica_urls.split(",") if url.strip()]
+
     app_host: str = Field(default="127.0.0.1", alias="APP_HOST")
     app_port: int = Field(default=8000, alias="APP_PORT")
 
+    # Password hashing
+    password_hash_scheme: Literal["bcrypt", "argon2"] = Field(
+        default="bcrypt", alias="PASSWORD_HASH_SCHEME"
+    )
+    bcrypt_rounds: int = Field(default=12, alias="BCRYPT_ROUNDS")
+    password_hash_workers: int = Field(default=4, alias="PASSWORD_HASH_WORKERS")
+    password_hash_max_queue: int = Field(default=64, alias="PASSWORD_HASH_MAX_QUEUE")
+
+    # Instrumentation: /metrics, per-route latency and per-request DB query accounting
+    metrics_enabled: bool = Field(default=False, alias="METRICS_ENABLED")
+    # Warn when one statement repeats this many times within a single request
+    db_n_plus_one_threshold: int = Field(default=10, alias="DB_N_PLUS_ONE_THRESHOLD")
+
+    # Cache for user lookups by id/email: memory://, shm:///path or redis://host:port/db
+    # (empty disables it). memory:// is per worker; use shm or redis with several workers
+    user_cache_url: str = Field(default="memory://", alias="USER_CACHE_URL")
+    user_cache_ttl_seconds: float = Field(default=30.0, alias="USER_CACHE_TTL_SECONDS")
+    # How long a lookup that found no user is remembered
+    user_cache_negative_ttl_seconds: float = Field(
+        default=5.0, alias="USER_CACHE_NEGATIVE_TTL_SECONDS"
+    )
+
+    # List endpoints encode selected rows with orjson instead of building and re-validating
+    # Pydantic models per row (the OpenAPI schema is unchanged)
+    fast_json_responses: bool = Field(default=False, alias="FAST_JSON_RESPONSES")
+
+    # Response compression negotiated via Accept-Encoding. COMPRESSION_ENCODINGS is the
+    # server's preference order (gzip, zstd, br); zstd needs the zstandard package and br the
+    # brotli package. Bodies under COMPRESSION_MINIMUM_SIZE bytes are sent as-is, streamed
+    # bodies (NDJSON/CSV exports) are compressed chunk by chunk
+    compression_enabled: bool = Field(default=True, alias="COMPRESSION_ENABLED")
+    compression_encodings: str = Field(default="gzip", alias="COMPRESSION_ENCODINGS")
+    compression_minimum_size: int = Field(default=1024, alias="COMPRESSION_MINIMUM_SIZE")
+    compression_gzip_level: int = Field(default=6, alias="COMPRESSION_GZIP_LEVEL")
+    compression_zstd_level: int = Field(default=3, alias="COMPRESSION_ZSTD_LEVEL")
+    compression_brotli_quality: int = Field(default=4, alias="COMPRESSION_BROTLI_QUALITY")
+
+    @property
+    def compression_encoding_list(self) -> list[str]:
+        return [name.strip() for name in self.compression_encodings.split(",") if name.strip()]
+
+    @property
+    def compression_levels(self) -> dict[str, int]:
+        return {
+            "gzip": self.compression_gzip_level,
+            "zstd": self.compression_zstd_level,
+            "br": self.compression_brotli_quality,
+        }
+
+    # Token-bucket rate limits ("<count>/<period>", empty disables one); checked before any
+    # DB access. memory:// is per worker, so use redis://host:port/db with several workers
+    rate_limit_enabled: bool = Field(default=True, alias="RATE_LIMIT_ENABLED")
+    rate_limit_url: str = Field(default="memory://", alias="RATE_LIMIT_URL")
+    login_rate_limit_per_ip: str = Field(default="20/minute", alias="LOGIN_RATE_LIMIT_PER_IP")
+    login_rate_limit_per_email: str = Field(default="5/minute", alias="LOGIN_RATE_LIMIT_PER_EMAIL")
+    register_rate_limit_per_ip: str = Field(default="10/minute", alias="REGISTER_RATE_LIMIT_PER_IP")
+
+    # Write-behind audit log of user changes: events are queued in memory and batch-inserted
+    # into audit_events every AUDIT_FLUSH_INTERVAL_MS or AUDIT_BATCH_SIZE events. When the
+    # queue is full new events are dropped (and counted) rather than slowing writes down
+    audit_log_enabled: bool = Field(default=True, alias="AUDIT_LOG_ENABLED")
+    audit_queue_size: int = Field(default=10_000, alias="AUDIT_QUEUE_SIZE")
+    audit_batch_size: int = Field(default=500, alias="AUDIT_BATCH_SIZE")
+    audit_flush_interval_ms: int = Field(default=200, alias="AUDIT_FLUSH_INTERVAL_MS")
+
+    # Durable background jobs (jobs table) run by JOB_WORKERS in-process workers. Failed jobs
+    # are retried after JOB_BACKOFF_SECONDS doubling per attempt (capped), up to
+    # JOB_MAX_ATTEMPTS; a job still running after JOB_LEASE_SECONDS (a worker died) is retried
+    jobs_enabled: bool = Field(default=True, alias="JOBS_ENABLED")
+    job_workers: int = Field(default=2, alias="JOB_WORKERS")
+    job_poll_interval_ms: int = Field(default=1000, alias="JOB_POLL_INTERVAL_MS")
+    job_max_attempts: int = Field(default=5, alias="JOB_MAX_ATTEMPTS")
+    job_backoff_seconds: float = Field(default=2.0, alias="JOB_BACKOFF_SECONDS")
+    job_backoff_max_seconds: float = Field(default=300.0, alias="JOB_BACKOFF_MAX_SECONDS")
+    job_lease_seconds: float = Field(default=300.0, alias="JOB_LEASE_SECONDS")
+
+    # Verified-token cache used by get_current_user (size 0 disables it)
+    auth_cache_size: int = Field(default=10_000, alias="AUTH_CACHE_SIZE")
+    auth_cache_ttl_seconds: float = Field(default=60.0, alias="AUTH_CACHE_TTL_SECONDS")
+
+    # Access-token signing. Without JWT_PRIVATE_KEY_FILE tokens are HS256 with JWT_SECRET_KEY;
+    # with a PEM Ed25519 (EdDSA) or P-256 (ES256) private key they are signed with it and its
+    # public half is served at /.well-known/jwks.json. JWT_VERIFY_KEY_FILES (comma-separated
+    # PEM paths) are further keys still accepted and published, for rotation
+    jwt_secret_key: str = Field(default="CHANGE_ME_SUPER_SECRET", alias="JWT_SECRET_KEY")
+    jwt_private_key_file: str = Field(default="", alias="JWT_PRIVATE_KEY_FILE")
+    jwt_verify_key_files: str = Field(default="", alias="JWT_VERIFY_KEY_FILES")
+
+    @property
+    def jwt_verify_key_file_list(self) -> list[str]:
+        return [path.strip() for path in self.jwt_verify_key_files.split(",") if path.strip()]
+
+    # Short-lived access tokens, renewed with single-use refresh tokens (POST /auth/refresh).
+    # Revocations (e.g. a deleted user) are mirrored in memory and re-read from
+    # token_revocations every TOKEN_REVOCATION_SYNC_SECONDS, so other workers honour them
+    # within that interval without a query per request
+    access_token_expire_minutes: int = Field(default=15, alias="ACCESS_TOKEN_EXPIRE_MINUTES")
+    refresh_token_expire_days: int = Field(default=14, alias="REFRESH_TOKEN_EXPIRE_DAYS")
+    token_revocation_sync_seconds: float = Field(default=5.0, alias="TOKEN_REVOCATION_SYNC_SECONDS")
+    # Refresh tokens past expires_at (spent or not) are deleted by a recurring job
+    refresh_token_purge_interval_seconds: float = Field(
+        default=3600.0, alias="REFRESH_TOKEN_PURGE_INTERVAL_SECONDS"
+    )
+
 
 settings = Settings()
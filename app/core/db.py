@@ -1,8 +1,117 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import time
+import uuid
+from typing import Any
 
-from .config import settings
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.engine.interfaces import DBAPIConnection
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import QueuePool
+
+from .config import Settings, settings
+from .replicas import ReplicaSet
+
+
+def engine_kwargs(url: str, config: Settings = settings) -> dict[str, Any]:
+    """Build create_async_engine keyword arguments for a URL from Settings"""
+    kwargs: dict[str, Any] = {
+        "echo": config.db_echo,
+        "pool_pre_ping": config.db_pool_pre_ping,
+        "query_cache_size": config.db_compiled_cache_size,
+    }
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        # SQLite picks its own pool class; queue sizing does not apply
+        return kwargs
+
+    kwargs.update(
+        pool_size=config.db_pool_size,
+        max_overflow=config.db_max_overflow,
+        pool_timeout=config.db_pool_timeout,
+        pool_recycle=config.db_pool_recycle,
+    )
+    if parsed.get_driver_name() == "asyncpg":
+        if config.db_pgbouncer:
+            # PgBouncer transaction mode can hand each statement to a different server
+            # connection, so named prepared statements must never be reused
+            kwargs["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        else:
+            kwargs["connect_args"] = {
+                "statement_cache_size": config.db_statement_cache_size,
+                "prepared_statement_cache_size": config.db_prepared_statement_cache_size,
+            }
+    return kwargs
+
+
+def enable_sqlite_foreign_keys(target: AsyncEngine) -> None:
+    """Enforce foreign keys (and their ON DELETE CASCADE) on every SQLite connection.
+
+    SQLite ignores them unless each connection opts in, so deleting a user would
+    otherwise leave its roles, password and refresh tokens behind; user ids can
+    then be reused and inherit them.
+    """
 
-engine = create_async_engine(settings.database_url, echo=False, future=True)
+    @event.listens_for(target.sync_engine, "connect")
+    def set_foreign_keys(dbapi_connection: DBAPIConnection, connection_record: object) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def create_engine_from_url(url: str, config: Settings = settings) -> AsyncEngine:
+    target = create_async_engine(url, **engine_kwargs(url, config))
+    if target.dialect.name == "sqlite":
+        enable_sqlite_foreign_keys(target)
+    return target
+
+
+async def pool_stats(target: AsyncEngine, config: Settings = settings) -> dict[str, Any]:
+    """Report pool occupancy and a round-trip ping for an engine"""
+    pool = target.pool
+    stats: dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=config.db_max_overflow,
+            timeout=pool.timeout(),
+        )
+    # Statements compiled so far; size pinned at capacity means DB_COMPILED_CACHE_SIZE is too small
+    compiled_cache = target.sync_engine._compiled_cache
+    if compiled_cache is not None:
+        stats["compiled_cache"] = {
+            "size": len(compiled_cache),
+            "capacity": getattr(compiled_cache, "capacity", None),
+        }
+    started = time.perf_counter()
+    try:
+        async with target.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        stats.update(status="error", error=str(e))
+    else:
+        stats.update(status="ok", ping_ms=round((time.perf_counter() - started) * 1000, 3))
+    return stats
+
+
+engine = create_engine_from_url(settings.database_url)
 SessionLocal: async_sessionmaker[AsyncSession] = async_sessionmaker(
     bind=engine, expire_on_commit=False
 )
+
+replicas = ReplicaSet(
+    [create_engine_from_url(url) for url in settings.replica_urls],
+    strategy=settings.db_replica_strategy,
+    eject_seconds=settings.db_replica_eject_seconds,
+)
@@ -0,0 +1,217 @@
+"""
+Password hashers and the bounded worker pool that runs them off the event loop
+"""
+
+import asyncio
+import hashlib
+import hmac
+import threading
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import Protocol, TypeVar
+
+import bcrypt
+
+T = TypeVar("T")
+
+
+class PasswordHashingBusyError(RuntimeError):
+    """Raised when the hashing pool already has its maximum number of jobs queued"""
+
+
+class Hasher(Protocol):
+    scheme: str
+
+    def identify(self, password_hash: str) -> bool: ...
+
+    def hash(self, password: str) -> str: ...
+
+    def verify(self, password: str, password_hash: str) -> bool: ...
+
+    def needs_rehash(self, password_hash: str) -> bool: ...
+
+
+class Sha256Hasher:
+    """Legacy unsalted SHA-256 hashes; verify-only, upgraded on next login"""
+
+    scheme = "sha256"
+
+    def identify(self, password_hash: str) -> bool:
+        return len(password_hash) == 64 and all(c in "0123456789abcdef" for c in password_hash)
+
+    def hash(self, password: str) -> str:
+        return hashlib.sha256(password.encode()).hexdigest()
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return hmac.compare_digest(self.hash(password), password_hash)
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return True
+
+
+class BcryptHasher:
+    scheme = "bcrypt"
+
+    def __init__(self, rounds: int = 12) -> None:
+        self.rounds = rounds
+
+    @staticmethod
+    def _encode(password: str) -> bytes:
+        # bcrypt only uses the first 72 bytes; bcrypt>=5 raises instead of truncating
+        return password.encode()[:72]
+
+    def identify(self, password_hash: str) -> bool:
+        return password_hash.startswith(("$2a$", "$2b$", "$2y$"))
+
+    def hash(self, password: str) -> str:
+        return bcrypt.hashpw(self._encode(password), bcrypt.gensalt(self.rounds)).decode()
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        try:
+            return bcrypt.checkpw(self._encode(password), password_hash.encode())
+        except ValueError:
+            return False
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return password_hash.split("$")[2] != f"{self.rounds:02d}"
+
+
+class Argon2Hasher:
+    scheme = "argon2"
+
+    def __init__(self) -> None:
+        try:
+            from argon2 import PasswordHasher
+        except ImportError as e:
+            raise RuntimeError("argon2 hashing requires the argon2-cffi package") from e
+        self._hasher = PasswordHasher()
+
+    def identify(self, password_hash: str) -> bool:
+        return password_hash.startswith("$argon2")
+
+    def hash(self, password: str) -> str:
+        password_hash: str = self._hasher.hash(password)
+        return password_hash
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        from argon2.exceptions import InvalidHashError, VerificationError
+
+        try:
+            return bool(self._hasher.verify(password_hash, password))
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        return bool(self._hasher.check_needs_rehash(password_hash))
+
+
+class HashingPool:
+    """Runs hashers in a bounded thread pool and rejects work once the queue is full.
+
+    bcrypt and argon2-cffi release the GIL while hashing, so threads give real
+    parallelism. The first hasher is used for new hashes; the rest are accepted
+    for verification and flagged for rehash.
+    """
+
+    def __init__(self, hashers: Sequence[Hasher], workers: int = 4, max_queue: int = 64) -> None:
+        if not hashers:
+            raise ValueError("At least one hasher is required")
+        self.hashers = list(hashers)
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+        self._busy_lock = threading.Lock()
+        self._started = time.monotonic()
+
+    @property
+    def preferred(self) -> Hasher:
+        return self.hashers[0]
+
+    def identify(self, password_hash: str) -> Hasher | None:
+        return next((h for h in self.hashers if h.identify(password_hash)), None)
+
+    def _timed(self, fn: Callable[..., T], *args: object) -> T:
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self._busy_lock:
+                self._busy_seconds += time.perf_counter() - started
+
+    async def _run(self, fn: Callable[..., T], *args: object) -> T:
+        if self._in_flight >= self.workers + self.max_queue:
+            self._rejected += 1
+            raise PasswordHashingBusyError("Password hashing pool is saturated")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="hasher")
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, self._timed, fn, *args)
+        except BaseException:
+            self._failed += 1
+            raise
+        else:
+            self._completed += 1
+            return result
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.preferred.hash, password)
+
+    def _hash_batch(self, passwords: Sequence[str]) -> list[str]:
+        return [self.preferred.hash(password) for password in passwords]
+
+    async def hash_many(self, passwords: Sequence[str]) -> list[str]:
+        """Hash a batch in parallel while holding at most one pool slot per worker"""
+        if not passwords:
+            return []
+        size = -(-len(passwords) // self.workers)
+        batches = await asyncio.gather(
+            *(
+                self._run(self._hash_batch, passwords[i : i + size])
+                for i in range(0, len(passwords), size)
+            )
+        )
+        return [password_hash for batch in batches for password_hash in batch]
+
+    async def verify(self, password: str, password_hash: str) -> tuple[bool, str | None]:
+        """Verify a password, returning a replacement hash when it should be upgraded"""
+        hasher = self.identify(password_hash)
+        if hasher is None:
+            return False, None
+        if not await self._run(hasher.verify, password, password_hash):
+            return False, None
+        if hasher is self.preferred and not hasher.needs_rehash(password_hash):
+            return True, None
+        try:
+            return True, await self._run(self.preferred.hash, password)
+        except PasswordHashingBusyError:
+            # The login itself succeeded; the upgrade can wait for the next one
+            return True, None
+
+    def stats(self) -> dict[str, float]:
+        uptime = max(time.monotonic() - self._started, 1e-9)
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queued": max(0, self._in_flight - self.workers),
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "busy_seconds": round(self._busy_seconds, 6),
+            "utilization": round(self._busy_seconds / (uptime * self.workers), 6),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,110 @@
+"""
+HTTP validators (ETag / Last-Modified) and conditional request evaluation
+"""
+
+from collections.abc import Mapping
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import HTTPException, status
+
+# Content codings CompressionMiddleware may append to an ETag (see coded_etag)
+CONTENT_CODINGS = ("gzip", "zstd", "br")
+
+
+def make_etag(resource: str, version: int) -> str:
+    """Strong ETag for a versioned row; every write bumps version, so it changes with the body"""
+    return f'"{resource}.v{version}"'
+
+
+def coded_etag(etag: str, coding: str) -> str:
+    """ETag of the same representation sent with a content coding, e.g. "user-1.v2-gzip".
+
+    Its bytes differ from the identity body, so it gets its own tag, but it stays
+    strong so that If-Match still accepts it.
+    """
+    return f'{etag[:-1]}-{coding}"' if etag.endswith('"') else etag
+
+
+def _strip_coding(etag: str) -> str:
+    for coding in CONTENT_CODINGS:
+        suffix = f'-{coding}"'
+        if etag.endswith(suffix):
+            return etag[: -len(suffix)] + '"'
+    return etag
+
+
+def etag_version(etag: str, resource: str) -> int | None:
+    """The version a strong ETag from make_etag(resource, ...) encodes, if it is one"""
+    etag = _strip_coding(etag)
+    prefix = f'"{resource}.v'
+    if not (etag.startswith(prefix) and etag.endswith('"')):
+        return None
+    try:
+        return int(etag[len(prefix) : -1])
+    except ValueError:
+        return None
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; the columns hold UTC
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value.astimezone(UTC)
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def _parse_etags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def _weak_match(a: str, b: str) -> bool:
+    return _strip_coding(a.removeprefix("W/")) == _strip_coding(b.removeprefix("W/"))
+
+
+def is_not_modified(
+    headers: Mapping[str, str], etag: str, last_modified: datetime | None = None
+) -> bool:
+    """Whether a GET can be answered with 304 (RFC 9110 13.2.2).
+
+    If-None-Match uses weak comparison and, when present, If-Modified-Since is
+    ignored. Last-Modified has one-second resolution, so a write within the same
+    second as the client's copy is only caught by the ETag.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _parse_etags(if_none_match)
+        return "*" in tags or any(_weak_match(tag, etag) for tag in tags)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def if_match_version(headers: Mapping[str, str], resource: str) -> int | None:
+    """Version required by an If-Match header, or None when any version will do.
+
+    Raises 412 if the header names no ETag this resource could have (strong
+    comparison: weak tags never match). "*" only requires the resource to exist,
+    which the write itself checks.
+    """
+    if_match = headers.get("if-match")
+    if if_match is None:
+        return None
+    tags = _parse_etags(if_match)
+    if "*" in tags:
+        return None
+    versions = {etag_version(tag, resource) for tag in tags} - {None}
+    if len(versions) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match must name exactly one current ETag of this resource",
+        )
+    version: int | None = versions.pop()
+    return version
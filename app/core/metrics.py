@@ -0,0 +1,251 @@
+"""
+Request/DB instrumentation rendered in the Prometheus text format
+"""
+
+import logging
+import time
+from bisect import bisect_left
+from collections import Counter as StatementCounter
+from collections.abc import Callable, Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, ExceptionContext, ExecutionContext
+from sqlalchemy.engine.interfaces import DBAPICursor
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], **extra: str) -> str:
+    pairs = [*zip(names, values, strict=True), *extra.items()]
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: one slot per bucket plus +Inf, then sum and count
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        entry = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [0.0] * (len(self.buckets) + 3)
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-2] += value
+        entry[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, entry in self._values.items():
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, "+Inf"), entry, strict=False):
+                cumulative += count
+                bucket_labels = _format_labels(self.labelnames, labels, le=str(bound))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative:g}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {entry[-2]}")
+            lines.append(f"{self.name}_count{label_str} {entry[-1]:g}")
+        return lines
+
+
+MetricT = TypeVar("MetricT", Counter, Histogram)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[tuple[str, Callable[[], dict[str, float]]]] = []
+
+    def register(self, metric: MetricT) -> MetricT:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, prefix: str, collect: Callable[[], dict[str, float]]) -> None:
+        """Expose each numeric value of collect() as a gauge named <prefix>_<key>"""
+        self._collectors.append((prefix, collect))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for prefix, collect in self._collectors:
+            for key, value in collect().items():
+                if isinstance(value, int | float) and not isinstance(value, bool):
+                    lines.append(f"# TYPE {prefix}_{key} gauge")
+                    lines.append(f"{prefix}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+http_requests = registry.register(
+    Counter("http_requests_total", "HTTP requests served.", ("method", "route", "status"))
+)
+http_latency = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency.", ("method", "route"))
+)
+request_queries = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "Database queries issued per HTTP request.",
+        ("route",),
+        QUERY_COUNT_BUCKETS,
+    )
+)
+request_db_time = registry.register(
+    Histogram("http_request_db_seconds", "Database time spent per HTTP request.", ("route",))
+)
+query_latency = registry.register(
+    Histogram("db_query_duration_seconds", "Latency of individual database queries.")
+)
+n_plus_one = registry.register(
+    Counter(
+        "db_repeated_query_warnings_total",
+        "Requests that repeated one statement past the N+1 threshold.",
+        ("route",),
+    )
+)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    statements: StatementCounter[str] = field(default_factory=StatementCounter)
+
+
+_current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: object,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: DBAPICursor,
+    statement: str,
+    parameters: object,
+    context: ExecutionContext | None,
+    executemany: bool,
+) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    query_latency.observe(elapsed)
+    stats = _current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+        stats.statements[statement] += 1
+
+
+def _handle_error(context: ExceptionContext) -> None:
+    # A failed execute never reaches after_cursor_execute; drop its start time so the
+    # list on the pooled connection does not grow with every failed statement
+    if context.connection is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every query on an engine and attribute it to the current request"""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """Records latency and DB usage per route template; warns on likely N+1 patterns"""
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 10) -> None:
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_request.reset(token)
+            # The router stores the matched route in the scope; use its template as the label
+            route = getattr(scope.get("route"), "path", "unmatched")
+            http_requests.inc(scope["method"], route, str(status_code))
+            http_latency.observe(elapsed, scope["method"], route)
+            request_queries.observe(stats.queries, route)
+            request_db_time.observe(stats.db_seconds, route)
+            self._check_repeated_statements(route, stats)
+
+    def _check_repeated_statements(self, route: str, stats: RequestStats) -> None:
+        if stats.queries < self.n_plus_one_threshold:
+            return
+        statement, count = stats.statements.most_common(1)[0]
+        if count >= self.n_plus_one_threshold:
+            n_plus_one.inc(route)
+            logger.warning(
+                "Possible N+1 on %s: statement executed %d times (%d queries total): %s",
+                route,
+                count,
+                stats.queries,
+                statement,
+            )
@@ -0,0 +1,19 @@
+import base64
+import binascii
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen primary key as an opaque keyset cursor"""
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a keyset cursor back into the last seen primary key"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor") from None
+    if last_id < 0:
+        raise ValueError("Invalid cursor")
+    return last_id
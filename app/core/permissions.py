@@ -0,0 +1,162 @@
+"""
+In-memory role -> permission map for authorization checks without a DB round trip
+"""
+
+from collections.abc import Iterable
+from typing import Literal
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, UOWTransaction
+
+from ..models.auth import Permission, Role, RolePermission
+
+ChangeKind = Literal["role", "role_deleted", "permission", "permission_deleted", "grant", "revoke"]
+Change = tuple[ChangeKind, str, str | None]
+
+_PENDING_KEY = "permission_changes"
+
+
+class PermissionMap:
+    """Permission names granted to each role name, kept in sync with the role tables.
+
+    load() reads the whole map (at startup). After that, ORM writes to Role,
+    Permission and RolePermission are applied when their transaction commits,
+    recomputing only the roles they touch. Every change bumps version and drops
+    the memoized per-role-set unions. Writes that bypass the ORM (raw SQL, other
+    processes) are only picked up by the next load().
+    """
+
+    def __init__(self) -> None:
+        self.version = 0
+        self._role_names: dict[str, str] = {}  # role id -> role name
+        self._permission_names: dict[str, str] = {}  # permission id -> permission name
+        self._grants: dict[str, set[str]] = {}  # role id -> permission ids
+        self._by_role: dict[str, frozenset[str]] = {}  # role name -> permission names
+        self._resolved: dict[frozenset[str], frozenset[str]] = {}
+
+    async def load(self, session: AsyncSession) -> None:
+        roles = await session.execute(select(Role.id, Role.name))
+        permissions = await session.execute(select(Permission.id, Permission.name))
+        grants = await session.execute(select(RolePermission.role_id, RolePermission.permission_id))
+        self._role_names = dict(roles.all())
+        self._permission_names = dict(permissions.all())
+        self._grants = {}
+        for role_id, permission_id in grants:
+            self._grants.setdefault(role_id, set()).add(permission_id)
+        self._by_role = {}
+        self._refresh(self._role_names)
+
+    def clear(self) -> None:
+        self._role_names.clear()
+        self._permission_names.clear()
+        self._grants.clear()
+        self._by_role.clear()
+        self._resolved.clear()
+        self.version += 1
+
+    def apply(self, changes: Iterable[Change]) -> None:
+        touched: set[str] = set()
+        for kind, key, value in changes:
+            if kind in ("role", "role_deleted"):
+                # Drop the entry under the old name; _refresh re-adds it under the new one
+                old_name = self._role_names.pop(key, None)
+                if old_name is not None:
+                    self._by_role.pop(old_name, None)
+                if kind == "role" and value is not None:
+                    self._role_names[key] = value
+                else:
+                    self._grants.pop(key, None)
+                touched.add(key)
+            elif kind in ("permission", "permission_deleted"):
+                if kind == "permission" and value is not None:
+                    self._permission_names[key] = value
+                else:
+                    self._permission_names.pop(key, None)
+                touched.update(role for role, granted in self._grants.items() if key in granted)
+            elif kind == "grant" and value is not None:
+                self._grants.setdefault(key, set()).add(value)
+                touched.add(key)
+            elif kind == "revoke" and value is not None:
+                self._grants.get(key, set()).discard(value)
+                touched.add(key)
+        if touched:
+            self._refresh(touched)
+
+    def _refresh(self, role_ids: Iterable[str]) -> None:
+        for role_id in role_ids:
+            name = self._role_names.get(role_id)
+            if name is not None:
+                self._by_role[name] = frozenset(
+                    self._permission_names[permission_id]
+                    for permission_id in self._grants.get(role_id, ())
+                    if permission_id in self._permission_names
+                )
+        self._resolved.clear()
+        self.version += 1
+
+    def permissions_for(self, roles: frozenset[str]) -> frozenset[str]:
+        """Union of the permissions granted by a set of role names, memoized per set"""
+        resolved = self._resolved.get(roles)
+        if resolved is None:
+            resolved = frozenset().union(*(self._by_role.get(role, ()) for role in roles))
+            self._resolved[roles] = resolved
+        return resolved
+
+    def allows(self, roles: frozenset[str], permission: str) -> bool:
+        return permission in self.permissions_for(roles)
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "version": self.version,
+            "roles": len(self._role_names),
+            "permissions": len(self._permission_names),
+            "resolved_role_sets": len(self._resolved),
+        }
+
+
+permission_map = PermissionMap()
+
+
+def _flushed_changes(session: Session) -> list[Change]:
+    changes: list[Change] = []
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, Role):
+            changes.append(("role", obj.id, obj.name))
+        elif isinstance(obj, Permission):
+            changes.append(("permission", obj.id, obj.name))
+        elif isinstance(obj, RolePermission):
+            if obj not in session.new:
+                # A grant row repointed in place: revoke what it granted before the flush
+                state = inspect(obj)
+                role_ids = state.attrs.role_id.history.deleted or [obj.role_id]
+                permission_ids = state.attrs.permission_id.history.deleted or [obj.permission_id]
+                changes.append(("revoke", role_ids[0], permission_ids[0]))
+            changes.append(("grant", obj.role_id, obj.permission_id))
+    for obj in session.deleted:
+        if isinstance(obj, Role):
+            changes.append(("role_deleted", obj.id, None))
+        elif isinstance(obj, Permission):
+            changes.append(("permission_deleted", obj.id, None))
+        elif isinstance(obj, RolePermission):
+            changes.append(("revoke", obj.role_id, obj.permission_id))
+    return changes
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changes(session: Session, flush_context: UOWTransaction) -> None:
+    changes = _flushed_changes(session)
+    if changes:
+        session.info.setdefault(_PENDING_KEY, []).extend(changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        permission_map.apply(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
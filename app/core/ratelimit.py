@@ -0,0 +1,220 @@
+"""
+Token-bucket rate limiting over an in-process or shared store
+"""
+
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import NamedTuple, Protocol
+from urllib.parse import parse_qs, urlsplit
+
+from .cache_backends import RedisBackend
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+_RATE_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*(second|minute|hour|day)s?\s*$")
+
+
+class Rate(NamedTuple):
+    """capacity requests per period seconds, refilled continuously"""
+
+    capacity: int
+    period: float
+
+    @property
+    def per_second(self) -> float:
+        return self.capacity / self.period
+
+
+def parse_rate(value: str) -> Rate | None:
+    """ "5/minute", "100/hour", "10/30seconds"; an empty string or "0/..." disables the limit"""
+    if not value.strip():
+        return None
+    match = _RATE_RE.match(value.lower())
+    if match is None:
+        raise ValueError(f"Invalid rate {value!r}; expected e.g. '5/minute'")
+    count, multiplier, unit = match.groups()
+    if int(count) == 0:
+        return None
+    return Rate(int(count), _PERIODS[unit] * int(multiplier or 1))
+
+
+class RateLimitStore(Protocol):
+    async def hit(self, key: str, rate: Rate, cost: float = 1.0) -> float:
+        """Take cost tokens from key's bucket; 0 if allowed, else seconds until it would be"""
+        ...
+
+    async def close(self) -> None: ...
+
+    def stats(self) -> dict[str, float]: ...
+
+
+class MemoryRateLimitStore:
+    """Per-process buckets split across LRU shards.
+
+    A bucket evicted for space is indistinguishable from a full one, so eviction
+    can only let a client through early, never block it. Sharding keeps each
+    eviction scan and dict small when millions of distinct keys (IPs) pass through.
+    """
+
+    def __init__(
+        self,
+        max_keys: int = 100_000,
+        shards: int = 16,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.shard_size = max(1, max_keys // shards)
+        self._shards: list[OrderedDict[str, tuple[float, float]]] = [
+            OrderedDict() for _ in range(shards)
+        ]
+        self._clock = clock
+        self.evictions = 0
+
+    async def hit(self, key: str, rate: Rate, cost: float = 1.0) -> float:
+        shard = self._shards[hash(key) % len(self._shards)]
+        now = self._clock()
+        state = shard.get(key)
+        if state is None:
+            tokens = float(rate.capacity)
+        else:
+            tokens, updated = state
+            tokens = min(float(rate.capacity), tokens + (now - updated) * rate.per_second)
+            shard.move_to_end(key)
+        retry_after = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            retry_after = (cost - tokens) / rate.per_second
+        shard[key] = (tokens, now)
+        if len(shard) > self.shard_size:
+            shard.popitem(last=False)
+            self.evictions += 1
+        return retry_after
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            shard.clear()
+
+    async def close(self) -> None:
+        self.clear()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "keys": sum(len(shard) for shard in self._shards),
+            "max_keys": self.shard_size * len(self._shards),
+            "evictions": self.evictions,
+        }
+
+
+# Refill and take in one round trip; Redis' own clock keeps every worker consistent.
+# The reply is a string because Lua numbers are truncated to integers in replies.
+_TOKEN_BUCKET_LUA = b"""
+local capacity = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * per_second)
+local retry_after = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  retry_after = (cost - tokens) / per_second
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / per_second * 1000))
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimitStore(RedisBackend):
+    """Buckets shared by every worker, updated atomically by a server-side script"""
+
+    _script_sha: bytes | None = None
+
+    async def hit(self, key: str, rate: Rate, cost: float = 1.0) -> float:
+        args = (str(rate.capacity).encode(), repr(rate.per_second).encode(), repr(cost).encode())
+        if self._script_sha is None:
+            sha = await self._execute(b"SCRIPT", b"LOAD", _TOKEN_BUCKET_LUA)
+            self._script_sha = sha if isinstance(sha, bytes) else str(sha).encode()
+        try:
+            reply = await self._execute(b"EVALSHA", self._script_sha, b"1", key.encode(), *args)
+        except Exception as e:
+            if "NOSCRIPT" not in str(e):
+                raise
+            # Script cache flushed (restart / failover); EVAL also reloads it
+            reply = await self._execute(b"EVAL", _TOKEN_BUCKET_LUA, b"1", key.encode(), *args)
+        return float(reply.decode() if isinstance(reply, bytes) else str(reply))
+
+
+def create_rate_limit_store(url: str) -> RateLimitStore:
+    """Store for a rate-limit URL.
+
+    memory://?size=100000&shards=16   (per worker: limits multiply by the worker count)
+    redis://:password@host:6379/0?timeout=0.2
+    """
+    parts = urlsplit(url)
+    query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+    if parts.scheme in ("", "memory"):
+        return MemoryRateLimitStore(
+            max_keys=int(query.get("size", 100_000)), shards=int(query.get("shards", 16))
+        )
+    if parts.scheme == "redis":
+        return RedisRateLimitStore.from_url(url)
+    raise ValueError(f"Unsupported rate limit URL scheme {parts.scheme!r}")
+
+
+class RateLimiter:
+    """Checks keys against rates without touching the database.
+
+    Store errors fail open (the request is allowed and counted in stats) so a
+    Redis outage degrades to no limiting rather than to an outage of login.
+    """
+
+    def __init__(self, store: RateLimitStore, enabled: bool = True) -> None:
+        self.store = store
+        self.enabled = enabled
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+
+    async def hit(self, key: str, rate: Rate | None, cost: float = 1.0) -> float:
+        """Seconds the caller must wait, or 0 if the request may proceed"""
+        if not self.enabled or rate is None:
+            return 0.0
+        try:
+            retry_after = await self.store.hit(key, rate, cost)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Rate limit store failed, allowing request: %s", e)
+            return 0.0
+        if retry_after > 0:
+            self.limited += 1
+            return math.ceil(retry_after * 1000) / 1000
+        self.allowed += 1
+        return 0.0
+
+    async def close(self) -> None:
+        await self.store.close()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "enabled": self.enabled,
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "errors": self.errors,
+            **self.store.stats(),
+        }
+
+
+rate_limiter = RateLimiter(
+    create_rate_limit_store(settings.rate_limit_url), enabled=settings.rate_limit_enabled
+)
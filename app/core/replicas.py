@@ -0,0 +1,97 @@
+"""
+Read-replica selection with temporary ejection of failing replicas
+"""
+
+import itertools
+import time
+from collections.abc import Callable, Sequence
+from typing import Any, Literal
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import QueuePool
+
+Strategy = Literal["round_robin", "least_connections"]
+
+
+def is_disconnect(exc: BaseException) -> bool:
+    """True if an exception (or anything in its cause chain) means the server is unreachable.
+
+    Only errors the driver reports as a lost connection count, plus raw socket
+    errors from connecting; statement and lock timeouts or cancellations are
+    OperationalErrors too but say nothing about the replica's health.
+    """
+    current: BaseException | None = exc
+    while current is not None:
+        if isinstance(current, DBAPIError):
+            if current.connection_invalidated:
+                return True
+            current = current.orig
+            continue
+        if isinstance(current, OSError) and not isinstance(current, TimeoutError):
+            return True
+        current = current.__cause__
+    return False
+
+
+class ReplicaSet:
+    """Chooses a healthy read replica per session.
+
+    A replica that fails with a connection error is ejected for eject_seconds and
+    then retried; while every replica is ejected, choose() returns None and
+    callers fall back to the primary.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[AsyncEngine],
+        strategy: Strategy = "round_robin",
+        eject_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.engines = list(engines)
+        self.strategy = strategy
+        self.eject_seconds = eject_seconds
+        self._clock = clock
+        self._counter = itertools.count()
+        self._ejected_until: dict[int, float] = {}
+        self.sessionmakers: list[async_sessionmaker[AsyncSession]] = [
+            async_sessionmaker(bind=engine, expire_on_commit=False) for engine in self.engines
+        ]
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def healthy(self) -> list[int]:
+        now = self._clock()
+        return [i for i in range(len(self.engines)) if self._ejected_until.get(i, 0.0) <= now]
+
+    def choose(self) -> int | None:
+        candidates = self.healthy()
+        if not candidates:
+            return None
+        if self.strategy == "least_connections":
+            return min(candidates, key=self._checked_out)
+        return candidates[next(self._counter) % len(candidates)]
+
+    def _checked_out(self, index: int) -> int:
+        pool = self.engines[index].pool
+        return pool.checkedout() if isinstance(pool, QueuePool) else 0
+
+    def eject(self, index: int) -> None:
+        self._ejected_until[index] = self._clock() + self.eject_seconds
+
+    def stats(self) -> list[dict[str, Any]]:
+        healthy = set(self.healthy())
+        return [
+            {
+                "url": engine.url.render_as_string(hide_password=True),
+                "healthy": i in healthy,
+                "checked_out": self._checked_out(i),
+            }
+            for i, engine in enumerate(self.engines)
+        ]
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
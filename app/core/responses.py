@@ -0,0 +1,21 @@
+"""
+Response classes for pre-shaped data that skips response_model validation
+"""
+
+import orjson
+from fastapi.responses import JSONResponse
+
+# Match Pydantic's JSON for datetimes: UTC as "Z" rather than "+00:00"
+ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON encoded with orjson, as-is.
+
+    Returning a Response instance bypasses FastAPI's response_model validation
+    and serialization; the route's response_model still documents the schema,
+    so the content must already match it.
+    """
+
+    def render(self, content: object) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
@@ -0,0 +1,129 @@
+"""
+Database preparation at application startup
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, Literal
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import QueuePool
+
+from ..models import import_all
+from ..models.mixins import Base
+from .replicas import ReplicaSet
+
+logger = logging.getLogger(__name__)
+
+StartupMode = Literal["create_all", "verify", "skip"]
+
+# Alembic head the models correspond to; tests/test_startup.py keeps it in sync
+SCHEMA_REVISION = "0009_jobs"
+
+
+class SchemaMismatchError(RuntimeError):
+    """The database is not at the Alembic revision this code expects"""
+
+
+async def verify_schema(engine: AsyncEngine, expected: str = SCHEMA_REVISION) -> str:
+    """Check the Alembic revision with a single query instead of inspecting every table"""
+    try:
+        async with engine.connect() as conn:
+            revision = await conn.scalar(text("SELECT version_num FROM alembic_version"))
+    except DBAPIError as e:
+        raise SchemaMismatchError(
+            f"No alembic_version table ({e.orig!s}); run `alembic upgrade head`"
+        ) from e
+    if revision != expected:
+        raise SchemaMismatchError(
+            f"Database is at revision {revision!r}, expected {expected!r}; "
+            "run `alembic upgrade head`"
+        )
+    return expected
+
+
+async def warm_pool(
+    engine: AsyncEngine, size: int, warm: Callable[[AsyncSession], Awaitable[None]] | None = None
+) -> int:
+    """Open up to size connections at once and run warm on each before returning them.
+
+    Queries run by warm are compiled once into the engine's statement cache and
+    prepared on every warmed connection, so the first requests skip both.
+    """
+    if isinstance(engine.pool, QueuePool):
+        # Connections beyond pool_size are overflow and would be closed on return
+        size = min(size, engine.pool.size())
+    if size <= 0:
+        return 0
+
+    async def open_one() -> None:
+        async with engine.connect() as conn:
+            if warm is not None:
+                async with AsyncSession(bind=conn) as session:
+                    await warm(session)
+
+    await asyncio.gather(*(open_one() for _ in range(size)))
+    return size
+
+
+async def warm_replicas(
+    replicas: ReplicaSet, size: int, warm: Callable[[AsyncSession], Awaitable[None]] | None = None
+) -> int:
+    """Warm every replica's pool; one that fails is ejected instead of aborting startup.
+
+    Reads fall back to the other replicas (or the primary) until the ejection
+    expires, as they would for a replica that went down later.
+    """
+    results = await asyncio.gather(
+        *(warm_pool(replica, size, warm) for replica in replicas.engines), return_exceptions=True
+    )
+    warmed = 0
+    for index, result in enumerate(results):
+        if isinstance(result, BaseException):
+            replicas.eject(index)
+            logger.warning(
+                "Replica %s failed to warm up; ejected: %r",
+                replicas.engines[index].url.render_as_string(hide_password=True),
+                result,
+            )
+        else:
+            warmed += result
+    return warmed
+
+
+async def prepare_database(
+    engine: AsyncEngine,
+    mode: StartupMode,
+    min_pool_size: int = 0,
+    warm: Callable[[AsyncSession], Awaitable[None]] | None = None,
+) -> dict[str, Any]:
+    """Create or verify the schema, then warm the pool; returns timings for /health/details"""
+    started = time.perf_counter()
+    report: dict[str, Any] = {"mode": mode}
+    if mode == "create_all":
+        # Convenient in development; races between workers and bypasses Alembic
+        import_all()
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    elif mode == "verify":
+        report["revision"] = await verify_schema(engine)
+    schema_done = time.perf_counter()
+    report["schema_ms"] = round((schema_done - started) * 1000, 3)
+
+    report["warmed_connections"] = await warm_pool(engine, min_pool_size, warm)
+    finished = time.perf_counter()
+    report["warm_ms"] = round((finished - schema_done) * 1000, 3)
+    report["total_ms"] = round((finished - started) * 1000, 3)
+    logger.info(
+        "Database ready in %.1f ms (mode=%s, schema %.1f ms, %d connections warmed in %.1f ms)",
+        report["total_ms"],
+        mode,
+        report["schema_ms"],
+        report["warmed_connections"],
+        report["warm_ms"],
+    )
+    return report
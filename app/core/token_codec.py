@@ -0,0 +1,280 @@
+"""
+Compact JWS (JWT) codec over key objects built once: HS256, ES256 and EdDSA with kid rotation
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import time
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+import orjson
+
+if TYPE_CHECKING:
+    from cryptography.hazmat.primitives.asymmetric.ec import (
+        EllipticCurvePrivateKey,
+        EllipticCurvePublicKey,
+    )
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import (
+        Ed25519PrivateKey,
+        Ed25519PublicKey,
+    )
+
+
+class InvalidTokenError(ValueError):
+    """Malformed token, unknown key, bad signature or expired claims"""
+
+
+def b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def b64url_decode(data: bytes) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+    except (binascii.Error, ValueError):
+        raise InvalidTokenError("Invalid base64url segment") from None
+
+
+class SigningKey(Protocol):
+    kid: str
+    alg: str
+    can_sign: bool
+
+    def sign(self, data: bytes) -> bytes: ...
+
+    def verify(self, data: bytes, signature: bytes) -> bool: ...
+
+    def public_jwk(self) -> dict[str, str] | None: ...
+
+
+class HmacKey:
+    """Shared-secret HS256; only ever verified by this service, so never published"""
+
+    alg = "HS256"
+    can_sign = True
+
+    def __init__(self, secret: str | bytes, kid: str = "hs256") -> None:
+        self.kid = kid
+        # Keyed once: copying a primed HMAC skips re-deriving the inner/outer pads per call
+        self._mac = hmac.new(secret.encode() if isinstance(secret, str) else secret, None, "sha256")
+
+    def sign(self, data: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(data)
+        return mac.digest()
+
+    def verify(self, data: bytes, signature: bytes) -> bool:
+        return hmac.compare_digest(self.sign(data), signature)
+
+    def public_jwk(self) -> dict[str, str] | None:
+        return None
+
+
+def _thumbprint(jwk: Mapping[str, str]) -> str:
+    """RFC 7638 JWK thumbprint: a kid that follows from the key itself"""
+    canonical = orjson.dumps(dict(sorted(jwk.items())))
+    return b64url_encode(hashlib.sha256(canonical).digest()).decode()
+
+
+class Ed25519Key:
+    alg = "EdDSA"
+
+    def __init__(
+        self, public_key: "Ed25519PublicKey", private_key: "Ed25519PrivateKey | None" = None
+    ) -> None:
+        from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+        self._private = private_key
+        self._public = public_key
+        self.can_sign = private_key is not None
+        raw = self._public.public_bytes(Encoding.Raw, PublicFormat.Raw)
+        self._jwk = {"crv": "Ed25519", "kty": "OKP", "x": b64url_encode(raw).decode()}
+        self.kid = _thumbprint(self._jwk)
+
+    def sign(self, data: bytes) -> bytes:
+        if self._private is None:
+            raise InvalidTokenError(f"Key {self.kid} is verify-only")
+        return self._private.sign(data)
+
+    def verify(self, data: bytes, signature: bytes) -> bool:
+        from cryptography.exceptions import InvalidSignature
+
+        try:
+            self._public.verify(signature, data)
+        except InvalidSignature:
+            return False
+        return True
+
+    def public_jwk(self) -> dict[str, str] | None:
+        return {**self._jwk, "kid": self.kid, "alg": self.alg, "use": "sig"}
+
+
+class ES256Key:
+    """ECDSA P-256; JWS carries the raw 64-byte r||s, cryptography speaks DER"""
+
+    alg = "ES256"
+
+    def __init__(
+        self,
+        public_key: "EllipticCurvePublicKey",
+        private_key: "EllipticCurvePrivateKey | None" = None,
+    ) -> None:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec
+
+        self._private = private_key
+        self._public = public_key
+        self.can_sign = private_key is not None
+        self._ecdsa = ec.ECDSA(hashes.SHA256())
+        numbers = self._public.public_numbers()
+        self._jwk = {
+            "crv": "P-256",
+            "kty": "EC",
+            "x": b64url_encode(numbers.x.to_bytes(32, "big")).decode(),
+            "y": b64url_encode(numbers.y.to_bytes(32, "big")).decode(),
+        }
+        self.kid = _thumbprint(self._jwk)
+
+    def sign(self, data: bytes) -> bytes:
+        from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+
+        if self._private is None:
+            raise InvalidTokenError(f"Key {self.kid} is verify-only")
+        r, s = decode_dss_signature(self._private.sign(data, self._ecdsa))
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+    def verify(self, data: bytes, signature: bytes) -> bool:
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+
+        if len(signature) != 64:
+            return False
+        der = encode_dss_signature(
+            int.from_bytes(signature[:32], "big"), int.from_bytes(signature[32:], "big")
+        )
+        try:
+            self._public.verify(der, data, self._ecdsa)
+        except InvalidSignature:
+            return False
+        return True
+
+    def public_jwk(self) -> dict[str, str] | None:
+        return {**self._jwk, "kid": self.kid, "alg": self.alg, "use": "sig"}
+
+
+def load_pem_key(pem: bytes) -> SigningKey:
+    """Ed25519 or P-256 key from PEM; a private key can sign, a public key only verify"""
+    try:
+        from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+        from cryptography.hazmat.primitives.serialization import (
+            load_pem_private_key,
+            load_pem_public_key,
+        )
+    except ImportError as e:
+        raise RuntimeError("ES256/EdDSA tokens require the cryptography package") from e
+
+    private = load_pem_private_key(pem, password=None) if b"PRIVATE KEY" in pem else None
+    public = private.public_key() if private is not None else load_pem_public_key(pem)
+    if isinstance(public, ed25519.Ed25519PublicKey):
+        assert private is None or isinstance(private, ed25519.Ed25519PrivateKey)
+        return Ed25519Key(public, private)
+    if isinstance(public, ec.EllipticCurvePublicKey) and isinstance(public.curve, ec.SECP256R1):
+        assert private is None or isinstance(private, ec.EllipticCurvePrivateKey)
+        return ES256Key(public, private)
+    raise ValueError("Only Ed25519 and P-256 keys are supported")
+
+
+def load_pem_file(path: str) -> SigningKey:
+    return load_pem_key(Path(path).expanduser().read_bytes())
+
+
+def _numeric_date(value: object) -> object:
+    return int(value.timestamp()) if isinstance(value, datetime) else value
+
+
+class TokenCodec:
+    """Signs with one key and verifies with any key it knows, selected by the kid header.
+
+    The algorithm is a property of the key, never taken from the token, so a
+    token cannot pick a weaker algorithm (or "none") than its key uses. Tokens
+    without a kid, as issued before keys had one, are checked against the
+    signing key. To rotate, start verifying with the new key everywhere, then
+    sign with it, and drop the old key once its last tokens have expired.
+    """
+
+    # Encoded headers seen so far mapped to their key; almost every token shares one
+    MAX_HEADER_CACHE = 64
+
+    def __init__(self, signing_key: SigningKey, verify_keys: Iterable[SigningKey] = ()) -> None:
+        if not signing_key.can_sign:
+            raise ValueError("The signing key needs its private half")
+        self.signing_key = signing_key
+        self.keys = {key.kid: key for key in (*verify_keys, signing_key)}
+        self._header = b64url_encode(
+            orjson.dumps({"alg": signing_key.alg, "typ": "JWT", "kid": signing_key.kid})
+        )
+        self._header_keys: dict[bytes, SigningKey] = {}
+
+    def encode(self, claims: Mapping[str, object]) -> str:
+        payload = b64url_encode(orjson.dumps({k: _numeric_date(v) for k, v in claims.items()}))
+        signing_input = self._header + b"." + payload
+        signature = b64url_encode(self.signing_key.sign(signing_input))
+        return (signing_input + b"." + signature).decode()
+
+    def _key_for(self, header_segment: bytes) -> SigningKey:
+        key = self._header_keys.get(header_segment)
+        if key is not None:
+            return key
+        try:
+            header = orjson.loads(b64url_decode(header_segment))
+        except orjson.JSONDecodeError:
+            raise InvalidTokenError("Invalid header") from None
+        if not isinstance(header, dict):
+            raise InvalidTokenError("Invalid header")
+        kid = header.get("kid")
+        found = self.signing_key if kid is None else self.keys.get(kid)
+        if found is None:
+            raise InvalidTokenError("Unknown key id")
+        if header.get("alg") != found.alg:
+            raise InvalidTokenError("Algorithm does not match the key")
+        if len(self._header_keys) < self.MAX_HEADER_CACHE:
+            self._header_keys[header_segment] = found
+        return found
+
+    def decode(self, token: str, leeway: float = 0.0) -> dict[str, Any]:
+        """Verified claims of token; raises InvalidTokenError"""
+        parts = token.encode().split(b".")
+        if len(parts) != 3:
+            raise InvalidTokenError("Not a compact JWS")
+        header_segment, payload_segment, signature_segment = parts
+        key = self._key_for(header_segment)
+        if not key.verify(
+            header_segment + b"." + payload_segment, b64url_decode(signature_segment)
+        ):
+            raise InvalidTokenError("Signature verification failed")
+        try:
+            claims = orjson.loads(b64url_decode(payload_segment))
+        except orjson.JSONDecodeError:
+            raise InvalidTokenError("Invalid payload") from None
+        if not isinstance(claims, dict):
+            raise InvalidTokenError("Invalid payload")
+        try:
+            exp = float(claims["exp"]) if "exp" in claims else None
+            nbf = float(claims["nbf"]) if "nbf" in claims else None
+        except (TypeError, ValueError):
+            raise InvalidTokenError("Invalid time claim") from None
+        now = time.time()
+        if exp is not None and exp <= now - leeway:
+            raise InvalidTokenError("Token has expired")
+        if nbf is not None and nbf > now + leeway:
+            raise InvalidTokenError("Token is not yet valid")
+        return claims
+
+    def jwks(self) -> dict[str, list[dict[str, str]]]:
+        """Public keys for other services to verify tokens locally (shared secrets excluded)"""
+        return {"keys": [jwk for key in self.keys.values() if (jwk := key.public_jwk())]}
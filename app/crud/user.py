@@ -1,15 +1,23 @@
+from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..core.auth import hash_password
+from ..core.auth import hashing_pool
+from ..core.hashing import PasswordHashingBusyError
 from ..models.user import User
 from ..schemas.auth import RegisterRequest
 
 
 async def create_user(db: AsyncSession, data: RegisterRequest) -> User:
-    user = User(
-        email=data.email, full_name=data.full_name, password_hash=hash_password(data.password)
-    )
+    try:
+        password_hash = await hashing_pool.hash(data.password)
+    except PasswordHashingBusyError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        ) from None
+    user = User(email=data.email, full_name=data.full_name, password_hash=password_hash)
     db.add(user)
     await db.commit()
     await db.refresh(user)
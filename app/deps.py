@@ -1,53 +1,246 @@
-from collections.abc import AsyncGenerator
+import math
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable
 from contextlib import asynccontextmanager
-from typing import Annotated
+from typing import Annotated, Any
 
-from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .core.auth import ALGORITHM, SECRET_KEY
-from .core.db import SessionLocal, engine
-from .models.mixins import Base
-from .models.user import User
+from .core.auth import hashing_pool, principal_cache, role_claims_cache, token_codec
+from .core.config import settings
+from .core.db import SessionLocal, engine, replicas
+from .core.permissions import permission_map
+from .core.ratelimit import Rate, rate_limiter
+from .core.replicas import is_disconnect
+from .core.startup import prepare_database, warm_replicas
+from .core.token_codec import InvalidTokenError
+from .schemas.user import User
+from .services.audit_log import audit_log
+from .services.jobs import job_runner
+from .services.tokens import revocations, schedule_refresh_token_purge
+from .services.user_cache import user_cache
+from .services.user_loader import UserLoader
+from .services.user_service import UserService
+
+
+async def _warm_statements(session: AsyncSession) -> None:
+    await UserService(session).warm_up()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
-    # Ensure tables exist if you want to skip Alembic in dev (not recommended for prod)
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    started = time.perf_counter()
+    report = await prepare_database(
+        engine, settings.db_startup_mode, settings.db_pool_min_size, warm=_warm_statements
+    )
+    report["replica_connections_warmed"] = await warm_replicas(
+        replicas, settings.db_pool_min_size, _warm_statements
+    )
+    async with SessionLocal() as session:
+        await permission_map.load(session)
+    await revocations.sync()
+    revocations.start()
+    if settings.audit_log_enabled:
+        audit_log.start()
+    if settings.jobs_enabled:
+        async with SessionLocal() as session:
+            await schedule_refresh_token_purge(session)
+            await session.commit()
+        job_runner.start()
+    report["ready_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    app.state.startup = report
     yield
-    # any teardown here
+    # Let running jobs finish and flush queued audit events while the engine is still usable
+    await job_runner.close()
+    await audit_log.close()
+    await revocations.close()
+    hashing_pool.shutdown()
+    await replicas.dispose()
+    await user_cache.close()
+    await rate_limiter.close()
+
+
+READ_YOUR_WRITES_COOKIE = "db_primary"
 
 
-async def get_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_db(request: Request, response: Response) -> AsyncGenerator[AsyncSession, None]:
+    if replicas and request.method not in ("GET", "HEAD", "OPTIONS"):
+        # Pin this client's reads to the primary until the replicas have caught up
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            "1",
+            max_age=settings.db_read_your_writes_seconds,
+            httponly=True,
+            samesite="lax",
+        )
     async with SessionLocal() as session:
         yield session
 
 
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only handlers, served by a replica when one is healthy"""
+    index = None if READ_YOUR_WRITES_COOKIE in request.cookies else replicas.choose()
+    if index is None:
+        async with SessionLocal() as session:
+            yield session
+        return
+
+    async with replicas.sessionmakers[index]() as session:
+        try:
+            yield session
+        except Exception as e:
+            if is_disconnect(e):
+                replicas.eject(index)
+            raise
+
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+def _decode_token(token: str) -> dict[str, Any]:
+    try:
+        payload: dict[str, Any] = token_codec.decode(token)
+    except InvalidTokenError:
+        raise credentials_exception from None
+    if payload.get("sub") is None:
+        raise credentials_exception
+    return payload
+
+
+def _token_user_id(payload: dict[str, Any]) -> int:
+    """The subject of a decoded access token, unless its tokens were revoked since it was issued"""
+    try:
+        user_id = int(payload["sub"])
+    except ValueError:
+        raise credentials_exception from None
+    if revocations.is_revoked(user_id, payload.get("iat")):
+        raise credentials_exception
+    return user_id
+
+
+async def get_user_loader(db: Annotated[AsyncSession, Depends(get_read_db)]) -> UserLoader:
+    """One UserLoader per request; FastAPI caches the dependency within a request"""
+    return UserLoader(UserService(db))
+
+
+async def get_primary_user_loader(db: Annotated[AsyncSession, Depends(get_db)]) -> UserLoader:
+    """Loader on the primary, sharing the request's get_db session.
+
+    Authentication uses this one: a user deleted or changed on the primary must
+    not keep authenticating from a replica that has not caught up yet.
+    """
+    return UserLoader(UserService(db))
+
 
 async def get_current_user(
-    db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)
+    loader: Annotated[UserLoader, Depends(get_primary_user_loader)],
+    token: str = Depends(oauth2_scheme),
 ) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str | None = payload.get("sub")
-        if user_id is None:
+    # A cached entry means this exact token was already verified and has not expired
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached
+
+    payload = _decode_token(token)
+    user_id = _token_user_id(payload)
+    principal = await loader.load(user_id)
+    if principal is None:
+        raise credentials_exception
+    ttl = float(payload["exp"]) - time.time() if "exp" in payload else None
+    principal_cache.set(token, principal, ttl=ttl)
+    return principal
+
+
+async def get_current_user_from_claims(
+    loader: Annotated[UserLoader, Depends(get_user_loader)], token: str = Depends(oauth2_scheme)
+) -> User:
+    """Trust the signed token claims without a DB lookup (for read-only routes).
+
+    Tokens of deleted users are rejected via the revocation list, but a renamed
+    user keeps their old identity here until the token expires. Tokens issued
+    before the claims carried a version are resolved through the loader instead.
+    """
+    payload = _decode_token(token)
+    user_id = _token_user_id(payload)
+    if "ver" not in payload or "email" not in payload:
+        principal = await loader.load(user_id)
+        if principal is None:
             raise credentials_exception
-    except JWTError:
+        return principal
+    try:
+        return User(
+            id=user_id,
+            email=payload["email"],
+            full_name=payload.get("name"),
+            version=int(payload["ver"]),
+        )
+    except ValueError:
         raise credentials_exception from None
-    res = await db.execute(select(User).where(User.id == int(user_id)))
-    user = res.scalar_one_or_none()
-    if not user:
-        raise credentials_exception
-    return user
+
+
+async def get_current_roles(token: str = Depends(oauth2_scheme)) -> frozenset[str]:
+    """Role names from the token's roles claim (granted at login, kept until expiry)"""
+    roles: frozenset[str] | None = role_claims_cache.get(token)
+    if roles is None:
+        payload = _decode_token(token)
+        claimed: list[str] = payload.get("roles", [])
+        roles = frozenset(claimed)
+        ttl = float(payload["exp"]) - time.time() if "exp" in payload else None
+        role_claims_cache.set(token, roles, ttl=ttl)
+    return roles
+
+
+def require_permission(permission: str) -> Callable[..., Awaitable[User]]:
+    """Dependency factory: the current user, or 403 unless one of their roles grants permission.
+
+    Usage: ``user: Annotated[User, Depends(require_permission("users:write"))]``
+    """
+
+    async def check_permission(
+        user: Annotated[User, Depends(get_current_user)],
+        roles: Annotated[frozenset[str], Depends(get_current_roles)],
+    ) -> User:
+        if not permission_map.allows(roles, permission):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Missing permission {permission!r}",
+            )
+        return user
+
+    return check_permission
+
+
+def client_ip(request: Request) -> str:
+    # Behind a proxy, run uvicorn with --proxy-headers so this is the real client
+    return request.client.host if request.client else "unknown"
+
+
+async def enforce_rate_limit(key: str, rate: Rate | None) -> None:
+    """429 with Retry-After once key has used up rate"""
+    retry_after: float = await rate_limiter.hit(key, rate)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please retry later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def rate_limit(scope: str, rate: Rate | None) -> Callable[[Request], Awaitable[None]]:
+    """Dependency factory limiting each client IP to rate on the routes sharing scope.
+
+    Usage: ``@router.post("/login", dependencies=[Depends(rate_limit("login", rate))])``
+    """
+
+    async def check_rate_limit(request: Request) -> None:
+        await enforce_rate_limit(f"{scope}:ip:{client_ip(request)}", rate)
+
+    return check_rate_limit
@@ -1,14 +1,88 @@
-from fastapi import FastAPI
+from typing import Any
+
+from fastapi import FastAPI, Request, Response, status
+from fastapi.responses import PlainTextResponse
 
 from .api.auth import router as auth_router
 from .api.users import router as users_router
+from .core.auth import hashing_pool, principal_cache, token_codec
+from .core.compression import CompressionMiddleware
+from .core.config import settings
+from .core.db import engine, pool_stats, replicas
+from .core.metrics import MetricsMiddleware, instrument_engine, registry
+from .core.permissions import permission_map
+from .core.ratelimit import rate_limiter
 from .deps import lifespan
+from .services.audit_log import audit_log
+from .services.jobs import job_runner
+from .services.tokens import revocations
+from .services.user_cache import user_cache
 
 app: FastAPI = FastAPI(title="FastAPI + SQLAlchemy Async + Alembic", lifespan=lifespan)
 app.include_router(users_router)
 app.include_router(auth_router)
 
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=settings.compression_encoding_list,
+        minimum_size=settings.compression_minimum_size,
+        levels=settings.compression_levels,
+    )
+
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware, n_plus_one_threshold=settings.db_n_plus_one_threshold)
+    for target in (engine, *replicas.engines):
+        instrument_engine(target)
+    registry.add_collector("password_hash_pool", hashing_pool.stats)
+    registry.add_collector("auth_cache", principal_cache.stats)
+    registry.add_collector("user_cache", user_cache.stats)
+    registry.add_collector("permissions", permission_map.stats)
+    registry.add_collector("rate_limit", rate_limiter.stats)
+    registry.add_collector("audit_log", audit_log.stats)
+    registry.add_collector("token_revocations", revocations.stats)
+    registry.add_collector("jobs", job_runner.stats)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/.well-known/jwks.json", tags=["auth"])
+async def jwks(response: Response) -> dict[str, list[dict[str, str]]]:
+    """Public keys for verifying access tokens without calling this service"""
+    # Short enough that a newly added verify key is picked up well before it signs
+    response.headers["Cache-Control"] = "public, max-age=300"
+    keys: dict[str, list[dict[str, str]]] = token_codec.jwks()
+    return keys
+
 
 @app.get("/health")
 async def health() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@app.get("/health/db")
+async def health_db(response: Response) -> dict[str, Any]:
+    stats: dict[str, Any] = await pool_stats(engine)
+    stats["replicas"] = replicas.stats()
+    if stats["status"] != "ok":
+        # Fail load balancer and readiness probes while the primary is unreachable
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return stats
+
+
+@app.get("/health/details", include_in_schema=False)
+async def health_details(request: Request) -> dict[str, Any]:
+    """Startup timings and per-component counters (also exported by /metrics), for debugging"""
+    return {
+        "startup": getattr(request.app.state, "startup", {}),
+        "hashing": hashing_pool.stats(),
+        "auth_cache": principal_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "permissions": permission_map.stats(),
+        "rate_limit": rate_limiter.stats(),
+        "audit_log": audit_log.stats(),
+        "token_revocations": revocations.stats(),
+        "jobs": job_runner.stats(),
+    }
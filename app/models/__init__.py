@@ -1,19 +1,77 @@
-# Core model imports for clean starter
-from .auth import Password, Permission, Role, RolePermission, UserRole
-from .mixins import Base, TimestampMixin, UUIDMixin
-from .user import User
+# Core model imports for clean starter. Submodules load on first attribute access
+# (PEP 562) so importing one model does not pay for the others; call import_all()
+# before anything that needs the complete Base.metadata.
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .audit import AuditEvent
+    from .auth import Password, Permission, Role, RolePermission, UserRole
+    from .job import Job
+    from .mixins import Base, TimestampMixin, UUIDMixin
+    from .token import RefreshToken, TokenRevocation
+    from .user import User
+
+_EXPORTS = {
+    # Base infrastructure
+    "Base": ".mixins",
+    "TimestampMixin": ".mixins",
+    "UUIDMixin": ".mixins",
+    # Core Auth models
+    "Password": ".auth",
+    "Permission": ".auth",
+    "Role": ".auth",
+    "RolePermission": ".auth",
+    "UserRole": ".auth",
+    # User model
+    "User": ".user",
+    # Audit trail
+    "AuditEvent": ".audit",
+    # Refresh tokens and revocations
+    "RefreshToken": ".token",
+    "TokenRevocation": ".token",
+    # Background job queue
+    "Job": ".job",
+}
 
 __all__ = [
+    # Audit trail
+    "AuditEvent",
     # Base infrastructure
     "Base",
+    # Background job queue
+    "Job",
     # Core Auth models
     "Password",
     "Permission",
+    # Refresh tokens and revocations
+    "RefreshToken",
     "Role",
     "RolePermission",
     "TimestampMixin",
+    "TokenRevocation",
     "UUIDMixin",
     # User model
     "User",
     "UserRole",
+    "import_all",
 ]
+
+
+def __getattr__(name: str) -> object:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(__all__)
+
+
+def import_all() -> None:
+    """Import every model module so Base.metadata lists all tables"""
+    for module in sorted(set(_EXPORTS.values())):
+        importlib.import_module(module, __name__)
@@ -14,7 +14,7 @@ from .mixins import Base, TimestampMixin, UUIDMixin
 
 class Password(Base):
     __tablename__ = "passwords"
-    user_id: Mapped[str] = mapped_column(
+    user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), unique=True, primary_key=True
     )
     hash: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -48,6 +48,6 @@ class RolePermission(UUIDMixin, Base):
 
 class UserRole(UUIDMixin, Base):
     __tablename__ = "user_roles"
-    user_id: Mapped[str] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
     role_id: Mapped[str] = mapped_column(ForeignKey("roles.id", ondelete="CASCADE"))
     __table_args__ = (UniqueConstraint("user_id", "role_id", name="uq_user_role"),)
@@ -4,6 +4,13 @@ from pydantic import BaseModel, EmailStr
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    # Seconds until access_token expires; renew with refresh_token via POST /auth/refresh
+    expires_in: int
+    refresh_token: str
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class LoginRequest(BaseModel):
@@ -1,12 +1,80 @@
-from pydantic import BaseModel, EmailStr
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Annotated, Literal
+
+from pydantic import AfterValidator, BaseModel, EmailStr, TypeAdapter, model_validator
 
 
 class UpdateUserDto(BaseModel):
     email: str | None = None
     full_name: str | None = None
+    # Expected current version; the write is rejected with 409 if the user changed since
+    version: int | None = None
 
 
 class User(BaseModel):
     id: int
     email: EmailStr
     full_name: str | None = None
+    version: int
+    # Last write to the row; also sent as Last-Modified by the single-user routes
+    updated_at: datetime | None = None
+
+
+class UserPage(BaseModel):
+    items: list[User]
+    next_cursor: str | None = None
+
+
+_email_adapter: TypeAdapter[str] = TypeAdapter(EmailStr)
+_ASCII_LOCAL_PART = re.compile(
+    r"[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+(\.[A-Za-z0-9!#$%&'*+/=?^_`{|}~-]+)*"
+)
+
+
+@lru_cache(maxsize=4096)
+def _normalize_email_domain(domain: str) -> str:
+    return _email_adapter.validate_python(f"a@{domain}").rpartition("@")[2]
+
+
+def _validate_bulk_email(value: str) -> str:
+    """EmailStr validation with the (expensive) domain check memoized.
+
+    Bulk uploads repeat a handful of domains, so plain ASCII addresses only pay for
+    a regex on the local part; anything else takes the full EmailStr path.
+    """
+    local, _, domain = value.rpartition("@")
+    if 0 < len(local) <= 64 and len(value) <= 254 and _ASCII_LOCAL_PART.fullmatch(local):
+        return f"{local}@{_normalize_email_domain(domain)}"
+    return _email_adapter.validate_python(value)
+
+
+class BulkUserRow(BaseModel):
+    """One user in a bulk import; either a plaintext password or an existing hash"""
+
+    email: Annotated[str, AfterValidator(_validate_bulk_email)]
+    full_name: str | None = None
+    password: str | None = None
+    password_hash: str | None = None
+
+    @model_validator(mode="after")
+    def _one_password_field(self) -> "BulkUserRow":
+        if (self.password is None) == (self.password_hash is None):
+            raise ValueError("Provide exactly one of password or password_hash")
+        return self
+
+
+class BulkUserResult(BaseModel):
+    row: int
+    status: Literal["created", "exists", "invalid", "error"]
+    id: int | None = None
+    email: str | None = None
+    detail: str | None = None
+
+
+class BulkImportResponse(BaseModel):
+    created: int
+    skipped: int
+    failed: int
+    results: list[BulkUserResult]
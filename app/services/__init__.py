@@ -1,6 +1,27 @@
-# Services package
-from .user_service import UserService
+# Services package. Submodules load on first attribute access (PEP 562).
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .user_service import UserService
+
+_EXPORTS = {
+    "UserService": ".user_service",
+}
 
 __all__ = [
     "UserService",
 ]
+
+
+def __getattr__(name: str) -> object:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(__all__)
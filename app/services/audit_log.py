@@ -0,0 +1,164 @@
+"""
+Write-behind audit log: user changes are queued in memory and batch-inserted
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.db import SessionLocal
+from ..models.audit import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLog:
+    """Bounded in-process queue drained by one background task into audit_events.
+
+    record() never waits: services call it after their own commit, and the
+    event is written later in a multi-row INSERT together with everything else
+    queued within flush_interval (or as soon as batch_size events are waiting).
+    When the queue is full the event is dropped and counted instead of applying
+    backpressure to the request. Events still queued when the process is killed
+    without running the lifespan shutdown are lost; close() flushes them.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        max_queue: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+    ) -> None:
+        self.session_factory = session_factory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.high_watermark = 0
+        self.last_batch_ms = 0.0
+        self._queue: asyncio.Queue[dict[str, Any]] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self._pending: list[dict[str, Any]] = []
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run(), name="audit-log-writer")
+
+    def record(self, action: str, user_id: int | None, data: dict[str, Any] | None = None) -> None:
+        """Queue an event; a no-op until start() (e.g. in scripts and tests without lifespan)"""
+        if self._queue is None:
+            return
+        event = {
+            "occurred_at": datetime.now(tz=UTC),
+            "action": action,
+            "user_id": user_id,
+            "data": data,
+        }
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("Audit queue full; %d events dropped so far", self.dropped)
+            return
+        self.enqueued += 1
+        self.high_watermark = max(self.high_watermark, self._queue.qsize())
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+        while True:
+            # Collected into self._pending so close() can still write a half-built batch
+            self._pending.append(await queue.get())
+            deadline = loop.time() + self.flush_interval
+            while len(self._pending) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._pending.append(await asyncio.wait_for(queue.get(), timeout))
+                except TimeoutError:
+                    break
+            async with self._write_lock:
+                batch, self._pending = self._pending, []
+                await self._write(batch)
+
+    async def _write(self, events: list[dict[str, Any]]) -> None:
+        if not events:
+            return
+        started = time.perf_counter()
+        try:
+            async with self.session_factory() as session:
+                await session.execute(insert(AuditEvent), events)
+                await session.commit()
+        except Exception:
+            self.failed += len(events)
+            logger.exception("Failed to write %d audit events", len(events))
+            return
+        self.batches += 1
+        self.written += len(events)
+        self.last_batch_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    async def flush(self) -> None:
+        """Write everything queued so far without waiting for the next interval"""
+        async with self._write_lock:
+            events, self._pending = self._pending, []
+            while self._queue is not None and not self._queue.empty():
+                events.append(self._queue.get_nowait())
+            for start in range(0, len(events), self.batch_size):
+                await self._write(events[start : start + self.batch_size])
+
+    async def close(self) -> None:
+        """Stop the writer and flush what is still queued (called on lifespan shutdown)"""
+        if self._task is not None:
+            # Holding the lock means the writer is not mid-INSERT when it is cancelled
+            async with self._write_lock:
+                self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+        self._queue = None
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "high_watermark": self.high_watermark,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+            "last_batch_ms": self.last_batch_ms,
+        }
+
+
+audit_log = AuditLog(
+    SessionLocal,
+    max_queue=settings.audit_queue_size,
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval_ms / 1000,
+)
@@ -0,0 +1,116 @@
+"""
+Incremental parsers for bulk user uploads (JSON array, NDJSON and CSV)
+"""
+
+import csv
+import json
+from collections.abc import AsyncIterator
+from typing import Any, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+SUPPORTED_CONTENT_TYPES = ("application/json", "application/x-ndjson", "text/csv")
+
+
+class MalformedRecord(NamedTuple):
+    """A record that could not be parsed; reported as invalid at its row.
+
+    Streamed imports commit earlier chunks before later ones are read, so a bad
+    record must not abort the whole upload.
+    """
+
+    detail: str
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str | MalformedRecord]:
+    """Split a byte stream into decoded lines without buffering the whole body"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield _decode_line(line)
+    if buffer:
+        yield _decode_line(buffer)
+
+
+def _decode_line(line: bytes) -> str | MalformedRecord:
+    try:
+        return line.decode().rstrip("\r")
+    except UnicodeDecodeError:
+        return MalformedRecord("Line is not valid UTF-8")
+
+
+async def iter_ndjson_records(
+    lines: AsyncIterator[str | MalformedRecord],
+) -> AsyncIterator[Any]:
+    async for line in lines:
+        if isinstance(line, MalformedRecord):
+            yield line
+        elif line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield MalformedRecord("Line is not valid JSON")
+
+
+async def iter_csv_records(
+    lines: AsyncIterator[str | MalformedRecord],
+) -> AsyncIterator[dict[str, str] | MalformedRecord]:
+    """Parse CSV with a header row; quoted fields may span lines"""
+    header: list[str] | None = None
+    pending: list[str] = []
+    async for line in lines:
+        if isinstance(line, MalformedRecord):
+            if header is None:
+                raise ValueError("CSV header is not valid UTF-8")
+            # Drops the record this line belonged to; the next line starts a new one
+            pending = []
+            yield line
+            continue
+        pending.append(line)
+        # A record is complete once its quotes are balanced
+        if sum(part.count('"') for part in pending) % 2:
+            continue
+        record = "\n".join(pending)
+        pending = []
+        if not record.strip():
+            continue
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield {name: value for name, value in zip(header, values, strict=False) if value != ""}
+    if pending and header is not None:
+        yield MalformedRecord("Unterminated quoted field")
+
+
+async def parse_upload(content_type: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Yield raw user records from a request body of a supported content type"""
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type == "application/json":
+        body = b"".join([chunk async for chunk in chunks])
+        records = json.loads(body or b"[]")
+        if not isinstance(records, list):
+            raise ValueError("JSON body must be an array of users")
+        for record in records:
+            yield record
+    elif media_type == "application/x-ndjson":
+        async for record in iter_ndjson_records(iter_lines(chunks)):
+            yield record
+    elif media_type == "text/csv":
+        async for csv_record in iter_csv_records(iter_lines(chunks)):
+            yield csv_record
+    else:
+        raise ValueError(f"Unsupported content type {media_type!r}")
+
+
+async def chunked(items: AsyncIterator[T], size: int) -> AsyncIterator[list[T]]:
+    chunk: list[T] = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
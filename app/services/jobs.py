@@ -0,0 +1,258 @@
+"""
+Durable background jobs: queued in the jobs table, claimed and run by in-process workers
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.db import SessionLocal
+from ..models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AsyncSession, dict[str, Any]], Awaitable[None]]
+
+
+async def enqueue(
+    db: AsyncSession,
+    kind: str,
+    payload: dict[str, Any],
+    delay: float = 0.0,
+    max_attempts: int | None = None,
+) -> int:
+    """Queue a job in db's transaction and return its id.
+
+    The job becomes visible only when the caller commits, so it never runs for
+    a change that was rolled back. Call job_runner.notify() after the commit
+    to start it without waiting for the next poll.
+    """
+    now = datetime.now(tz=UTC)
+    job_id: int = await db.scalar(
+        insert(Job)
+        .values(
+            kind=kind,
+            payload=payload,
+            status="queued",
+            attempts=0,
+            max_attempts=max_attempts or settings.job_max_attempts,
+            run_at=now + timedelta(seconds=delay),
+        )
+        .returning(Job.id)
+    )
+    return job_id
+
+
+class JobRunner:
+    """Fixed pool of worker tasks draining the jobs table.
+
+    A worker claims the oldest due job with one UPDATE ... WHERE id = (SELECT
+    ... FOR UPDATE SKIP LOCKED), so workers in any number of processes never
+    take the same job; SQLite has no row locks but serializes writers, which
+    makes the same statement safe there. Handlers get their own session and
+    must be idempotent: a job whose worker died mid-run is claimed again once
+    its lease expires. A raising handler is retried with exponential backoff
+    and jitter until max_attempts, then marked failed.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        workers: int = 2,
+        poll_interval: float = 1.0,
+        lease: float = 300.0,
+        backoff: float = 2.0,
+        backoff_max: float = 300.0,
+        shutdown_timeout: float = 10.0,
+    ) -> None:
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.shutdown_timeout = shutdown_timeout
+        self.handlers: dict[str, JobHandler] = {}
+        self.claimed = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+        self.busy = 0
+        self.last_job_ms = 0.0
+        self._tasks: list[asyncio.Task[None]] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    def handler(self, kind: str) -> Callable[[JobHandler], JobHandler]:
+        """Register the coroutine that runs jobs of kind.
+
+        Usage: ``@job_runner.handler("tokens.purge_expired")``
+        """
+
+        def register(fn: JobHandler) -> JobHandler:
+            self.handlers[kind] = fn
+            return fn
+
+        return register
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.workers)
+        ]
+
+    def notify(self) -> None:
+        """Wake idle workers, e.g. right after committing an enqueue"""
+        self._wakeup.set()
+
+    async def _work(self) -> None:
+        while not self._stopping:
+            try:
+                if await self.run_once():
+                    continue
+            except Exception:
+                logger.exception("Job worker failed to claim or settle a job")
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            self._wakeup.clear()
+
+    async def run_once(self) -> bool:
+        """Claim and run one due job; False when none is due"""
+        job = await self._claim()
+        if job is None:
+            return False
+        job_id, kind, payload, attempts, max_attempts = job
+        self.claimed += 1
+        self.busy += 1
+        started = time.perf_counter()
+        try:
+            handler = self.handlers.get(kind)
+            if handler is None:
+                await self._settle_failure(job_id, f"No handler for job kind {kind!r}", None)
+                return True
+            try:
+                async with self.session_factory() as session:
+                    await handler(session, payload)
+            except Exception as e:
+                logger.warning("Job %d (%s) attempt %d failed: %r", job_id, kind, attempts, e)
+                retry_in = self._backoff(attempts) if attempts < max_attempts else None
+                await self._settle_failure(job_id, f"{type(e).__name__}: {e}", retry_in)
+            else:
+                await self._settle(job_id, status="succeeded", finished_at=datetime.now(tz=UTC))
+                self.succeeded += 1
+        finally:
+            self.busy -= 1
+            self.last_job_ms = round((time.perf_counter() - started) * 1000, 3)
+        return True
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_max, self.backoff * 2.0 ** (attempts - 1))
+        # Equal jitter: spread retries of jobs that failed together (e.g. a DB blip)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _claim(self) -> tuple[int, str, dict[str, Any], int, int] | None:
+        now = datetime.now(tz=UTC)
+        due = (
+            select(Job.id)
+            .where(
+                or_(
+                    and_(Job.status == "queued", Job.run_at <= now),
+                    # Claimed by a worker that never settled it (crashed or killed)
+                    and_(
+                        Job.status == "running", Job.locked_at < now - timedelta(seconds=self.lease)
+                    ),
+                )
+            )
+            .order_by(Job.run_at, Job.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with self.session_factory() as session:
+            row = (
+                await session.execute(
+                    update(Job)
+                    .where(Job.id == due)
+                    .values(status="running", locked_at=now, attempts=Job.attempts + 1)
+                    .returning(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts)
+                    .execution_options(synchronize_session=False)
+                )
+            ).one_or_none()
+            await session.commit()
+        if row is None:
+            return None
+        return row.id, row.kind, row.payload, row.attempts, row.max_attempts
+
+    async def _settle(self, job_id: int, **values: object) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .values(locked_at=None, **values)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+    async def _settle_failure(self, job_id: int, error: str, retry_in: float | None) -> None:
+        now = datetime.now(tz=UTC)
+        if retry_in is None:
+            await self._settle(job_id, status="failed", finished_at=now, last_error=error)
+            self.failed += 1
+        else:
+            run_at = now + timedelta(seconds=retry_in)
+            await self._settle(job_id, status="queued", run_at=run_at, last_error=error)
+            self.retried += 1
+
+    async def close(self) -> None:
+        """Stop claiming, give running jobs shutdown_timeout seconds, then cancel them.
+
+        A cancelled job stays "running" and is picked up again after its lease.
+        """
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=self.shutdown_timeout)
+        for task in pending:
+            task.cancel()
+        for task in pending:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "busy": self.busy,
+            "claimed": self.claimed,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "failed": self.failed,
+            "last_job_ms": self.last_job_ms,
+        }
+
+
+job_runner = JobRunner(
+    SessionLocal,
+    workers=settings.job_workers,
+    poll_interval=settings.job_poll_interval_ms / 1000,
+    lease=settings.job_lease_seconds,
+    backoff=settings.job_backoff_seconds,
+    backoff_max=settings.job_backoff_max_seconds,
+)
@@ -0,0 +1,285 @@
+"""
+Refresh-token rotation and the in-memory token revocation list
+"""
+
+import asyncio
+import contextlib
+import logging
+import secrets
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import CursorResult, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.auth import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    hash_refresh_token,
+    new_refresh_token,
+    principal_cache,
+)
+from ..core.config import settings
+from ..core.db import SessionLocal
+from ..models.job import Job
+from ..models.token import RefreshToken, TokenRevocation
+from .jobs import enqueue, job_runner
+
+logger = logging.getLogger(__name__)
+
+# Recurring job deleting expired refresh tokens; each run queues the next one
+PURGE_REFRESH_TOKENS_JOB = "tokens.purge_expired"
+
+invalid_refresh_token = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Invalid or expired refresh token",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+
+class RefreshTokenService:
+    """Single-use refresh tokens, rotated on every use.
+
+    Each login starts a family; /auth/refresh spends the presented token and
+    issues its successor in the same family. Presenting a token that was
+    already spent means it leaked (or a client raced itself), so the whole
+    family is revoked and that login has to start over.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    async def issue(self, user_id: int) -> str:
+        """Refresh token for a new login"""
+        token = await self._add(user_id, secrets.token_hex(16))
+        await self.db.commit()
+        return token
+
+    async def _add(self, user_id: int, family: str) -> str:
+        token: str
+        token, token_hash = new_refresh_token()
+        now = datetime.now(tz=UTC)
+        await self.db.execute(
+            insert(RefreshToken).values(
+                token_hash=token_hash,
+                user_id=user_id,
+                family=family,
+                issued_at=now,
+                expires_at=now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+            )
+        )
+        return token
+
+    async def rotate(self, token: str) -> tuple[int, str]:
+        """Spend token and return its user id and successor, or raise 401"""
+        token_hash = hash_refresh_token(token)
+        now = datetime.now(tz=UTC)
+        # One conditional UPDATE: of two concurrent refreshes with the same token, one wins
+        spent = (
+            await self.db.execute(
+                update(RefreshToken)
+                .where(
+                    RefreshToken.token_hash == token_hash,
+                    RefreshToken.used_at.is_(None),
+                    RefreshToken.expires_at > now,
+                )
+                .values(used_at=now)
+                .returning(RefreshToken.user_id, RefreshToken.family)
+                .execution_options(synchronize_session=False)
+            )
+        ).one_or_none()
+        if spent is None:
+            await self._revoke_family_if_reused(token_hash, now)
+            raise invalid_refresh_token
+        user_id, family = spent
+        successor = await self._add(user_id, family)
+        await self.db.commit()
+        return user_id, successor
+
+    async def _revoke_family_if_reused(self, token_hash: str, now: datetime) -> None:
+        family = await self.db.scalar(
+            select(RefreshToken.family).where(
+                RefreshToken.token_hash == token_hash, RefreshToken.used_at.is_not(None)
+            )
+        )
+        if family is None:
+            await self.db.rollback()
+            return
+        logger.warning("Spent refresh token reused; revoking its family %s", family)
+        await self.db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family == family, RefreshToken.used_at.is_(None))
+            .values(used_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.commit()
+
+
+async def revoke_user_tokens(db: AsyncSession, user_id: int, revoked_at: datetime) -> None:
+    """Reject user_id's access tokens issued before revoked_at and drop their refresh tokens.
+
+    Runs in the caller's transaction; after committing, call
+    revocations.add(user_id, revoked_at) so this worker applies it at once.
+    """
+    await db.merge(TokenRevocation(user_id=user_id, revoked_at=revoked_at))
+    await db.execute(delete(RefreshToken).where(RefreshToken.user_id == user_id))
+
+
+async def purge_expired_refresh_tokens(db: AsyncSession) -> int:
+    """Delete refresh tokens past expires_at and return how many.
+
+    Spent tokens are kept until then: reuse detection needs them, and an
+    expired token is rejected whether or not its row still exists.
+    """
+    result: CursorResult[Any] = await db.execute(  # type: ignore[assignment]
+        delete(RefreshToken)
+        .where(RefreshToken.expires_at <= datetime.now(tz=UTC))
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+async def schedule_refresh_token_purge(db: AsyncSession, delay: float = 0.0) -> None:
+    """Queue the purge job in db's transaction unless one is already waiting"""
+    pending = await db.scalar(
+        select(Job.id).where(Job.kind == PURGE_REFRESH_TOKENS_JOB, Job.status == "queued").limit(1)
+    )
+    if pending is None:
+        await enqueue(db, PURGE_REFRESH_TOKENS_JOB, {}, delay=delay)
+
+
+@job_runner.handler(PURGE_REFRESH_TOKENS_JOB)
+async def run_refresh_token_purge(db: AsyncSession, payload: dict[str, Any]) -> None:
+    # Queued in the same transaction, so a failed purge is retried rather than rescheduled
+    await schedule_refresh_token_purge(db, delay=settings.refresh_token_purge_interval_seconds)
+    deleted = await purge_expired_refresh_tokens(db)
+    await db.commit()
+    if deleted:
+        logger.info("Purged %d expired refresh tokens", deleted)
+
+
+class RevocationList:
+    """Per-user "not before" times for access tokens, mirrored from token_revocations.
+
+    is_revoked() is a dict lookup, so authentication never queries for it.
+    Revocations made in this worker apply immediately; other workers see them
+    on their next sync, at most sync_interval seconds later. Only revocations
+    younger than horizon (the access-token lifetime) are loaded: a token
+    issued before an older revocation has expired anyway, which keeps the set
+    down to recent revocations however many users were ever deleted.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        horizon: float,
+        sync_interval: float = 5.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.session_factory = session_factory
+        self.horizon = horizon
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self.syncs = 0
+        self.sync_failures = 0
+        self.rejected = 0
+        self.last_sync_ms = 0.0
+        self._not_before: dict[int, float] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def is_revoked(self, user_id: int, issued_at: float | None) -> bool:
+        """Whether a token for user_id issued at issued_at (epoch seconds) is revoked"""
+        not_before = self._not_before.get(user_id)
+        if not_before is None:
+            return False
+        # Tokens without iat predate revocation support and are treated as old
+        if issued_at is not None and issued_at >= not_before:
+            return False
+        self.rejected += 1
+        return True
+
+    def add(self, user_id: int, revoked_at: datetime) -> None:
+        not_before = revoked_at.timestamp()
+        if not_before > self._not_before.get(user_id, 0.0):
+            self._not_before[user_id] = not_before
+        principal_cache.invalidate_user(user_id)
+
+    async def sync(self) -> None:
+        """Replace the set with every revocation inside the horizon"""
+        started = time.perf_counter()
+        now = self.clock()
+        since = datetime.fromtimestamp(now - self.horizon, tz=UTC)
+        async with self.session_factory() as session:
+            rows = (
+                await session.execute(
+                    select(TokenRevocation.user_id, TokenRevocation.revoked_at).where(
+                        TokenRevocation.revoked_at > since
+                    )
+                )
+            ).all()
+        # SQLite returns naive datetimes; the column holds UTC
+        loaded = {
+            user_id: (
+                revoked_at.replace(tzinfo=UTC) if revoked_at.tzinfo is None else revoked_at
+            ).timestamp()
+            for user_id, revoked_at in rows
+        }
+        for user_id, not_before in loaded.items():
+            if self._not_before.get(user_id) != not_before:
+                # Cached principals were verified without knowing about the revocation
+                principal_cache.invalidate_user(user_id)
+        # Keep revocations this worker added while the query was running
+        for user_id, not_before in self._not_before.items():
+            if not_before >= now and user_id not in loaded:
+                loaded[user_id] = not_before
+        self._not_before = loaded
+        self.syncs += 1
+        self.last_sync_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception:
+                self.sync_failures += 1
+                logger.exception("Token revocation sync failed; keeping the previous set")
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run(), name="token-revocation-sync")
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def clear(self) -> None:
+        self._not_before.clear()
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "running": self.running,
+            "revoked_users": len(self._not_before),
+            "rejected": self.rejected,
+            "syncs": self.syncs,
+            "sync_failures": self.sync_failures,
+            "last_sync_ms": self.last_sync_ms,
+        }
+
+
+revocations = RevocationList(
+    SessionLocal,
+    horizon=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    sync_interval=settings.token_revocation_sync_seconds,
+)
@@ -0,0 +1,205 @@
+"""
+Cache-aside user lookups shared by the user service
+"""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterable
+
+from ..core.cache_backends import CacheBackend, create_backend
+from ..core.config import settings
+from ..schemas.user import User
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[User | None]]
+
+# Cached in place of a value for lookups that found no user
+_MISSING = b""
+
+
+class UserCache:
+    """Users by id and by email over a pluggable backend.
+
+    "user:id:<id>" holds the user as JSON; "user:email:<email>" holds only the id,
+    and a hit is discarded if the user found under that id has a different email,
+    so renaming an email never needs the old address to invalidate it. Lookups
+    that find nothing are cached for negative_ttl. Concurrent misses for the same
+    key in this process share one load, and backend errors degrade to misses.
+
+    Writers call invalidate() after committing; a read that loaded the old row
+    just before the commit can still store it, bounded by ttl.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | None,
+        ttl: float = 30.0,
+        negative_ttl: float = 5.0,
+        prefix: str = "user",
+    ) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._inflight: dict[str, asyncio.Future[tuple[bool, User | None]]] = {}
+
+    def _id_key(self, user_id: int) -> str:
+        return f"{self.prefix}:id:{user_id}"
+
+    def _email_key(self, email: str) -> str:
+        return f"{self.prefix}:email:{email}"
+
+    async def _get(self, key: str) -> bytes | None:
+        if self.backend is None:
+            return None
+        try:
+            value: bytes | None = await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("User cache read failed: %s", e)
+            return None
+        return value
+
+    async def _set(self, key: str, value: bytes) -> None:
+        if self.backend is None:
+            return
+        try:
+            await self.backend.set(key, value, self.negative_ttl if value == _MISSING else self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("User cache write failed: %s", e)
+
+    async def _store(self, user: User | None, *keys: str) -> None:
+        if user is None:
+            for key in keys:
+                await self._set(key, _MISSING)
+            return
+        await self._set(self._id_key(user.id), user.model_dump_json().encode())
+        await self._set(self._email_key(user.email), str(user.id).encode())
+
+    async def _load(self, key: str, load: Loader) -> User | None:
+        """Run load once per key at a time; concurrent callers wait for its result"""
+        pending = self._inflight.get(key)
+        if pending is not None:
+            loaded, user = await asyncio.shield(pending)
+            if loaded:
+                self.coalesced += 1
+                return user
+            # The leading call failed or was cancelled; load independently
+            return await load()
+
+        future: asyncio.Future[tuple[bool, User | None]] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._inflight[key] = future
+        result: tuple[bool, User | None] = (False, None)
+        try:
+            user = await load()
+            await self._store(user, key)
+            result = (True, user)
+            return user
+        finally:
+            del self._inflight[key]
+            future.set_result(result)
+
+    async def get_by_id(self, user_id: int, load: Loader) -> User | None:
+        hit, user = await self.lookup(user_id)
+        if hit:
+            return user
+        return await self._load(self._id_key(user_id), load)
+
+    async def lookup(self, user_id: int) -> tuple[bool, User | None]:
+        """(True, user) on a hit, where user is None for a cached miss; (False, None) otherwise"""
+        raw = await self._get(self._id_key(user_id))
+        if raw is None:
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, None if raw == _MISSING else User.model_validate_json(raw)
+
+    async def lookup_email(self, email: str) -> tuple[bool, User | None]:
+        """Like lookup(), through the email -> id key; a stale mapping counts as a miss"""
+        raw = await self._get(self._email_key(email))
+        if raw == _MISSING:
+            self.hits += 1
+            return True, None
+        if raw is None:
+            self.misses += 1
+            return False, None
+        hit, user = await self.lookup(int(raw))
+        if hit and user is not None and user.email == email:
+            return True, user
+        return False, None
+
+    async def store(
+        self,
+        users: Iterable[User],
+        missing_ids: Iterable[int] = (),
+        missing_emails: Iterable[str] = (),
+    ) -> None:
+        """Cache users loaded elsewhere (e.g. in a batch), and ids or emails known not to exist"""
+        for user in users:
+            await self._store(user)
+        await self._store(
+            None,
+            *(self._id_key(user_id) for user_id in missing_ids),
+            *(self._email_key(email) for email in missing_emails),
+        )
+
+    async def get_by_email(
+        self, email: str, load: Loader, load_id: Callable[[int], Awaitable[User | None]]
+    ) -> User | None:
+        key = self._email_key(email)
+        raw = await self._get(key)
+        if raw == _MISSING:
+            self.hits += 1
+            return None
+        if raw is not None:
+            user_id = int(raw)
+            user = await self.get_by_id(user_id, lambda: load_id(user_id))
+            if user is not None and user.email == email:
+                return user
+            await self.invalidate(emails=[email])
+        else:
+            self.misses += 1
+        return await self._load(key, load)
+
+    async def invalidate(self, user_ids: Iterable[int] = (), emails: Iterable[str] = ()) -> None:
+        keys = [self._id_key(user_id) for user_id in user_ids]
+        keys += [self._email_key(email) for email in emails]
+        if self.backend is None or not keys:
+            return
+        try:
+            await self.backend.delete(*keys)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("User cache invalidation failed: %s", e)
+
+    def stats(self) -> dict[str, float]:
+        lookups = self.hits + self.misses
+        stats: dict[str, float] = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 6) if lookups else 0.0,
+        }
+        if self.backend is not None:
+            stats.update({f"backend_{key}": value for key, value in self.backend.stats().items()})
+        return stats
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+
+user_cache = UserCache(
+    create_backend(settings.user_cache_url),
+    ttl=settings.user_cache_ttl_seconds,
+    negative_ttl=settings.user_cache_negative_ttl_seconds,
+)
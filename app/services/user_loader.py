@@ -0,0 +1,107 @@
+"""
+Request-scoped batching of user lookups (the dataloader pattern)
+"""
+
+import asyncio
+from collections.abc import Sequence
+
+from ..schemas.user import User
+from .user_cache import user_cache
+from .user_service import UserService
+
+
+class UserLoader:
+    """Coalesces user lookups made in the same event-loop tick into one query.
+
+    load() and load_by_email() only register the key; once every coroutine that
+    is ready has run, the pending keys are resolved together: ids and emails from
+    the user cache where possible, everything else with a single
+    UserService.find_many query. Results are memoized for the loader's lifetime,
+    so create one per request (see deps.get_user_loader) to avoid serving another
+    request's data.
+    """
+
+    def __init__(self, service: UserService) -> None:
+        self.service = service
+        self.batches = 0
+        self._by_id: dict[int, asyncio.Future[User | None]] = {}
+        self._by_email: dict[str, asyncio.Future[User | None]] = {}
+        self._pending_ids: list[int] = []
+        self._pending_emails: list[str] = []
+        self._scheduled = False
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def _schedule(self) -> None:
+        if not self._scheduled:
+            self._scheduled = True
+            asyncio.get_running_loop().call_soon(self._dispatch)
+
+    def _dispatch(self) -> None:
+        ids, self._pending_ids = self._pending_ids, []
+        emails, self._pending_emails = self._pending_emails, []
+        self._scheduled = False
+        task = asyncio.create_task(self._resolve(ids, emails))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def load(self, user_id: int) -> User | None:
+        future = self._by_id.get(user_id)
+        if future is None:
+            future = self._by_id[user_id] = asyncio.get_running_loop().create_future()
+            self._pending_ids.append(user_id)
+            self._schedule()
+        return await asyncio.shield(future)
+
+    async def load_many(self, user_ids: Sequence[int]) -> list[User | None]:
+        users: list[User | None] = await asyncio.gather(*(self.load(i) for i in user_ids))
+        return users
+
+    async def load_by_email(self, email: str) -> User | None:
+        future = self._by_email.get(email)
+        if future is None:
+            future = self._by_email[email] = asyncio.get_running_loop().create_future()
+            self._pending_emails.append(email)
+            self._schedule()
+        return await asyncio.shield(future)
+
+    async def _resolve(self, ids: list[int], emails: list[str]) -> None:
+        self.batches += 1
+        futures = [self._by_id[i] for i in ids] + [self._by_email[email] for email in emails]
+        try:
+            cached = await asyncio.gather(*(user_cache.lookup(i) for i in ids))
+            cached_emails = await asyncio.gather(*(user_cache.lookup_email(e) for e in emails))
+            missed = [i for i, (hit, _) in zip(ids, cached, strict=True) if not hit]
+            missed_emails = [
+                e for e, (hit, _) in zip(emails, cached_emails, strict=True) if not hit
+            ]
+            found = (
+                await self.service.find_many(missed, missed_emails)
+                if missed or missed_emails
+                else []
+            )
+            by_id = {user.id: user for user in found}
+            by_email = {user.email: user for user in found}
+            await user_cache.store(
+                found,
+                missing_ids=[i for i in missed if i not in by_id],
+                missing_emails=[e for e in missed_emails if e not in by_email],
+            )
+        except asyncio.CancelledError:
+            for future in futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for user_id, (hit, user) in zip(ids, cached, strict=True):
+            _resolve_future(self._by_id[user_id], user if hit else by_id.get(user_id))
+        for email, (hit, user) in zip(emails, cached_emails, strict=True):
+            _resolve_future(self._by_email[email], user if hit else by_email.get(email))
+
+
+def _resolve_future(future: "asyncio.Future[User | None]", user: User | None) -> None:
+    if not future.done():
+        future.set_result(user)
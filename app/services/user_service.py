@@ -2,14 +2,133 @@
 Simple user service for basic CRUD operations
 """
 
+import asyncio
+import csv
+import functools
+import io
+from collections.abc import AsyncIterator, Callable, Sequence
+from datetime import UTC, datetime
+from typing import Any, NamedTuple, NoReturn
+
+import asyncpg
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import ValidationError
+from sqlalchemy import (
+    Integer,
+    Row,
+    Select,
+    String,
+    any_,
+    bindparam,
+    case,
+    delete,
+    func,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 
-from ..core.auth import hash_password
+from ..core.auth import hashing_pool, principal_cache
+from ..core.hashing import PasswordHashingBusyError
+from ..core.pagination import decode_cursor, encode_cursor
 from ..models.user import User as UserModel
 from ..schemas.auth import RegisterRequest
-from ..schemas.user import UpdateUserDto, User
+from ..schemas.user import (
+    BulkImportResponse,
+    BulkUserResult,
+    BulkUserRow,
+    UpdateUserDto,
+    User,
+    UserPage,
+)
+from .audit_log import audit_log
+from .bulk_import import MalformedRecord, chunked
+from .tokens import revocations, revoke_user_tokens
+from .user_cache import user_cache
+
+EXPORT_COLUMNS = ("id", "email", "full_name")
+# Columns of the User response schema, selected directly by list endpoints
+USER_COLUMNS = (
+    UserModel.id,
+    UserModel.email,
+    UserModel.full_name,
+    UserModel.version,
+    UserModel.updated_at,
+)
+
+# Hot statements are built once with named bind parameters and executed with a
+# parameter dict, so a call skips constructing the Select and generating its cache
+# key; the engine's compiled cache (DB_COMPILED_CACHE_SIZE) then supplies the SQL
+# and asyncpg reuses one prepared statement per connection. Selecting columns
+# rather than the entity also skips the ORM identity map.
+SELECT_BY_ID = select(*USER_COLUMNS).where(UserModel.id == bindparam("user_id"))
+SELECT_BY_EMAIL = select(*USER_COLUMNS).where(UserModel.email == bindparam("email"))
+SELECT_ID_EXISTS = select(UserModel.id).where(UserModel.id == bindparam("user_id"))
+# Validators only, for conditional requests that may not need the row at all
+VALIDATOR_COLUMNS = (UserModel.id, UserModel.version, UserModel.updated_at)
+SELECT_VALIDATORS_BY_ID = select(*VALIDATOR_COLUMNS).where(UserModel.id == bindparam("user_id"))
+SELECT_VALIDATORS_BY_EMAIL = select(*VALIDATOR_COLUMNS).where(UserModel.email == bindparam("email"))
+SELECT_FIRST_PAGE = select(*USER_COLUMNS).order_by(UserModel.id).limit(bindparam("limit"))
+SELECT_PAGE_AFTER = (
+    select(*USER_COLUMNS)
+    .where(UserModel.id > bindparam("after_id"))
+    .order_by(UserModel.id)
+    .limit(bindparam("limit"))
+)
+
+
+@functools.cache
+def _find_many_statement(dialect_name: str, by_ids: bool, by_emails: bool) -> Select[Any]:
+    """Prebuilt batch lookup for each combination of criteria"""
+    criteria = []
+    if dialect_name == "postgresql":
+        # One array parameter keeps a single prepared statement for any batch size
+        if by_ids:
+            criteria.append(UserModel.id == any_(bindparam("ids", type_=ARRAY(Integer))))
+        if by_emails:
+            criteria.append(UserModel.email == any_(bindparam("emails", type_=ARRAY(String))))
+    else:
+        if by_ids:
+            criteria.append(UserModel.id.in_(bindparam("ids", expanding=True)))
+        if by_emails:
+            criteria.append(UserModel.email.in_(bindparam("emails", expanding=True)))
+    return select(*USER_COLUMNS).where(or_(*criteria))
+
+
+class VersionConflictError(HTTPException):
+    """409: the user exists but no longer has the version the write expected"""
+
+    def __init__(self) -> None:
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="User was modified by another request; reload and retry",
+        )
+
+
+class UserValidators(NamedTuple):
+    id: int
+    version: int
+    updated_at: datetime | None
+
+
+def _row_to_user(row: Row[*tuple[Any, ...]]) -> User:
+    return User(
+        id=row.id,
+        email=row.email,
+        full_name=row.full_name,
+        version=row.version,
+        updated_at=row.updated_at,
+    )
+
+
+def _dialect_insert(dialect_name: str) -> Callable[[type[UserModel]], Any]:
+    """INSERT construct supporting ON CONFLICT for the session's dialect"""
+    return pg_insert if dialect_name == "postgresql" else sqlite_insert
 
 
 class UserService:
@@ -24,36 +143,46 @@ class UserService:
             id=db_user.id,
             email=db_user.email,
             full_name=db_user.full_name,
+            version=db_user.version,
+            updated_at=db_user.updated_at,
         )
 
     async def create(self, register_request: RegisterRequest) -> User:
-        """Create a new user"""
+        """Create a new user with a single INSERT; the email unique index detects duplicates"""
         try:
-            # Check if user already exists
-            existing_user = await self.db.execute(
-                select(UserModel).where(UserModel.email == register_request.email)
+            password_hash = await hashing_pool.hash(register_request.password)
+            statement = (
+                _dialect_insert(self.db.get_bind().dialect.name)(UserModel)
+                .values(
+                    email=register_request.email,
+                    full_name=register_request.full_name,
+                    password_hash=password_hash,
+                )
+                .on_conflict_do_nothing(index_elements=["email"])
+                .returning(*USER_COLUMNS)
             )
-            if existing_user.scalar_one_or_none():
+            row = (await self.db.execute(statement)).one_or_none()
+            if row is None:
                 raise HTTPException(
                     status_code=status.HTTP_409_CONFLICT,
                     detail="User with this email already exists",
                 )
-
-            # Create new user
-            new_user = UserModel(
-                email=register_request.email,
-                full_name=register_request.full_name,
-                password_hash=hash_password(register_request.password),
-            )
-
-            self.db.add(new_user)
             await self.db.commit()
-            await self.db.refresh(new_user)
+            # Drop negative entries cached while the user did not exist
+            await user_cache.invalidate(user_ids=[row.id], emails=[row.email])
+            audit_log.record("user.created", row.id, {"email": row.email})
 
-            return self._map_to_user(new_user)
+            return _row_to_user(row)
 
         except HTTPException:
+            await self.db.rollback()
             raise
+        except PasswordHashingBusyError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry",
+                headers={"Retry-After": "1"},
+            ) from None
         except Exception as e:
             await self.db.rollback()
             raise HTTPException(
@@ -61,6 +190,195 @@ class UserService:
                 detail=f"Failed to create user: {e!s}",
             ) from e
 
+    async def bulk_create(
+        self, records: AsyncIterator[Any], chunk_size: int = 1000
+    ) -> BulkImportResponse:
+        """Validate, hash and insert users chunk by chunk, skipping existing emails.
+
+        Each chunk is committed before the next is read, so records the parser
+        could not read are reported as invalid rather than failing the import.
+        """
+        results: list[BulkUserResult] = []
+        row = 0
+        async for chunk in chunked(records, chunk_size):
+            valid: list[tuple[int, BulkUserRow]] = []
+            for record in chunk:
+                if isinstance(record, MalformedRecord):
+                    results.append(BulkUserResult(row=row, status="invalid", detail=record.detail))
+                else:
+                    try:
+                        valid.append((row, BulkUserRow.model_validate(record)))
+                    except ValidationError as e:
+                        results.append(
+                            BulkUserResult(row=row, status="invalid", detail=e.errors()[0]["msg"])
+                        )
+                row += 1
+            results.extend(await self._bulk_insert_chunk(valid))
+
+        results.sort(key=lambda result: result.row)
+        return BulkImportResponse(
+            created=sum(r.status == "created" for r in results),
+            skipped=sum(r.status == "exists" for r in results),
+            failed=sum(r.status in ("invalid", "error") for r in results),
+            results=results,
+        )
+
+    async def _bulk_insert_chunk(self, rows: list[tuple[int, BulkUserRow]]) -> list[BulkUserResult]:
+        results: list[BulkUserResult] = []
+        unique: dict[str, tuple[int, BulkUserRow]] = {}
+        for row, user in rows:
+            if user.email in unique:
+                results.append(
+                    BulkUserResult(
+                        row=row, status="exists", email=user.email, detail="Duplicate in upload"
+                    )
+                )
+            elif user.password_hash is not None and not hashing_pool.identify(user.password_hash):
+                results.append(
+                    BulkUserResult(
+                        row=row, status="invalid", email=user.email, detail="Unknown hash format"
+                    )
+                )
+            else:
+                unique[user.email] = (row, user)
+        if not unique:
+            return results
+
+        try:
+            plaintext = [user.password for _, user in unique.values() if user.password is not None]
+            hashed = iter(await hashing_pool.hash_many(plaintext))
+            values = [
+                (
+                    user.email,
+                    user.full_name,
+                    user.password_hash if user.password_hash is not None else next(hashed),
+                )
+                for _, user in unique.values()
+            ]
+            conn = await self.db.connection()
+            if conn.dialect.driver == "asyncpg":
+                inserted = await self._copy_insert(conn, values)
+            else:
+                inserted = await self._insert_ignore(conn, values)
+            await self.db.commit()
+            await user_cache.invalidate(user_ids=inserted.values(), emails=inserted)
+            for email, user_id in inserted.items():
+                audit_log.record("user.created", user_id, {"email": email, "source": "bulk"})
+
+        except PasswordHashingBusyError:
+            return results + [
+                BulkUserResult(row=row, status="error", email=email, detail="Server busy")
+                for email, (row, _) in unique.items()
+            ]
+        except Exception as e:
+            await self.db.rollback()
+            return results + [
+                BulkUserResult(row=row, status="error", email=email, detail=str(e))
+                for email, (row, _) in unique.items()
+            ]
+
+        for email, (row, _) in unique.items():
+            if email in inserted:
+                results.append(
+                    BulkUserResult(row=row, status="created", id=inserted[email], email=email)
+                )
+            else:
+                results.append(BulkUserResult(row=row, status="exists", email=email))
+        return results
+
+    @staticmethod
+    async def _driver_connection(conn: AsyncConnection) -> asyncpg.Connection:
+        """The underlying asyncpg connection, for COPY support"""
+        raw = await conn.get_raw_connection()
+        pg: asyncpg.Connection = raw.driver_connection
+        return pg
+
+    async def _copy_insert(
+        self, conn: AsyncConnection, values: list[tuple[str, str | None, str]]
+    ) -> dict[str, int]:
+        """COPY rows into a temp table, then move them across with ON CONFLICT DO NOTHING"""
+        # exec_driver_sql opens the transaction so ON COMMIT DROP scopes to this chunk
+        await conn.exec_driver_sql(
+            "CREATE TEMP TABLE users_import "
+            "(email varchar(255), full_name varchar(255), password_hash varchar(255)) "
+            "ON COMMIT DROP"
+        )
+        pg = await self._driver_connection(conn)
+        await pg.copy_records_to_table(
+            "users_import", records=values, columns=["email", "full_name", "password_hash"]
+        )
+        result = await conn.exec_driver_sql(
+            "INSERT INTO users (email, full_name, password_hash) "
+            "SELECT email, full_name, password_hash FROM users_import "
+            "ON CONFLICT (email) DO NOTHING RETURNING id, email"
+        )
+        return {row.email: row.id for row in result}
+
+    async def _insert_ignore(
+        self, conn: AsyncConnection, values: list[tuple[str, str | None, str]]
+    ) -> dict[str, int]:
+        """Multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING for other drivers"""
+        statement = (
+            _dialect_insert(conn.dialect.name)(UserModel)
+            .on_conflict_do_nothing(index_elements=["email"])
+            .returning(UserModel.id, UserModel.email)
+        )
+        # executemany + RETURNING is batched into multi-row VALUES ("insertmanyvalues")
+        result = await conn.execute(
+            statement,
+            [
+                {"email": email, "full_name": full_name, "password_hash": password_hash}
+                for email, full_name, password_hash in values
+            ],
+        )
+        return {row.email: row.id for row in result}
+
+    async def export_csv(self) -> AsyncIterator[bytes]:
+        """Stream every user as CSV, via COPY ... TO STDOUT on asyncpg"""
+        conn = await self.db.connection()
+        if conn.dialect.driver == "asyncpg":
+            async for chunk in self._copy_out(conn):
+                yield chunk
+            return
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(EXPORT_COLUMNS)
+        async for user in self.stream_all():
+            writer.writerow((user.id, user.email, user.full_name or ""))
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    async def _copy_out(self, conn: AsyncConnection) -> AsyncIterator[bytes]:
+        pg = await self._driver_connection(conn)
+        queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=16)
+
+        async def sink(data: bytes) -> None:
+            await queue.put(data)
+
+        async def copy() -> None:
+            try:
+                await pg.copy_from_query(
+                    f"SELECT {', '.join(EXPORT_COLUMNS)} FROM users ORDER BY id",
+                    output=sink,
+                    format="csv",
+                    header=True,
+                )
+            finally:
+                await queue.put(None)
+
+        task = asyncio.create_task(copy())
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+
     async def find_all(self) -> list[User]:
         """Find all users"""
         try:
@@ -74,12 +392,124 @@ class UserService:
                 detail=f"Failed to fetch users: {e!s}",
             ) from e
 
+    async def find_page(self, limit: int, cursor: str | None = None) -> UserPage:
+        """Find one page of users ordered by ID, continuing after the cursor"""
+        rows, next_cursor = await self._page_rows(limit, cursor)
+        items = [_row_to_user(row) for row in rows]
+        return UserPage(items=items, next_cursor=next_cursor)
+
+    async def find_page_rows(self, limit: int, cursor: str | None = None) -> dict[str, Any]:
+        """find_page as plain dicts shaped like UserPage, skipping model validation"""
+        rows, next_cursor = await self._page_rows(limit, cursor)
+        return {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
+
+    async def _page_rows(
+        self, limit: int, cursor: str | None
+    ) -> tuple[Sequence[Row[*tuple[Any, ...]]], str | None]:
+        after_id: int | None = None
+        if cursor is not None:
+            try:
+                after_id = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+                ) from None
+
+        try:
+            # Fetch one extra row to know whether another page exists
+            if after_id is None:
+                result = await self.db.execute(SELECT_FIRST_PAGE, {"limit": limit + 1})
+            else:
+                result = await self.db.execute(
+                    SELECT_PAGE_AFTER, {"after_id": after_id, "limit": limit + 1}
+                )
+            rows = result.all()
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to fetch users: {e!s}",
+            ) from e
+
+        next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    async def stream_all(self, batch_size: int = 1000) -> AsyncIterator[User]:
+        """Stream all users ordered by ID through a server-side cursor"""
+        async for row in self._stream_rows(batch_size):
+            yield _row_to_user(row)
+
+    async def stream_all_rows(self, batch_size: int = 1000) -> AsyncIterator[dict[str, Any]]:
+        """stream_all as plain dicts, skipping model validation"""
+        async for row in self._stream_rows(batch_size):
+            yield row._asdict()
+
+    async def _stream_rows(self, batch_size: int) -> AsyncIterator[Row[*tuple[Any, ...]]]:
+        result = await self.db.stream(
+            select(*USER_COLUMNS).order_by(UserModel.id).execution_options(yield_per=batch_size)
+        )
+        async for row in result:
+            yield row
+
+    async def search(self, q: str, limit: int = 10, prefix: bool = False) -> list[User]:
+        """Search users by email or full name, best matches first"""
+        rows = await self._search_rows(q, limit, prefix)
+        return [_row_to_user(row) for row in rows]
+
+    async def search_rows(
+        self, q: str, limit: int = 10, prefix: bool = False
+    ) -> list[dict[str, Any]]:
+        """search as plain dicts, skipping model validation"""
+        return [row._asdict() for row in await self._search_rows(q, limit, prefix)]
+
+    async def _search_rows(
+        self, q: str, limit: int, prefix: bool
+    ) -> Sequence[Row[*tuple[Any, ...]]]:
+        escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"{escaped}%" if prefix else f"%{escaped}%"
+
+        query = select(*USER_COLUMNS).where(
+            or_(
+                UserModel.email.ilike(pattern, escape="\\"),
+                UserModel.full_name.ilike(pattern, escape="\\"),
+            )
+        )
+        if self.db.get_bind().dialect.name == "postgresql":
+            # ILIKE is served by the pg_trgm GIN indexes; GREATEST skips a NULL full_name
+            query = query.order_by(
+                func.greatest(
+                    func.similarity(UserModel.email, q), func.similarity(UserModel.full_name, q)
+                ).desc(),
+                UserModel.id,
+            )
+        else:
+            # Portable fallback (e.g. SQLite in tests): prefix matches first, then shortest
+            starts_with = f"{escaped}%"
+            query = query.order_by(
+                case(
+                    (UserModel.email.ilike(starts_with, escape="\\"), 0),
+                    (UserModel.full_name.ilike(starts_with, escape="\\"), 0),
+                    else_=1,
+                ),
+                func.length(UserModel.email),
+                UserModel.id,
+            )
+
+        try:
+            result = await self.db.execute(query.limit(limit))
+            rows: Sequence[Row[*tuple[Any, ...]]] = result.all()
+            return rows
+
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to search users: {e!s}",
+            ) from e
+
     async def find_by_id(self, user_id: int) -> User | None:
-        """Find user by ID"""
+        """Find user by ID, through the user cache"""
         try:
-            result = await self.db.execute(select(UserModel).where(UserModel.id == user_id))
-            user = result.scalar_one_or_none()
-            return self._map_to_user(user) if user else None
+            return await user_cache.get_by_id(user_id, lambda: self._fetch_by_id(user_id))
 
         except Exception as e:
             raise HTTPException(
@@ -88,11 +518,11 @@ class UserService:
             ) from e
 
     async def find_by_email(self, email: str) -> User | None:
-        """Find user by email"""
+        """Find user by email, through the user cache"""
         try:
-            result = await self.db.execute(select(UserModel).where(UserModel.email == email))
-            user = result.scalar_one_or_none()
-            return self._map_to_user(user) if user else None
+            return await user_cache.get_by_email(
+                email, lambda: self._fetch_by_email(email), self._fetch_by_id
+            )
 
         except Exception as e:
             raise HTTPException(
@@ -100,28 +530,101 @@ class UserService:
                 detail=f"Failed to fetch user: {e!s}",
             ) from e
 
-    async def update(self, user_id: int, update_user_dto: UpdateUserDto) -> User:
-        """Update user"""
+    async def find_many(self, ids: Sequence[int] = (), emails: Sequence[str] = ()) -> list[User]:
+        """Every user matching any of the ids or emails, in one query (bypasses the cache)"""
+        if not ids and not emails:
+            return []
+        statement = _find_many_statement(self.db.get_bind().dialect.name, bool(ids), bool(emails))
         try:
-            result = await self.db.execute(select(UserModel).where(UserModel.id == user_id))
-            user = result.scalar_one_or_none()
+            result = await self.db.execute(statement, {"ids": list(ids), "emails": list(emails)})
+            return [_row_to_user(row) for row in result]
 
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to fetch users: {e!s}",
+            ) from e
 
-            # Update fields
-            if update_user_dto.email is not None:
-                user.email = update_user_dto.email
-            if update_user_dto.full_name is not None:
-                user.full_name = update_user_dto.full_name
+    async def find_validators(
+        self, user_id: int | None = None, email: str | None = None
+    ) -> UserValidators | None:
+        """id, version and updated_at of one user: from the user cache when it holds the id,
+        otherwise with a query that reads only those columns"""
+        try:
+            if user_id is not None:
+                hit, user = await user_cache.lookup(user_id)
+                if hit:
+                    return UserValidators(user.id, user.version, user.updated_at) if user else None
+                result = await self.db.execute(SELECT_VALIDATORS_BY_ID, {"user_id": user_id})
+            else:
+                result = await self.db.execute(SELECT_VALIDATORS_BY_EMAIL, {"email": email})
+            row = result.one_or_none()
+            return UserValidators(row.id, row.version, row.updated_at) if row else None
 
-            await self.db.commit()
-            await self.db.refresh(user)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to fetch user: {e!s}",
+            ) from e
+
+    async def warm_up(self) -> None:
+        """Run the hot lookups once (matching nothing) so they are compiled and prepared"""
+        await self._fetch_by_id(0)
+        await self._fetch_by_email("")
+        await self.find_validators(email="")
+        await self.find_many([0], [""])
+        await self._page_rows(1, None)
+
+    async def _fetch_by_id(self, user_id: int) -> User | None:
+        row = (await self.db.execute(SELECT_BY_ID, {"user_id": user_id})).one_or_none()
+        return _row_to_user(row) if row else None
+
+    async def _fetch_by_email(self, email: str) -> User | None:
+        row = (await self.db.execute(SELECT_BY_EMAIL, {"email": email})).one_or_none()
+        return _row_to_user(row) if row else None
+
+    async def update(self, user_id: int, update_user_dto: UpdateUserDto) -> User:
+        """Update user; fields left as None are unchanged"""
+        values = update_user_dto.model_dump(exclude={"version"}, exclude_none=True)
+        return await self._apply_update(user_id, values, update_user_dto.version)
 
-            return self._map_to_user(user)
+    async def patch(self, user_id: int, update_user_dto: UpdateUserDto) -> User:
+        """Partially update user; only fields present in the request are written"""
+        values = update_user_dto.model_dump(exclude={"version"}, exclude_unset=True)
+        if values.get("email", "") is None:
+            # full_name can be cleared with null, email cannot
+            del values["email"]
+        return await self._apply_update(user_id, values, update_user_dto.version)
+
+    async def _apply_update(
+        self, user_id: int, values: dict[str, Any], expected_version: int | None
+    ) -> User:
+        """Single UPDATE ... RETURNING; a version mismatch means a concurrent edit won"""
+        criteria = [UserModel.id == user_id]
+        if expected_version is not None:
+            criteria.append(UserModel.version == expected_version)
+        statement = (
+            update(UserModel)
+            .where(*criteria)
+            .values(**values, version=UserModel.version + 1)
+            .returning(*USER_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            row = (await self.db.execute(statement)).one_or_none()
+            if row is None:
+                await self._raise_missing_or_conflict(user_id, expected_version)
+            await self.db.commit()
 
         except HTTPException:
+            await self.db.rollback()
             raise
+        except IntegrityError:
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="User with this email already exists",
+            ) from None
         except Exception as e:
             await self.db.rollback()
             raise HTTPException(
@@ -129,19 +632,32 @@ class UserService:
                 detail=f"Failed to update user: {e!s}",
             ) from e
 
-    async def remove(self, user_id: int) -> None:
-        """Delete user"""
-        try:
-            result = await self.db.execute(select(UserModel).where(UserModel.id == user_id))
-            user = result.scalar_one_or_none()
-
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        principal_cache.invalidate_user(user_id)
+        await user_cache.invalidate(user_ids=[user_id], emails=[row.email])
+        audit_log.record("user.updated", user_id, {"changes": values, "version": row.version})
+        return _row_to_user(row)
 
-            await self.db.delete(user)
+    async def remove(self, user_id: int, expected_version: int | None = None) -> None:
+        """Delete user with a single DELETE ... RETURNING"""
+        criteria = [UserModel.id == user_id]
+        if expected_version is not None:
+            criteria.append(UserModel.version == expected_version)
+        statement = (
+            delete(UserModel)
+            .where(*criteria)
+            .returning(UserModel.id)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            deleted_id = (await self.db.execute(statement)).scalar_one_or_none()
+            if deleted_id is None:
+                await self._raise_missing_or_conflict(user_id, expected_version)
+            revoked_at = datetime.now(tz=UTC)
+            await revoke_user_tokens(self.db, user_id, revoked_at)
             await self.db.commit()
 
         except HTTPException:
+            await self.db.rollback()
             raise
         except Exception as e:
             await self.db.rollback()
@@ -149,3 +665,17 @@ class UserService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to delete user: {e!s}",
             ) from e
+
+        revocations.add(user_id, revoked_at)
+        await user_cache.invalidate(user_ids=[user_id])
+        audit_log.record("user.deleted", user_id)
+
+    async def _raise_missing_or_conflict(
+        self, user_id: int, expected_version: int | None
+    ) -> NoReturn:
+        """Explain a write that matched no row; only costs a query on the failure path"""
+        if expected_version is not None:
+            exists = await self.db.scalar(SELECT_ID_EXISTS, {"user_id": user_id})
+            if exists is not None:
+                raise VersionConflictError
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -0,0 +1,218 @@
+"""Load-test the API in-process and record per-endpoint latency.
+
+Seeds N users, then drives register/login/get/list/search/update through
+httpx's ASGITransport with configurable concurrency. Prints throughput and
+p50/p95/p99 per endpoint and writes JSON results (tagged with the git
+revision) that a later run can --compare against.
+
+Runs against a temporary SQLite file by default. Point --database-url at a
+throwaway Postgres database instead; every table in the app metadata is
+dropped and recreated, so never aim it at real data.
+
+    python scripts/bench_api.py --users 10000 --requests 2000 --concurrency 50
+    python scripts/bench_api.py --output bench.json --compare previous.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from benchlib import git_revision, make_engine, summarize
+from httpx import ASGITransport, AsyncClient, Response
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+SCENARIOS = ("register", "login", "get", "list", "search", "update")
+PASSWORD = "bench-password"
+
+Request = Callable[[AsyncClient, int], Awaitable[Response]]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="default: temporary SQLite file")
+    parser.add_argument("--users", type=int, default=5_000, help="users seeded before the run")
+    parser.add_argument("--requests", type=int, default=1_000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--bcrypt-rounds", type=int, default=4, help="cost of register/login")
+    parser.add_argument("--output", type=Path, default=None, help="write JSON results here")
+    parser.add_argument("--compare", type=Path, default=None, help="previous JSON results")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def scenario_requests(users: int) -> dict[str, Request]:
+    async def register(client: AsyncClient, i: int) -> Response:
+        return await client.post(
+            "/auth/register",
+            json={"email": f"new{i}@bench.example.com", "full_name": "New", "password": PASSWORD},
+        )
+
+    async def login(client: AsyncClient, i: int) -> Response:
+        user = random.randint(1, users)
+        return await client.post(
+            "/auth/login", json={"email": f"user{user}@bench.example.com", "password": PASSWORD}
+        )
+
+    async def get(client: AsyncClient, i: int) -> Response:
+        return await client.get(f"/users/{random.randint(1, users)}")
+
+    async def list_(client: AsyncClient, i: int) -> Response:
+        return await client.get("/users", params={"limit": 50})
+
+    async def search(client: AsyncClient, i: int) -> Response:
+        return await client.get("/users/search", params={"q": f"user{random.randint(1, 999)}"})
+
+    async def update(client: AsyncClient, i: int) -> Response:
+        return await client.patch(
+            f"/users/{random.randint(1, users)}", json={"full_name": f"Renamed {i}"}
+        )
+
+    return {
+        "register": register,
+        "login": login,
+        "get": get,
+        "list": list_,
+        "search": search,
+        "update": update,
+    }
+
+
+async def run_scenario(
+    client: AsyncClient, request: Request, total: int, concurrency: int
+) -> dict[str, Any]:
+    timings: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            res = await request(client, i)
+            timings.append((time.perf_counter() - started) * 1000)
+            if res.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        **summarize(timings),
+    }
+
+
+def print_results(results: dict[str, dict[str, Any]], baseline: dict[str, Any] | None) -> None:
+    header = f"{'endpoint':<10} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    if baseline:
+        header += f" {'Δp50':>8} {'Δrps':>8}"
+    print(header)
+    for name, stats in results.items():
+        line = (
+            f"{name:<10} {stats['throughput_rps']:>9.1f} {stats['p50_ms']:>9.2f} "
+            f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['errors']:>7}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous:
+            p50 = (stats["p50_ms"] / previous["p50_ms"] - 1) * 100
+            rps = (stats["throughput_rps"] / previous["throughput_rps"] - 1) * 100
+            line += f" {p50:>+7.1f}% {rps:>+7.1f}%"
+        print(line)
+
+
+async def main() -> None:
+    args = parse_args()
+    random.seed(args.seed)
+    # Settings are read at import time, so configure hashing cost before importing the app
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    # Measure the endpoints, not 429s from one client IP exhausting the login/register buckets
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    from app.core.auth import hash_password
+    from app.deps import get_db, get_read_db
+    from app.main import app
+    from app.models.mixins import Base
+    from app.models.user import User
+
+    tmpdir = tempfile.TemporaryDirectory()
+    url = args.database_url or f"sqlite+aiosqlite:///{tmpdir.name}/bench.db"
+    engine = make_engine(url)
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        password_hash = hash_password(PASSWORD)
+        for offset in range(0, args.users, 5_000):
+            await conn.execute(
+                insert(User),
+                [
+                    {
+                        "email": f"user{i}@bench.example.com",
+                        "full_name": f"Bench User {i}",
+                        "password_hash": password_hash,
+                    }
+                    for i in range(offset + 1, min(offset + 5_000, args.users) + 1)
+                ],
+            )
+
+    requests = scenario_requests(args.users)
+    results: dict[str, dict[str, Any]] = {}
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in args.scenarios:
+                results[name] = await run_scenario(
+                    client, requests[name], args.requests, args.concurrency
+                )
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+        tmpdir.cleanup()
+
+    baseline = json.loads(args.compare.read_text())["results"] if args.compare else None
+    print_results(results, baseline)
+    if args.output:
+        report = {
+            "meta": {
+                "revision": git_revision(),
+                "timestamp": datetime.now(tz=UTC).isoformat(),
+                "database": engine.url.render_as_string(hide_password=True),
+                "users": args.users,
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "bcrypt_rounds": args.bcrypt_rounds,
+            },
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+"""Compare bytes on the wire and CPU cost of each response encoding.
+
+Renders a user listing as NDJSON and CSV (the shapes /users?stream=true and
+/users/export send), then feeds it through each encoder the way
+CompressionMiddleware does for streamed bodies: one compress() call per chunk
+of --chunk rows, then finish(). Reports compressed size, ratio and median CPU
+time per encoding and level. zstd and br are skipped when the zstandard or
+brotli package is not installed.
+
+    python scripts/bench_compression.py --users 10000 --repeat 10
+"""
+
+import argparse
+import csv
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.compression import ENCODERS
+
+LEVELS = {"gzip": [1, 6, 9], "zstd": [1, 3, 9], "br": [1, 4, 9]}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000, help="rows in the listing")
+    parser.add_argument("--chunk", type=int, default=100, help="rows per streamed chunk")
+    parser.add_argument("--repeat", type=int, default=5, help="runs to median over")
+    return parser.parse_args()
+
+
+def payloads(count: int, chunk: int) -> dict[str, list[bytes]]:
+    rows = [
+        {
+            "id": i,
+            "email": f"user{i}@bench.example.com",
+            "full_name": f"Bench User {i}",
+            "version": 1,
+            "updated_at": "2026-01-01T00:00:00Z",
+        }
+        for i in range(1, count + 1)
+    ]
+    ndjson = [json.dumps(row) + "\n" for row in rows]
+    out = io.StringIO()
+    writer = csv.writer(out)
+    csv_lines = []
+    for row in rows:
+        writer.writerow(row.values())
+        csv_lines.append(out.getvalue())
+        out.seek(0)
+        out.truncate()
+    return {
+        name: ["".join(lines[i : i + chunk]).encode() for i in range(0, len(lines), chunk)]
+        for name, lines in (("ndjson", ndjson), ("csv", csv_lines))
+    }
+
+
+def encode(encoding: str, level: int, chunks: list[bytes]) -> tuple[int, float]:
+    """Compressed size and CPU milliseconds for one pass over chunks"""
+    started = time.process_time()
+    encoder = ENCODERS[encoding](level)
+    size = sum(len(encoder.compress(chunk)) for chunk in chunks) + len(encoder.finish())
+    return size, (time.process_time() - started) * 1000
+
+
+def main() -> None:
+    args = parse_args()
+    print(f"{'payload':<8} {'encoding':<10} {'bytes':>11} {'ratio':>7} {'cpu ms':>9} {'MB/s':>8}")
+    for payload, chunks in payloads(args.users, args.chunk).items():
+        raw = sum(len(chunk) for chunk in chunks)
+        print(f"{payload:<8} {'identity':<10} {raw:>11} {1:>7.2f} {0:>9.2f} {'-':>8}")
+        for encoding, levels in LEVELS.items():
+            for level in levels:
+                try:
+                    runs = [encode(encoding, level, chunks) for _ in range(args.repeat)]
+                except RuntimeError as e:
+                    print(f"{payload:<8} {encoding:<10} skipped: {e}")
+                    break
+                size = runs[0][0]
+                cpu_ms = statistics.median(ms for _, ms in runs)
+                throughput = raw / 1_000_000 / (cpu_ms / 1000) if cpu_ms else float("inf")
+                label = f"{encoding}-{level}"
+                print(
+                    f"{payload:<8} {label:<10} {size:>11} {raw / size:>7.2f} "
+                    f"{cpu_ms:>9.2f} {throughput:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Compare encode/decode throughput of TokenCodec with python-jose.
+
+For each algorithm, signs and verifies the claims login puts in an access
+token, in two ways:
+
+- jose:   jwt.encode / jwt.decode with the key passed as a string, which is
+          re-parsed into a key object on every call (the previous path)
+- codec:  app.core.token_codec.TokenCodec with the key built once
+
+EdDSA is codec-only (python-jose has no Ed25519 support).
+
+    python scripts/bench_jwt.py --ops 20000
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from pathlib import Path
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+)
+from jose import jwt
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.token_codec import HmacKey, TokenCodec, load_pem_key
+
+SECRET = "CHANGE_ME_SUPER_SECRET"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ops", type=int, default=5_000, help="operations per mode and round")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds to median over")
+    return parser.parse_args()
+
+
+def claims() -> dict[str, object]:
+    return {
+        "sub": "42",
+        "email": "user42@bench.example.com",
+        "ver": 3,
+        "roles": ["admin", "editor"],
+        "name": "Bench User",
+        "exp": datetime.now(tz=UTC) + timedelta(minutes=15),
+        "iat": round(time.time(), 3),
+    }
+
+
+def ops_per_sec(fn: Callable[[], object], ops: int, rounds: int) -> float:
+    fn()
+    results = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(ops):
+            fn()
+        results.append(ops / (time.perf_counter() - started))
+    return statistics.median(results)
+
+
+def main() -> None:
+    args = parse_args()
+    ec_private = ec.generate_private_key(ec.SECP256R1())
+    ec_private_pem = ec_private.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+    ec_public_pem = ec_private.public_key().public_bytes(
+        Encoding.PEM, PublicFormat.SubjectPublicKeyInfo
+    )
+    ed_private_pem = ed25519.Ed25519PrivateKey.generate().private_bytes(
+        Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()
+    )
+    payload = claims()
+
+    cases: dict[str, tuple[TokenCodec, tuple[str, str] | None]] = {
+        "HS256": (TokenCodec(HmacKey(SECRET)), (SECRET, SECRET)),
+        "ES256": (
+            TokenCodec(load_pem_key(ec_private_pem)),
+            (ec_private_pem.decode(), ec_public_pem.decode()),
+        ),
+        "EdDSA": (TokenCodec(load_pem_key(ed_private_pem)), None),
+    }
+    print(f"{'alg':<6} {'op':<7} {'jose ops/s':>11} {'codec ops/s':>12} {'speedup':>8}")
+    for alg, (codec, jose_keys) in cases.items():
+        token = codec.encode(payload)
+        codec_rates = {
+            "encode": ops_per_sec(partial(codec.encode, payload), args.ops, args.rounds),
+            "decode": ops_per_sec(partial(codec.decode, token), args.ops, args.rounds),
+        }
+        jose_rates: dict[str, float | None] = {"encode": None, "decode": None}
+        if jose_keys is not None:
+            signing, verifying = jose_keys
+            jose_token = jwt.encode(payload, signing, algorithm=alg)
+            jose_rates = {
+                "encode": ops_per_sec(
+                    partial(jwt.encode, payload, signing, algorithm=alg), args.ops, args.rounds
+                ),
+                "decode": ops_per_sec(
+                    partial(jwt.decode, jose_token, verifying, algorithms=[alg]),
+                    args.ops,
+                    args.rounds,
+                ),
+            }
+        for op, rate in codec_rates.items():
+            baseline = jose_rates[op]
+            jose_col = f"{baseline:>11.0f}" if baseline else f"{'n/a':>11}"
+            speedup = f"{rate / baseline:>7.2f}x" if baseline else f"{'-':>8}"
+            print(f"{alg:<6} {op:<7} {jose_col} {rate:>12.0f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Measure UserService.search latency (p50/p99) as the users table grows.
+
+Runs against in-memory SQLite by default. Point --database-url at a throwaway
+Postgres database to exercise the pg_trgm indexes; the script creates and drops
+every table in the app metadata, so never aim it at real data.
+
+    python scripts/bench_search.py --sizes 1000 10000 100000
+    python scripts/bench_search.py --database-url postgresql+asyncpg://.../bench
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+
+from benchlib import make_engine, percentile
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.models.mixins import Base
+from app.models.user import User
+from app.services.user_service import UserService
+
+FIRST_NAMES = ["alice", "bob", "carol", "dave", "erin", "frank", "grace", "heidi", "ivan", "judy"]
+
+
+def random_user(i: int) -> dict[str, str]:
+    first = random.choice(FIRST_NAMES)
+    last = "".join(random.choices(string.ascii_lowercase, k=7))
+    return {
+        "email": f"{first}.{last}{i}@example.com",
+        "full_name": f"{first.title()} {last.title()}",
+        "password_hash": "x",
+    }
+
+
+async def seed(engine: AsyncEngine, start: int, stop: int, batch: int = 5000) -> None:
+    async with engine.begin() as conn:
+        for offset in range(start, stop, batch):
+            rows = [random_user(i) for i in range(offset, min(offset + batch, stop))]
+            await conn.execute(insert(User), rows)
+        if engine.dialect.name == "postgresql":
+            await conn.exec_driver_sql("ANALYZE users")
+
+
+async def measure(
+    sessions: async_sessionmaker, queries: list[str], limit: int, prefix: bool
+) -> list[float]:
+    timings: list[float] = []
+    async with sessions() as db:
+        service = UserService(db)
+        for q in queries:
+            started = time.perf_counter()
+            await service.search(q, limit=limit, prefix=prefix)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite+aiosqlite://")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    engine = make_engine(args.database_url)
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    print(f"{'rows':>9} {'mode':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    seeded = 0
+    try:
+        for size in sorted(args.sizes):
+            await seed(engine, seeded, size)
+            seeded = size
+            substrings = [random.choice(FIRST_NAMES)[1:4] for _ in range(args.queries)]
+            prefixes = [random.choice(FIRST_NAMES)[:3] for _ in range(args.queries)]
+            for mode, queries, prefix in (
+                ("contains", substrings, False),
+                ("prefix", prefixes, True),
+            ):
+                timings = await measure(sessions, queries, args.limit, prefix)
+                print(
+                    f"{size:>9} {mode:>9} "
+                    f"{statistics.median(timings):>9.2f} {percentile(timings, 99):>9.2f}"
+                )
+    finally:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""Compare per-row cost of list responses: Pydantic models vs. the orjson fast path.
+
+Rows are selected once from an in-memory SQLite database, then served by two
+routes of a throwaway FastAPI app over ASGITransport:
+
+- model: rows -> User models -> UserPage -> response_model validation -> JSON
+- fast:  rows -> dicts -> FastJSONResponse (what FAST_JSON_RESPONSES=true does)
+
+The database is not part of the timing, so the difference is serialization only.
+
+    python scripts/bench_serialization.py --sizes 1000 10000 100000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from benchlib import make_engine
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import Row, insert, select
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi import FastAPI
+
+from app.core.responses import FastJSONResponse
+from app.models.mixins import Base
+from app.models.user import User as UserModel
+from app.schemas.user import User, UserPage
+from app.services.user_service import USER_COLUMNS
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=10, help="requests per size and mode")
+    return parser.parse_args()
+
+
+async def select_rows(count: int) -> list[Row[Any]]:
+    engine = make_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(
+            insert(UserModel),
+            [
+                {
+                    "email": f"user{i}@bench.example.com",
+                    "full_name": f"Bench User {i}",
+                    "password_hash": "x",
+                }
+                for i in range(count)
+            ],
+        )
+        rows = list((await conn.execute(select(*USER_COLUMNS).order_by(UserModel.id))).all())
+    await engine.dispose()
+    return rows
+
+
+def build_app(rows: list[Row[Any]]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/model", response_model=UserPage)
+    async def model() -> UserPage:
+        items = [
+            User(id=row.id, email=row.email, full_name=row.full_name, version=row.version)
+            for row in rows
+        ]
+        return UserPage(items=items, next_cursor=None)
+
+    @app.get("/fast", response_model=UserPage)
+    async def fast() -> FastJSONResponse:
+        return FastJSONResponse({"items": [row._asdict() for row in rows], "next_cursor": None})
+
+    return app
+
+
+async def measure(client: AsyncClient, path: str, repeat: int) -> float:
+    """Median milliseconds per request"""
+    timings: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        res = await client.get(path)
+        timings.append((time.perf_counter() - started) * 1000)
+        res.raise_for_status()
+    return statistics.median(timings)
+
+
+async def main() -> None:
+    args = parse_args()
+    header = f"{'rows':>8} {'model ms':>10} {'fast ms':>10} {'model µs/row':>13}"
+    print(header + f" {'fast µs/row':>12} {'speedup':>8}")
+    for size in args.sizes:
+        rows = await select_rows(size)
+        transport = ASGITransport(app=build_app(rows))
+        async with AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Warm up both routes before timing
+            await client.get("/model")
+            await client.get("/fast")
+            model_ms = await measure(client, "/model", args.repeat)
+            fast_ms = await measure(client, "/fast", args.repeat)
+        print(
+            f"{size:>8} {model_ms:>10.2f} {fast_ms:>10.2f} {model_ms * 1000 / size:>13.3f} "
+            f"{fast_ms * 1000 / size:>12.3f} {model_ms / fast_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
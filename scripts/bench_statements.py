@@ -0,0 +1,134 @@
+"""Measure per-call cost of a primary-key lookup with and without prebuilt statements.
+
+Runs find-by-id lookups against one seeded table in three ways:
+
+- rebuilt:   select(User).where(User.id == x) built per call, ORM entity loaded
+             (how UserService looked up users before the prebuilt statements)
+- uncached:  the same, on an engine with the compiled cache disabled, to show
+             what SQLAlchemy's compiled cache is already saving
+- prebuilt:  UserService._fetch_by_id, executing SELECT_BY_ID with a parameter dict
+
+Uses in-memory SQLite by default, where the round trip is cheap and the Python
+overhead dominates. Against Postgres via asyncpg the script also reports how
+many prepared statements the connection holds afterwards; one per statement
+shape (not one per call) confirms the prepared statements are reused.
+
+    python scripts/bench_statements.py --calls 20000
+    python scripts/bench_statements.py --database-url postgresql+asyncpg://... --users 10000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from benchlib import make_engine
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.models.mixins import Base
+from app.models.user import User as UserModel
+from app.schemas.user import User
+from app.services.user_service import UserService
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite+aiosqlite://")
+    parser.add_argument("--users", type=int, default=1_000, help="rows to seed")
+    parser.add_argument("--calls", type=int, default=10_000, help="lookups per mode and round")
+    parser.add_argument("--rounds", type=int, default=5, help="rounds to median over")
+    return parser.parse_args()
+
+
+async def seed(engine: AsyncEngine, count: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=[UserModel.__table__])
+        await conn.run_sync(Base.metadata.create_all, tables=[UserModel.__table__])
+        await conn.execute(
+            insert(UserModel),
+            [
+                {
+                    "email": f"user{i}@bench.example.com",
+                    "full_name": f"User {i}",
+                    "password_hash": "x",
+                }
+                for i in range(count)
+            ],
+        )
+
+
+async def rebuilt_lookup(session: AsyncSession, user_id: int) -> User | None:
+    result = await session.execute(select(UserModel).where(UserModel.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is None:
+        return None
+    return User(id=user.id, email=user.email, full_name=user.full_name, version=user.version)
+
+
+async def measure(
+    engine: AsyncEngine,
+    lookup: Callable[[AsyncSession, int], Awaitable[User | None]],
+    ids: list[int],
+    rounds: int,
+) -> float:
+    """Median microseconds per lookup"""
+    per_call: list[float] = []
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        await lookup(session, ids[0])  # compile and prepare outside the timing
+        for _ in range(rounds):
+            started = time.perf_counter()
+            for user_id in ids:
+                await lookup(session, user_id)
+            per_call.append((time.perf_counter() - started) * 1_000_000 / len(ids))
+            # Keep the identity map from growing across rounds
+            session.expunge_all()
+    return statistics.median(per_call)
+
+
+async def prepared_statements(engine: AsyncEngine) -> int | None:
+    if engine.dialect.driver != "asyncpg":
+        return None
+    async with AsyncSession(engine) as session:
+        service = UserService(session)
+        for user_id in range(1, 51):
+            await service._fetch_by_id(user_id)
+        count: int = await session.scalar(text("SELECT count(*) FROM pg_prepared_statements"))
+    return count
+
+
+async def main() -> None:
+    args = parse_args()
+    engine = make_engine(args.database_url)
+    await seed(engine, args.users)
+    # Shares the pool (and an in-memory database) but bypasses the compiled cache
+    uncached = engine.execution_options(compiled_cache=None)
+    ids = [random.randint(1, args.users) for _ in range(args.calls)]
+
+    async def prebuilt(session: AsyncSession, user_id: int) -> User | None:
+        return await UserService(session)._fetch_by_id(user_id)
+
+    results = {
+        "uncached": await measure(uncached, rebuilt_lookup, ids, args.rounds),
+        "rebuilt": await measure(engine, rebuilt_lookup, ids, args.rounds),
+        "prebuilt": await measure(engine, prebuilt, ids, args.rounds),
+    }
+    print(f"{'mode':<10} {'µs/call':>10} {'vs rebuilt':>11}")
+    for mode, micros in results.items():
+        print(f"{mode:<10} {micros:>10.1f} {results['rebuilt'] / micros:>10.2f}x")
+    statements = await prepared_statements(engine)
+    if statements is not None:
+        print(f"prepared statements on the connection after 50 lookups: {statements}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+"""Helpers shared by the benchmark scripts in this directory."""
+
+import statistics
+import subprocess
+
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+
+def make_engine(url: str) -> AsyncEngine:
+    """Engine for a benchmark URL; in-memory SQLite shares one connection"""
+    if url.startswith("sqlite") and (url.endswith("://") or ":memory:" in url):
+        return create_async_engine(
+            url, connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+    return create_async_engine(url)
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def summarize(timings_ms: list[float]) -> dict[str, float]:
+    return {
+        "mean_ms": round(statistics.fmean(timings_ms), 3),
+        "p50_ms": round(percentile(timings_ms, 50), 3),
+        "p95_ms": round(percentile(timings_ms, 95), 3),
+        "p99_ms": round(percentile(timings_ms, 99), 3),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
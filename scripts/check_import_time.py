@@ -0,0 +1,102 @@
+"""Report where cold-start import time goes and fail if it exceeds a budget.
+
+Imports the app in fresh interpreters with `python -X importtime`, takes the
+median of several runs and prints:
+
+- the total cumulative time of the imported module (the budgeted number)
+- self time grouped by top-level package (fastapi, sqlalchemy, app, ...)
+- the slowest modules by cumulative time
+
+Exits with status 1 when the median exceeds --budget-ms, so CI can catch a new
+eager import before it reaches a scale-to-zero deployment.
+
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --budget-ms 800 --runs 9 --top 20
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class ImportRecord:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main", help="module to import")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="fail above this median")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to median over")
+    parser.add_argument("--top", type=int, default=15, help="rows per breakdown table")
+    return parser.parse_args()
+
+
+def import_once(module: str) -> list[ImportRecord]:
+    """Records for module and everything it imported, in -X importtime order"""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    records = []
+    for line in out.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append(ImportRecord(name, int(self_us), int(cumulative_us), len(indent)))
+
+    # Children are printed before their parent, so the module's subtree is the
+    # run of deeper records directly above its own line
+    root = next(i for i in range(len(records) - 1, -1, -1) if records[i].name == module)
+    start = root
+    while start > 0 and records[start - 1].depth > records[root].depth:
+        start -= 1
+    return records[start : root + 1]
+
+
+def main() -> None:
+    args = parse_args()
+    runs = [import_once(args.module) for _ in range(args.runs)]
+    totals_ms = [run[-1].cumulative_us / 1000 for run in runs]
+    median_ms = statistics.median(totals_ms)
+    # Break down the run closest to the median rather than averaging module trees
+    run = min(runs, key=lambda r: abs(r[-1].cumulative_us / 1000 - median_ms))
+
+    by_package: dict[str, int] = defaultdict(int)
+    for record in run:
+        by_package[record.name.split(".")[0]] += record.self_us
+    print(f"{'package':<32} {'self ms':>10} {'share':>7}")
+    for package, self_us in sorted(by_package.items(), key=lambda kv: -kv[1])[: args.top]:
+        share = self_us / run[-1].cumulative_us
+        print(f"{package:<32} {self_us / 1000:>10.1f} {share:>6.1%}")
+
+    print(f"\n{'module':<48} {'cumulative ms':>14}")
+    for record in sorted(run, key=lambda r: -r.cumulative_us)[1 : args.top + 1]:
+        print(f"{record.name:<48} {record.cumulative_us / 1000:>14.1f}")
+
+    runs_ms = ", ".join(f"{ms:.0f}" for ms in totals_ms)
+    print(f"\nimport {args.module}: median {median_ms:.1f} ms over {args.runs} runs ({runs_ms})")
+    if median_ms > args.budget_ms:
+        print(f"FAIL: over the {args.budget_ms:.0f} ms budget", file=sys.stderr)
+        sys.exit(1)
+    print(f"OK: within the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
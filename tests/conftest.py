@@ -1,2 +1,124 @@
 # Test configuration file
-# No database fixtures needed for basic app tests
+# Database tests run against an in-memory SQLite database shared through a StaticPool
+import os
+
+# Keep bcrypt cheap in tests; must be set before app settings are loaded
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# The SQLite test databases are built from the models, not the (Postgres) migrations
+os.environ.setdefault("DB_STARTUP_MODE", "create_all")
+
+from collections.abc import AsyncGenerator, Awaitable, Callable, Iterator
+from typing import Any
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.pool import StaticPool
+
+from app.api import auth, users
+from app.core.auth import principal_cache, role_claims_cache
+from app.core.cache_backends import MemoryBackend
+from app.core.db import enable_sqlite_foreign_keys
+from app.core.ratelimit import MemoryRateLimitStore, rate_limiter
+from app.deps import get_db, get_read_db
+from app.models.mixins import Base
+from app.services.tokens import revocations
+from app.services.user_cache import user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches() -> None:
+    principal_cache.clear()
+    role_claims_cache.clear()
+    # Each test gets a fresh database, so ids cached by an earlier test would be stale
+    user_cache.backend = MemoryBackend()
+    # Every test client shares one address, so buckets would carry over between tests
+    rate_limiter.store = MemoryRateLimitStore()
+    # User ids restart in every fresh database
+    revocations.clear()
+
+
+@pytest.fixture
+async def engine() -> AsyncGenerator[AsyncEngine, None]:
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    enable_sqlite_foreign_keys(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def count_statements(engine: AsyncEngine) -> Iterator[list[str]]:
+    """SQL sent by the test engine, in order; clear() it before the part under test"""
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def session_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
+@pytest.fixture
+async def db(
+    session_factory: async_sessionmaker[AsyncSession],
+) -> AsyncGenerator[AsyncSession, None]:
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def test_app(session_factory: async_sessionmaker[AsyncSession]) -> FastAPI:
+    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        async with session_factory() as session:
+            yield session
+
+    test_app = FastAPI()
+    test_app.include_router(auth.router)
+    test_app.include_router(users.router)
+    test_app.dependency_overrides[get_db] = override_get_db
+    test_app.dependency_overrides[get_read_db] = override_get_db
+    return test_app
+
+
+@pytest.fixture
+async def client(test_app: FastAPI) -> AsyncGenerator[AsyncClient, None]:
+    async with AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test") as c:
+        yield c
+
+
+Login = Callable[..., Awaitable[dict[str, Any]]]
+
+
+@pytest.fixture
+def login(client: AsyncClient) -> Login:
+    """Register the user unless it exists, log in, and return the token response"""
+
+    async def login(email: str = "me@example.com", password: str = "password123") -> dict[str, Any]:
+        await client.post(
+            "/auth/register", json={"email": email, "full_name": "Me", "password": password}
+        )
+        res = await client.post("/auth/login", json={"email": email, "password": password})
+        assert res.status_code == 200
+        tokens: dict[str, Any] = res.json()
+        return tokens
+
+    return login
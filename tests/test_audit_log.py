@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.audit import AuditEvent
+from app.services.audit_log import AuditLog, audit_log
+
+
+async def _actions(session_factory: async_sessionmaker[AsyncSession]) -> list[tuple[str, int]]:
+    async with session_factory() as session:
+        rows = await session.execute(
+            select(AuditEvent.action, AuditEvent.user_id).order_by(AuditEvent.id)
+        )
+        return [(action, user_id) for action, user_id in rows]
+
+
+async def test_events_are_written_in_batches(session_factory: async_sessionmaker[AsyncSession]):
+    log = AuditLog(session_factory, flush_interval=0.05)
+    log.start()
+    for user_id in range(3):
+        log.record("user.updated", user_id, {"changes": {"full_name": "x"}})
+    assert await _actions(session_factory) == []
+
+    await asyncio.sleep(0.2)
+    assert len(await _actions(session_factory)) == 3
+    assert log.stats()["batches"] == 1
+    await log.close()
+
+
+async def test_full_batch_is_written_before_the_interval(
+    session_factory: async_sessionmaker[AsyncSession],
+):
+    log = AuditLog(session_factory, batch_size=2, flush_interval=60)
+    log.start()
+    log.record("user.created", 1)
+    log.record("user.created", 2)
+    for _ in range(50):
+        await asyncio.sleep(0.01)
+        if log.written:
+            break
+    assert await _actions(session_factory) == [("user.created", 1), ("user.created", 2)]
+    await log.close()
+
+
+async def test_full_queue_drops_and_close_flushes(
+    session_factory: async_sessionmaker[AsyncSession],
+):
+    log = AuditLog(session_factory, max_queue=2, flush_interval=60)
+    log.start()
+    for user_id in range(5):
+        log.record("user.deleted", user_id)
+    stats = log.stats()
+    assert (stats["enqueued"], stats["dropped"], stats["high_watermark"]) == (2, 3, 2)
+
+    await log.close()
+    assert await _actions(session_factory) == [("user.deleted", 0), ("user.deleted", 1)]
+    assert not log.running
+    # Stopped: further events are ignored rather than queued forever
+    log.record("user.deleted", 9)
+    assert log.stats()["enqueued"] == 2
+
+
+async def test_user_changes_are_audited(
+    client: AsyncClient,
+    session_factory: async_sessionmaker[AsyncSession],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(audit_log, "session_factory", session_factory)
+    audit_log.start()
+    try:
+        res = await client.post(
+            "/auth/register", json={"email": "audit@example.com", "password": "password123"}
+        )
+        user_id = res.json()["id"]
+        await client.put(f"/users/{user_id}", json={"full_name": "Audited"})
+        await client.delete(f"/users/{user_id}")
+    finally:
+        await audit_log.close()
+
+    assert await _actions(session_factory) == [
+        ("user.created", user_id),
+        ("user.updated", user_id),
+        ("user.deleted", user_id),
+    ]
+    async with session_factory() as session:
+        update = await session.scalar(
+            select(AuditEvent.data).where(AuditEvent.action == "user.updated")
+        )
+    assert update == {"changes": {"full_name": "Audited"}, "version": 2}
@@ -0,0 +1,91 @@
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Annotated, Any
+
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import principal_cache, token_codec
+from app.core.cache import PrincipalCache, TTLCache
+from app.deps import get_current_user_from_claims
+from app.models.user import User as UserModel
+from app.schemas.user import User
+
+
+def test_ttl_cache_evicts_lru_and_expires():
+    now = [0.0]
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_principal_cache_invalidates_every_token_of_a_user():
+    cache = PrincipalCache(max_size=10, ttl=60)
+    alice = User(id=1, email="alice@example.com", version=1)
+    cache.set("t1", alice)
+    cache.set("t2", alice)
+    cache.set("t3", User(id=2, email="bob@example.com", version=1))
+
+    cache.invalidate_user(1)
+    assert cache.get("t1") is None and cache.get("t2") is None
+    assert cache.get("t3") is not None
+
+
+async def test_current_user_is_served_from_cache(
+    client: AsyncClient, db: AsyncSession, login: Callable[..., Awaitable[dict[str, Any]]]
+):
+    tokens = await login()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    assert (await client.get("/auth/me", headers=headers)).json()["email"] == "me@example.com"
+
+    # Bypass the service so no invalidation fires; the cached principal still answers
+    await db.execute(delete(UserModel))
+    await db.commit()
+    hits = principal_cache.hits
+    res = await client.get("/auth/me", headers=headers)
+    assert res.status_code == 200
+    assert principal_cache.hits == hits + 1
+
+
+async def test_update_and_remove_invalidate_cached_principal(
+    client: AsyncClient, login: Callable[..., Awaitable[dict[str, Any]]]
+):
+    tokens = await login()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    await client.get("/auth/me", headers=headers)
+
+    await client.put("/users/1", json={"full_name": "Renamed"})
+    assert (await client.get("/auth/me", headers=headers)).json()["full_name"] == "Renamed"
+
+    await client.delete("/users/1")
+    assert (await client.get("/auth/me", headers=headers)).status_code == 401
+
+
+async def test_claims_without_version_fall_back_to_the_database(
+    test_app: FastAPI, login: Callable[..., Awaitable[dict[str, Any]]]
+):
+    @test_app.get("/claims-me")
+    async def claims_me(user: Annotated[User, Depends(get_current_user_from_claims)]) -> User:
+        return user
+
+    await login()
+    exp = datetime.now(tz=UTC) + timedelta(minutes=5)
+    # Shaped like tokens issued before access tokens carried email/ver claims
+    legacy = token_codec.encode({"sub": "1", "exp": exp})
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as legacy_client:
+        res = await legacy_client.get("/claims-me", headers={"Authorization": f"Bearer {legacy}"})
+        assert res.status_code == 200
+        assert res.json()["email"] == "me@example.com"
+
+        unknown = token_codec.encode({"sub": "999", "exp": exp})
+        res = await legacy_client.get("/claims-me", headers={"Authorization": f"Bearer {unknown}"})
+        assert res.status_code == 401
@@ -0,0 +1,134 @@
+import csv
+import io
+import json
+
+from httpx import AsyncClient
+from pydantic import EmailStr, TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.auth import hash_password
+from app.models.user import User
+from app.schemas.user import BulkUserRow
+from app.services.bulk_import import iter_csv_records
+
+
+async def _aiter(items: list[str]):
+    for item in items:
+        yield item
+
+
+async def test_csv_records_may_span_lines():
+    lines = ["email,full_name", 'a@example.com,"Smith,', ' Jr."', "b@example.com,"]
+    records = [r async for r in iter_csv_records(_aiter(lines))]
+    assert records == [
+        {"email": "a@example.com", "full_name": "Smith,\n Jr."},
+        {"email": "b@example.com"},
+    ]
+
+
+async def test_bulk_import_json_reports_per_row_results(client: AsyncClient, db: AsyncSession):
+    db.add(User(email="taken@example.com", full_name=None, password_hash="x"))
+    await db.commit()
+
+    payload = [
+        {"email": "new@example.com", "full_name": "New", "password": "password123"},
+        {"email": "taken@example.com", "password": "password123"},
+        {"email": "not-an-email", "password": "password123"},
+        {"email": "hashed@example.com", "password_hash": hash_password("pw")},
+        {"email": "new@example.com", "password": "again"},
+    ]
+    res = await client.post("/users/bulk", json=payload, params={"chunk_size": 2})
+    assert res.status_code == 200
+    body = res.json()
+    assert [r["status"] for r in body["results"]] == [
+        "created",
+        "exists",
+        "invalid",
+        "created",
+        "exists",
+    ]
+    assert (body["created"], body["skipped"], body["failed"]) == (2, 2, 1)
+
+    login = await client.post("/auth/login", json={"email": "hashed@example.com", "password": "pw"})
+    assert login.status_code == 200
+
+
+async def test_bulk_import_streams_ndjson_and_csv(client: AsyncClient):
+    ndjson = "\n".join(
+        json.dumps({"email": f"u{i}@example.com", "password": "pw"}) for i in range(5)
+    )
+    res = await client.post(
+        "/users/bulk", content=ndjson, headers={"content-type": "application/x-ndjson"}
+    )
+    assert res.json()["created"] == 5
+
+    csv_body = "email,full_name,password\nc1@example.com,Csv One,pw\nc2@example.com,,pw\n"
+    res = await client.post("/users/bulk", content=csv_body, headers={"content-type": "text/csv"})
+    assert res.json()["created"] == 2
+
+    res = await client.post("/users/bulk", content="x", headers={"content-type": "text/plain"})
+    assert res.status_code == 415
+
+
+async def test_bulk_import_reports_malformed_records_and_keeps_going(client: AsyncClient):
+    # Row 0 is committed (chunk_size=1) before the bad lines are read
+    ndjson = b"\n".join(
+        [
+            json.dumps({"email": "first@example.com", "password": "pw"}).encode(),
+            b'{"email": "broken@example.com", ',
+            b'{"email": "\xff@example.com", "password": "pw"}',
+            json.dumps({"email": "last@example.com", "password": "pw"}).encode(),
+        ]
+    )
+    res = await client.post(
+        "/users/bulk",
+        content=ndjson,
+        params={"chunk_size": 1},
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert res.status_code == 200
+    assert [(r["row"], r["status"], r["detail"]) for r in res.json()["results"]] == [
+        (0, "created", None),
+        (1, "invalid", "Line is not valid JSON"),
+        (2, "invalid", "Line is not valid UTF-8"),
+        (3, "created", None),
+    ]
+
+    csv_body = b'email,full_name,password\nc\xff@example.com,,pw\nc2@example.com,"Open,pw\n'
+    res = await client.post("/users/bulk", content=csv_body, headers={"content-type": "text/csv"})
+    assert [r["detail"] for r in res.json()["results"]] == [
+        "Line is not valid UTF-8",
+        "Unterminated quoted field",
+    ]
+
+    # Nothing has been written yet, so an unreadable upload is still rejected outright
+    res = await client.post(
+        "/users/bulk", content=b"{", headers={"content-type": "application/json"}
+    )
+    assert res.status_code == 400
+
+
+async def test_export_streams_csv(client: AsyncClient, db: AsyncSession):
+    db.add_all(
+        [
+            User(email="a@example.com", full_name="A, Esq.", password_hash="x"),
+            User(email="b@example.com", full_name=None, password_hash="x"),
+        ]
+    )
+    await db.commit()
+
+    res = await client.get("/users/export")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(res.text)))
+    assert rows == [
+        ["id", "email", "full_name"],
+        ["1", "a@example.com", "A, Esq."],
+        ["2", "b@example.com", ""],
+    ]
+
+
+def test_bulk_row_email_matches_email_str_normalization():
+    for email in ("Some.One@Example.COM", "ünï@example.com", "x@bücher.de"):
+        row = BulkUserRow(email=email, password="pw")
+        assert row.email == TypeAdapter(EmailStr).validate_python(email)
@@ -0,0 +1,113 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.core.compression import CompressionMiddleware, negotiate
+
+LARGE = "x" * 4096
+
+
+def test_negotiate():
+    offered = ("zstd", "gzip")
+    assert negotiate("gzip, deflate", offered) == "gzip"
+    assert negotiate("gzip, zstd", offered) == "zstd"
+    assert negotiate("gzip;q=1.0, zstd;q=0.5", offered) == "gzip"
+    assert negotiate("zstd;q=0, gzip", offered) == "gzip"
+    assert negotiate("*", offered) == "zstd"
+    assert negotiate("*;q=0.1, gzip;q=0", offered) == "zstd"
+    assert negotiate("identity", offered) is None
+    assert negotiate("", offered) is None
+    assert negotiate("gzip;q=bogus", offered) is None
+
+
+def test_unknown_encoding_rejected():
+    with pytest.raises(ValueError):
+        CompressionMiddleware(FastAPI(), encodings=["lz4"])
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/small")
+    async def small() -> PlainTextResponse:
+        return PlainTextResponse("tiny")
+
+    @app.get("/large")
+    async def large() -> PlainTextResponse:
+        return PlainTextResponse(LARGE, headers={"ETag": '"v1"'})
+
+    @app.get("/png")
+    async def png() -> Response:
+        return Response(LARGE.encode(), media_type="image/png")
+
+    @app.get("/no-transform")
+    async def no_transform() -> PlainTextResponse:
+        return PlainTextResponse(LARGE, headers={"Cache-Control": "no-transform"})
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def lines():
+            for i in range(200):
+                yield json.dumps({"id": i, "email": f"user{i}@example.com"}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    app.add_middleware(CompressionMiddleware, encodings=["gzip"], minimum_size=1024)
+    return app
+
+
+@pytest.fixture
+async def compressed_client():
+    async with AsyncClient(transport=ASGITransport(app=_app()), base_url="http://test") as c:
+        yield c
+
+
+async def _raw(
+    client: AsyncClient, path: str, accept: str = "gzip"
+) -> tuple[dict[str, str], bytes]:
+    async with client.stream("GET", path, headers={"Accept-Encoding": accept}) as res:
+        assert res.status_code == 200
+        body = b"".join([chunk async for chunk in res.aiter_raw()])
+        return dict(res.headers), body
+
+
+async def test_compresses_large_bodies_only(compressed_client: AsyncClient):
+    headers, body = await _raw(compressed_client, "/large")
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert headers["etag"] == '"v1-gzip"'
+    assert int(headers["content-length"]) == len(body) < len(LARGE)
+    assert gzip.decompress(body).decode() == LARGE
+
+    headers, body = await _raw(compressed_client, "/small")
+    assert "content-encoding" not in headers
+    assert body == b"tiny"
+
+    headers, body = await _raw(compressed_client, "/large", accept="identity")
+    assert "content-encoding" not in headers
+    assert headers["etag"] == '"v1"'
+    assert body.decode() == LARGE
+
+
+@pytest.mark.parametrize("path", ["/png", "/no-transform"])
+async def test_skips_incompressible_responses(compressed_client: AsyncClient, path: str):
+    headers, body = await _raw(compressed_client, path)
+    assert "content-encoding" not in headers
+    assert len(body) == len(LARGE)
+
+
+async def test_streaming_body_compressed_incrementally(compressed_client: AsyncClient):
+    headers, body = await _raw(compressed_client, "/stream")
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    lines = gzip.decompress(body).decode().splitlines()
+    assert len(lines) == 200
+    assert json.loads(lines[-1]) == {"id": 199, "email": "user199@example.com"}
+
+    # httpx decodes Content-Encoding transparently, as browsers and clients do
+    res = await compressed_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert len(res.text.splitlines()) == 200
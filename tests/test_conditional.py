@@ -0,0 +1,127 @@
+from datetime import UTC, datetime
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+
+from app.core.compression import CompressionMiddleware
+from app.core.http_cache import etag_version, http_date, if_match_version, is_not_modified
+
+
+async def _create(client: AsyncClient) -> dict[str, object]:
+    res = await client.post(
+        "/users", json={"email": "etag@example.com", "full_name": "E", "password": "pw"}
+    )
+    assert res.status_code == 201
+    body: dict[str, object] = res.json()
+    return body
+
+
+def test_if_none_match_and_if_modified_since():
+    modified = datetime(2026, 1, 2, 3, 4, 5, 678, tzinfo=UTC)
+    assert is_not_modified({"if-none-match": '"user-1.v2"'}, '"user-1.v2"')
+    assert is_not_modified({"if-none-match": 'W/"user-1.v2", "x"'}, '"user-1.v2"')
+    assert is_not_modified({"if-none-match": "*"}, '"user-1.v2"')
+    # Echoed from a compressed response
+    assert is_not_modified({"if-none-match": '"user-1.v2-gzip"'}, '"user-1.v2"')
+    assert not is_not_modified({"if-none-match": '"user-1.v1"'}, '"user-1.v2"')
+    # If-None-Match wins over If-Modified-Since
+    headers = {"if-none-match": '"user-1.v1"', "if-modified-since": http_date(modified)}
+    assert not is_not_modified(headers, '"user-1.v2"', modified)
+
+    assert is_not_modified({"if-modified-since": http_date(modified)}, '"e"', modified)
+    assert not is_not_modified(
+        {"if-modified-since": "Thu, 01 Jan 2026 00:00:00 GMT"}, '"e"', modified
+    )
+    assert not is_not_modified({"if-modified-since": "yesterday"}, '"e"', modified)
+
+
+def test_if_match_version():
+    assert etag_version('"user-1.v7"', "user-1") == 7
+    assert etag_version('"user-2.v7"', "user-1") is None
+    assert if_match_version({}, "user-1") is None
+    assert if_match_version({"if-match": "*"}, "user-1") is None
+    assert if_match_version({"if-match": '"user-1.v3"'}, "user-1") == 3
+    assert if_match_version({"if-match": '"user-1.v3-br"'}, "user-1") == 3
+    for header in ('W/"user-1.v3"', '"user-2.v3"', '"user-1.v3", "user-1.v4"'):
+        with pytest.raises(HTTPException) as exc:
+            if_match_version({"if-match": header}, "user-1")
+        assert exc.value.status_code == 412
+
+
+async def test_get_sends_validators_and_answers_304(
+    client: AsyncClient, count_statements: list[str]
+):
+    user = await _create(client)
+    res = await client.get(f"/users/{user['id']}")
+    assert res.status_code == 200
+    etag = res.headers["ETag"]
+    assert etag == f'"user-{user["id"]}.v1"'
+    assert res.headers["Cache-Control"] == "private, no-cache"
+    last_modified = res.headers["Last-Modified"]
+
+    count_statements.clear()
+    cached = await client.get(f"/users/{user['id']}", headers={"If-None-Match": etag})
+    by_date = await client.get(
+        "/users/email/etag@example.com", headers={"If-Modified-Since": last_modified}
+    )
+    assert cached.status_code == by_date.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+    # By id the validators come from the user cache; by email only three columns are read
+    assert len(count_statements) == 1
+    assert count_statements[0].startswith("SELECT users.id, users.version, users.updated_at")
+
+    await client.patch(f"/users/{user['id']}", json={"full_name": "Changed"})
+    fresh = await client.get(f"/users/{user['id']}", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.json()["full_name"] == "Changed"
+    assert fresh.headers["ETag"] == f'"user-{user["id"]}.v2"'
+
+
+async def test_conditional_get_of_missing_user_is_404(client: AsyncClient):
+    res = await client.get("/users/999", headers={"If-None-Match": '"user-999.v1"'})
+    assert res.status_code == 404
+
+
+async def test_if_match_guards_writes(client: AsyncClient):
+    user = await _create(client)
+    path = f"/users/{user['id']}"
+    etag = (await client.get(path)).headers["ETag"]
+
+    res = await client.put(path, json={"full_name": "First"}, headers={"If-Match": etag})
+    assert res.status_code == 200
+    new_etag = res.headers["ETag"]
+    assert new_etag != etag
+
+    # A writer still holding the old ETag lost the race
+    stale = await client.put(path, json={"full_name": "Second"}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert (await client.delete(path, headers={"If-Match": etag})).status_code == 412
+    assert (await client.delete(path, headers={"If-Match": 'W/"x"'})).status_code == 412
+
+    assert (await client.delete(path, headers={"If-Match": new_etag})).status_code == 200
+    assert (await client.delete(path, headers={"If-Match": "*"})).status_code == 404
+
+
+async def test_collections_are_not_stored(client: AsyncClient):
+    await _create(client)
+    for path in ("/users", "/users/search?q=etag", "/users/export"):
+        assert (await client.get(path)).headers["Cache-Control"] == "no-store"
+
+
+async def test_etag_from_a_compressed_get_is_accepted_by_if_match(test_app: FastAPI):
+    test_app.add_middleware(CompressionMiddleware, minimum_size=1)
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        user = await _create(client)
+        path = f"/users/{user['id']}"
+        res = await client.get(path, headers={"Accept-Encoding": "gzip"})
+        assert res.headers["Content-Encoding"] == "gzip"
+        etag = res.headers["ETag"]
+        assert etag == f'"user-{user["id"]}.v1-gzip"'
+
+        cached = await client.get(path, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        res = await client.put(path, json={"full_name": "Zipped"}, headers={"If-Match": etag})
+        assert res.status_code == 200
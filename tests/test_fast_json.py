@@ -0,0 +1,48 @@
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from app.core.config import settings
+
+
+async def _seed(client: AsyncClient) -> None:
+    for i in range(5):
+        res = await client.post(
+            "/users",
+            json={"email": f"fast{i}@example.com", "full_name": f"Fast {i}", "password": "pw"},
+        )
+        assert res.status_code == 201
+
+
+@pytest.mark.parametrize(
+    ("path", "params"),
+    [
+        ("/users", {"limit": 2}),
+        ("/users", {"limit": 10}),
+        ("/users/search", {"q": "fast"}),
+        ("/users", {"stream": "true"}),
+    ],
+)
+async def test_fast_path_matches_model_path(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch, path: str, params: dict[str, str]
+):
+    await _seed(client)
+    slow = await client.get(path, params=params)
+
+    monkeypatch.setattr(settings, "fast_json_responses", True)
+    fast = await client.get(path, params=params)
+
+    assert fast.status_code == slow.status_code == 200
+    assert fast.headers["content-type"] == slow.headers["content-type"]
+    if params.get("stream"):
+        assert fast.text == slow.text
+    else:
+        assert fast.json() == slow.json()
+
+
+async def test_openapi_keeps_response_models(test_app: FastAPI):
+    paths = test_app.openapi()["paths"]
+    page = paths["/users"]["get"]["responses"]["200"]["content"]["application/json"]
+    assert page["schema"] == {"$ref": "#/components/schemas/UserPage"}
+    search = paths["/users/search"]["get"]["responses"]["200"]["content"]["application/json"]
+    assert search["schema"]["items"] == {"$ref": "#/components/schemas/User"}
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+from datetime import UTC, datetime
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.hashing import (
+    Argon2Hasher,
+    BcryptHasher,
+    HashingPool,
+    PasswordHashingBusyError,
+    Sha256Hasher,
+)
+from app.models.user import User
+
+
+async def test_pool_verifies_and_flags_legacy_hashes():
+    pool = HashingPool([BcryptHasher(rounds=4), Sha256Hasher()], workers=2)
+    legacy = hashlib.sha256(b"secret").hexdigest()
+
+    assert await pool.verify("wrong", legacy) == (False, None)
+    valid, upgraded = await pool.verify("secret", legacy)
+    assert valid and upgraded and upgraded.startswith("$2b$04$")
+    assert await pool.verify("secret", upgraded) == (True, None)
+    assert pool.stats()["completed"] == 4
+    pool.shutdown()
+
+
+async def test_pool_counts_failed_work_separately():
+    pool = HashingPool([BcryptHasher(rounds=4)], workers=1)
+    with pytest.raises(ValueError):
+        await pool._run(int, "not a number")
+    await pool.hash("secret")
+    stats = pool.stats()
+    assert (stats["completed"], stats["failed"], stats["in_flight"]) == (1, 1, 0)
+    pool.shutdown()
+
+
+async def test_pool_upgrades_to_argon2():
+    pool = HashingPool([Argon2Hasher(), BcryptHasher(rounds=4)], workers=1)
+    bcrypt_hash = BcryptHasher(rounds=4).hash("secret")
+
+    valid, upgraded = await pool.verify("secret", bcrypt_hash)
+    assert valid and upgraded and upgraded.startswith("$argon2")
+    pool.shutdown()
+
+
+async def test_pool_rejects_when_saturated():
+    pool = HashingPool([BcryptHasher(rounds=10)], workers=1, max_queue=1)
+
+    results = await asyncio.gather(*(pool.hash("pw") for _ in range(4)), return_exceptions=True)
+    assert sum(isinstance(r, PasswordHashingBusyError) for r in results) == 2
+    assert pool.stats()["rejected"] == 2
+    pool.shutdown()
+
+
+async def test_login_rehashes_legacy_password(client: AsyncClient, db: AsyncSession):
+    legacy = hashlib.sha256(b"password123").hexdigest()
+    user = User(
+        email="legacy@example.com",
+        full_name=None,
+        password_hash=legacy,
+        updated_at=datetime(2020, 1, 1, tzinfo=UTC),
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    updated_at, version = user.updated_at, user.version
+
+    res = await client.post(
+        "/auth/login", json={"email": "legacy@example.com", "password": "password123"}
+    )
+    assert res.status_code == 200
+
+    db.expire_all()
+    stored = (await db.execute(select(User.password_hash, User.updated_at, User.version))).one()
+    assert stored.password_hash.startswith("$2b$")
+    # A hash upgrade is not a change to the user: validators stay the same
+    assert (stored.updated_at, stored.version) == (updated_at, version)
+    res = await client.post(
+        "/auth/login", json={"email": "legacy@example.com", "password": "password123"}
+    )
+    assert res.status_code == 200
+
+
+async def test_register_returns_503_when_hashing_saturated(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+):
+    async def busy(password: str) -> str:
+        raise PasswordHashingBusyError
+
+    monkeypatch.setattr("app.services.user_service.hashing_pool.hash", busy)
+    res = await client.post(
+        "/auth/register", json={"email": "new@example.com", "password": "password123"}
+    )
+    assert res.status_code == 503
+    assert res.headers["retry-after"] == "1"
@@ -0,0 +1,130 @@
+import asyncio
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.job import Job
+from app.services.jobs import JobRunner, enqueue
+
+
+def _runner(session_factory: async_sessionmaker[AsyncSession], lease: float = 300.0) -> JobRunner:
+    return JobRunner(session_factory, poll_interval=0.05, lease=lease, backoff=60)
+
+
+async def _enqueue(
+    session_factory: async_sessionmaker[AsyncSession], kind: str, max_attempts: int | None = None
+) -> int:
+    async with session_factory() as session:
+        job_id = await enqueue(session, kind, {"n": 1}, max_attempts=max_attempts)
+        await session.commit()
+    return job_id
+
+
+async def _job(session_factory: async_sessionmaker[AsyncSession], job_id: int) -> Job:
+    async with session_factory() as session:
+        job = await session.get(Job, job_id)
+    assert job is not None
+    return job
+
+
+async def test_runs_job_and_records_status(session_factory: async_sessionmaker[AsyncSession]):
+    runner = _runner(session_factory)
+    seen: list[dict[str, Any]] = []
+
+    @runner.handler("test.ok")
+    async def ok(db: AsyncSession, payload: dict[str, Any]) -> None:
+        seen.append(payload)
+
+    job_id = await _enqueue(session_factory, "test.ok")
+    assert (await _job(session_factory, job_id)).status == "queued"
+
+    assert await runner.run_once()
+    assert not await runner.run_once()
+    assert seen == [{"n": 1}]
+    job = await _job(session_factory, job_id)
+    assert job.status == "succeeded" and job.attempts == 1 and job.finished_at is not None
+
+
+async def test_retries_with_backoff_then_fails(session_factory: async_sessionmaker[AsyncSession]):
+    runner = _runner(session_factory)
+
+    @runner.handler("test.flaky")
+    async def flaky(db: AsyncSession, payload: dict[str, Any]) -> None:
+        raise RuntimeError("smtp down")
+
+    job_id = await _enqueue(session_factory, "test.flaky", max_attempts=2)
+    assert await runner.run_once()
+    job = await _job(session_factory, job_id)
+    assert job.status == "queued" and job.attempts == 1
+    assert job.last_error == "RuntimeError: smtp down"
+    # Backed off 30-60s (equal jitter on a 60s base), so nothing is due yet
+    run_at = job.run_at.replace(tzinfo=UTC)
+    assert timedelta(seconds=29) < run_at - datetime.now(tz=UTC) <= timedelta(seconds=60)
+    assert not await runner.run_once()
+
+    async with session_factory() as session:
+        await session.execute(
+            update(Job).where(Job.id == job_id).values(run_at=datetime.now(tz=UTC))
+        )
+        await session.commit()
+    assert await runner.run_once()
+    job = await _job(session_factory, job_id)
+    assert job.status == "failed" and job.attempts == 2 and job.finished_at is not None
+    assert runner.stats()["retried"] == 1 and runner.stats()["failed"] == 1
+
+
+async def test_unknown_kind_fails_and_stale_claims_are_retaken(
+    session_factory: async_sessionmaker[AsyncSession],
+):
+    runner = _runner(session_factory, lease=60)
+    unknown = await _enqueue(session_factory, "test.unknown")
+    assert await runner.run_once()
+    job = await _job(session_factory, unknown)
+    assert job.status == "failed" and "No handler" in (job.last_error or "")
+
+    ran: list[int] = []
+
+    @runner.handler("test.ok")
+    async def ok(db: AsyncSession, payload: dict[str, Any]) -> None:
+        ran.append(1)
+
+    stale = await _enqueue(session_factory, "test.ok")
+    fresh = await _enqueue(session_factory, "test.ok")
+    now = datetime.now(tz=UTC)
+    async with session_factory() as session:
+        # One worker died 2 minutes into the first job; another claimed the second just now
+        for job_id, locked_at in ((stale, now - timedelta(minutes=2)), (fresh, now)):
+            await session.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .values(status="running", attempts=1, locked_at=locked_at)
+            )
+        await session.commit()
+    assert await runner.run_once()
+    assert not await runner.run_once()
+    assert (await _job(session_factory, stale)).status == "succeeded"
+    assert (await _job(session_factory, fresh)).status == "running"
+
+
+async def test_workers_pick_up_notified_jobs(session_factory: async_sessionmaker[AsyncSession]):
+    # One worker: the test engine shares a single SQLite connection between sessions
+    runner = JobRunner(session_factory, workers=1, poll_interval=60)
+    done = asyncio.Event()
+
+    @runner.handler("test.ok")
+    async def ok(db: AsyncSession, payload: dict[str, Any]) -> None:
+        done.set()
+
+    runner.start()
+    try:
+        # Let the worker find the queue empty and go idle before enqueueing
+        await asyncio.sleep(0.1)
+        await _enqueue(session_factory, "test.ok")
+        # Without notify() the idle workers would sleep for the whole poll interval
+        runner.notify()
+        await asyncio.wait_for(done.wait(), 5)
+    finally:
+        await runner.close()
+    assert not runner.running and runner.stats()["succeeded"] == 1
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def run_python(code: str) -> str:
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return out.stdout.strip()
+
+
+def test_app_import_defers_jwt_stack():
+    code = "import sys, app.main; print(sorted(m for m in ('jose', 'argon2') if m in sys.modules))"
+    assert run_python(code) == "[]"
+
+
+def test_model_registry_loads_on_attribute_access():
+    code = """
+import sys
+import app.models as models
+before = 'app.models.auth' in sys.modules
+role = models.Role
+print(before, 'app.models.auth' in sys.modules, role.__tablename__)
+"""
+    assert run_python(code) == "False True roles"
+
+
+def test_import_all_registers_every_table():
+    code = """
+from app.models import import_all
+from app.models.mixins import Base
+import_all()
+print(sorted(Base.metadata.tables))
+"""
+    tables = run_python(code)
+    for table in ("users", "roles", "permissions", "role_permissions", "user_roles", "passwords"):
+        assert repr(table) in tables
+
+
+def test_import_time_script_enforces_budget():
+    script = str(PROJECT_ROOT / "scripts" / "check_import_time.py")
+    ok = subprocess.run(
+        [sys.executable, script, "--runs", "1", "--budget-ms", "100000"],
+        capture_output=True,
+        text=True,
+    )
+    assert ok.returncode == 0, ok.stderr
+    assert "import app.main: median" in ok.stdout
+    over = subprocess.run(
+        [sys.executable, script, "--runs", "1", "--budget-ms", "1"], capture_output=True, text=True
+    )
+    assert over.returncode == 1
+    assert "over the 1 ms budget" in over.stderr
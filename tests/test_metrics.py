@@ -0,0 +1,89 @@
+import logging
+from typing import Annotated
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app import main
+from app.core.metrics import Histogram, MetricsMiddleware, instrument_engine, registry
+from app.deps import get_db
+from app.models.user import User
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(5.0, "/a")
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1.0"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 5.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+@pytest.fixture
+async def metrics_client(test_app: FastAPI, engine: AsyncEngine):
+    instrument_engine(engine)
+    test_app.add_middleware(MetricsMiddleware, n_plus_one_threshold=3)
+
+    @test_app.get("/metrics")
+    async def metrics() -> PlainTextResponse:
+        return PlainTextResponse(registry.render())
+
+    @test_app.get("/n-plus-one")
+    async def n_plus_one(db: Annotated[AsyncSession, Depends(get_db)]) -> dict[str, int]:
+        for user_id in range(3):
+            await db.execute(select(User).where(User.id == user_id))
+        return {"ok": 1}
+
+    transport = ASGITransport(app=test_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_requests_are_recorded_per_route_template(metrics_client: AsyncClient):
+    await metrics_client.get("/users/1")
+    await metrics_client.get("/users/2")
+
+    body = (await metrics_client.get("/metrics")).text
+    assert 'http_requests_total{method="GET",route="/users/{user_id}",status="404"}' in body
+    assert 'http_request_db_queries_bucket{route="/users/{user_id}",le="1"}' in body
+    assert "db_query_duration_seconds_count" in body
+
+
+async def test_repeated_statements_log_an_n_plus_one_warning(
+    metrics_client: AsyncClient, caplog: pytest.LogCaptureFixture
+):
+    with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+        await metrics_client.get("/n-plus-one")
+    assert "Possible N+1 on /n-plus-one: statement executed 3 times" in caplog.text
+
+
+async def test_failed_statements_do_not_leak_start_times(engine: AsyncEngine):
+    instrument_engine(engine)
+    async with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                await conn.execute(text("SELECT * FROM no_such_table"))
+        await conn.execute(text("SELECT 1"))
+        info = await conn.run_sync(lambda sync_conn: sync_conn.info)
+    assert info["query_started"] == []
+
+
+async def test_health_details_reports_every_component():
+    async with AsyncClient(transport=ASGITransport(app=main.app), base_url="http://test") as client:
+        res = await client.get("/health/details")
+        # Folded into /health/details; no per-component endpoints
+        assert (await client.get("/health/hashing")).status_code == 404
+    assert res.status_code == 200
+    body = res.json()
+    assert {"startup", "hashing", "user_cache", "permissions", "rate_limit", "jobs"} <= body.keys()
+    assert "rejected" in body["hashing"]
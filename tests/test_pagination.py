@@ -0,0 +1,53 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.user import User
+
+
+async def _seed(db: AsyncSession, count: int) -> None:
+    db.add_all(
+        User(email=f"user{i}@example.com", full_name=f"User {i}", password_hash="x")
+        for i in range(count)
+    )
+    await db.commit()
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(12345)) == 12345
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor!")
+
+
+async def test_list_users_pages_with_cursor(client: AsyncClient, db: AsyncSession):
+    await _seed(db, 5)
+
+    first = (await client.get("/users", params={"limit": 2})).json()
+    assert [u["id"] for u in first["items"]] == [1, 2]
+    assert first["next_cursor"]
+
+    seen = [u["id"] for u in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = (await client.get("/users", params={"limit": 2, "cursor": cursor})).json()
+        seen += [u["id"] for u in page["items"]]
+        cursor = page["next_cursor"]
+    assert seen == [1, 2, 3, 4, 5]
+
+
+async def test_list_users_rejects_bad_cursor(client: AsyncClient):
+    res = await client.get("/users", params={"cursor": "@@@"})
+    assert res.status_code == 400
+
+
+async def test_list_users_streams_ndjson(client: AsyncClient, db: AsyncSession):
+    await _seed(db, 3)
+
+    res = await client.get("/users", params={"stream": True})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert [r["email"] for r in rows] == [f"user{i}@example.com" for i in range(3)]
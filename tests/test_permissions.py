@@ -0,0 +1,115 @@
+from collections.abc import Awaitable, Callable
+from typing import Annotated, Any
+
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.permissions import permission_map
+from app.deps import require_permission
+from app.models.auth import Permission, Role, RolePermission, UserRole
+from app.models.user import User as UserModel
+from app.schemas.user import User
+
+
+@pytest.fixture(autouse=True)
+def clear_permission_map() -> None:
+    permission_map.clear()
+
+
+def _role(name: str) -> Role:
+    return Role(name=name, description=name, type="system")
+
+
+def _permission(name: str) -> Permission:
+    return Permission(name=name, description=name, type="system")
+
+
+async def _seed(db: AsyncSession) -> tuple[Role, Role, Permission, Permission]:
+    admin, viewer = _role("admin"), _role("viewer")
+    read, write = _permission("users:read"), _permission("users:write")
+    db.add_all([admin, viewer, read, write])
+    await db.flush()
+    db.add_all(
+        [
+            RolePermission(role_id=admin.id, permission_id=read.id),
+            RolePermission(role_id=admin.id, permission_id=write.id),
+            RolePermission(role_id=viewer.id, permission_id=read.id),
+        ]
+    )
+    await db.commit()
+    return admin, viewer, read, write
+
+
+async def test_load_builds_role_permission_map(db: AsyncSession):
+    await _seed(db)
+    permission_map.clear()
+    await permission_map.load(db)
+
+    assert permission_map.permissions_for(frozenset({"admin"})) == {"users:read", "users:write"}
+    assert permission_map.permissions_for(frozenset({"viewer"})) == {"users:read"}
+    assert permission_map.allows(frozenset({"viewer", "admin"}), "users:write")
+    assert not permission_map.allows(frozenset({"viewer", "unknown"}), "users:write")
+
+
+async def test_committed_changes_apply_incrementally(db: AsyncSession):
+    admin, viewer, _, write = await _seed(db)
+    version = permission_map.version
+
+    db.add(RolePermission(role_id=viewer.id, permission_id=write.id))
+    viewer.name = "editor"
+    await db.commit()
+    assert permission_map.version > version
+    assert permission_map.allows(frozenset({"editor"}), "users:write")
+    assert not permission_map.allows(frozenset({"viewer"}), "users:read")
+
+    grant = await db.scalar(
+        select(RolePermission).where(
+            RolePermission.role_id == admin.id, RolePermission.permission_id == write.id
+        )
+    )
+    await db.delete(grant)
+    await db.commit()
+    assert permission_map.permissions_for(frozenset({"admin"})) == {"users:read"}
+
+
+async def test_rolled_back_changes_are_discarded(db: AsyncSession):
+    _, viewer, _, write = await _seed(db)
+
+    db.add(RolePermission(role_id=viewer.id, permission_id=write.id))
+    await db.flush()
+    await db.rollback()
+    assert not permission_map.allows(frozenset({"viewer"}), "users:write")
+
+
+async def test_require_permission(
+    test_app: FastAPI,
+    client: AsyncClient,
+    db: AsyncSession,
+    login: Callable[..., Awaitable[dict[str, Any]]],
+):
+    @test_app.delete("/admin-only")
+    async def admin_only(
+        user: Annotated[User, Depends(require_permission("users:write"))],
+    ) -> dict[str, int]:
+        return {"id": user.id}
+
+    admin, _, _, _ = await _seed(db)
+    for email in ("admin@example.com", "plain@example.com"):
+        res = await client.post("/auth/register", json={"email": email, "password": "secret"})
+        assert res.status_code == 201
+    admin_id = await db.scalar(select(UserModel.id).where(UserModel.email == "admin@example.com"))
+    assert admin_id is not None
+    db.add(UserRole(user_id=admin_id, role_id=admin.id))
+    await db.commit()
+
+    async def call_as(email: str) -> int:
+        token = (await login(email, password="secret"))["access_token"]
+        res = await client.delete("/admin-only", headers={"Authorization": f"Bearer {token}"})
+        return res.status_code
+
+    assert await call_as("admin@example.com") == 200
+    assert await call_as("plain@example.com") == 403
+    assert (await client.delete("/admin-only")).status_code == 401
@@ -0,0 +1,79 @@
+import pytest
+from httpx import AsyncClient
+
+from app.api import auth
+from app.core.ratelimit import MemoryRateLimitStore, Rate, RateLimiter, parse_rate
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_parse_rate():
+    assert parse_rate("5/minute") == Rate(5, 60.0)
+    assert parse_rate("100 / hours") == Rate(100, 3600.0)
+    assert parse_rate("10/30seconds") == Rate(10, 30.0)
+    assert parse_rate("") is None
+    assert parse_rate("0/minute") is None
+    with pytest.raises(ValueError, match="Invalid rate"):
+        parse_rate("5 per minute")
+
+
+async def test_token_bucket_refills_continuously():
+    clock = FakeClock()
+    store = MemoryRateLimitStore(clock=clock)
+    rate = Rate(2, 10.0)
+
+    assert await store.hit("k", rate) == 0
+    assert await store.hit("k", rate) == 0
+    assert await store.hit("k", rate) == pytest.approx(5.0)
+    # Other keys have their own bucket
+    assert await store.hit("other", rate) == 0
+
+    clock.now += 5.0
+    assert await store.hit("k", rate) == 0
+    assert await store.hit("k", rate) == pytest.approx(5.0)
+
+
+async def test_store_is_bounded_per_shard():
+    store = MemoryRateLimitStore(max_keys=8, shards=4)
+    for i in range(100):
+        await store.hit(f"ip:{i}", Rate(1, 60.0))
+    stats = store.stats()
+    assert stats["keys"] <= 8
+    assert stats["evictions"] == 100 - stats["keys"]
+
+
+async def test_limiter_fails_open_on_store_errors():
+    class BrokenStore(MemoryRateLimitStore):
+        async def hit(self, key: str, rate: Rate, cost: float = 1.0) -> float:
+            raise ConnectionError("redis down")
+
+    limiter = RateLimiter(BrokenStore())
+    assert await limiter.hit("k", Rate(1, 60.0)) == 0
+    assert limiter.stats()["errors"] == 1
+
+
+async def test_login_is_limited_per_email(client: AsyncClient, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(auth, "LOGIN_RATE_PER_EMAIL", Rate(2, 60.0))
+    body = {"email": "Victim@example.com", "password": "guess"}
+    for _ in range(2):
+        assert (await client.post("/auth/login", json=body)).status_code == 401
+
+    res = await client.post("/auth/login", json={**body, "email": "victim@example.com"})
+    assert res.status_code == 429
+    assert res.headers["Retry-After"] == "30"
+
+
+async def test_login_is_limited_per_ip(client: AsyncClient):
+    assert auth.LOGIN_RATE_PER_IP is not None
+    for i in range(auth.LOGIN_RATE_PER_IP.capacity):
+        res = await client.post("/auth/login", json={"email": f"u{i}@example.com", "password": "x"})
+        assert res.status_code == 401
+    res = await client.post("/auth/login", json={"email": "new@example.com", "password": "x"})
+    assert res.status_code == 429
+    assert int(res.headers["Retry-After"]) >= 1
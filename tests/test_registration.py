@@ -0,0 +1,61 @@
+import asyncio
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api import auth
+from app.core.ratelimit import rate_limiter
+from app.deps import get_db
+from app.models.mixins import Base
+from app.models.user import User
+
+
+async def test_register_is_a_single_insert(client: AsyncClient, count_statements: list[str]):
+    res = await client.post(
+        "/auth/register", json={"email": "one@example.com", "password": "password123"}
+    )
+    assert res.status_code == 201
+    assert res.json()["version"] == 1
+    assert len(count_statements) == 1 and count_statements[0].startswith("INSERT")
+
+    res = await client.post(
+        "/auth/register", json={"email": "one@example.com", "password": "password123"}
+    )
+    assert res.status_code == 409
+
+
+async def test_concurrent_registrations_of_one_email(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    # 25 registrations from one address would otherwise trip the per-IP limit
+    monkeypatch.setattr(rate_limiter, "enabled", False)
+    # A file database with a real connection pool, so each request gets its own connection
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'race.db'}", pool_size=20)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
+        async with sessions() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(auth.router)
+    app.dependency_overrides[get_db] = override_get_db
+
+    payload = {"email": "race@example.com", "password": "password123"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        responses = await asyncio.gather(
+            *(client.post("/auth/register", json=payload) for _ in range(25))
+        )
+
+    codes = sorted(res.status_code for res in responses)
+    assert codes == [201] + [409] * 24
+    async with sessions() as db:
+        assert await db.scalar(select(func.count()).select_from(User)) == 1
+    await engine.dispose()
@@ -0,0 +1,90 @@
+from typing import Annotated
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app import deps
+from app.core.replicas import ReplicaSet, is_disconnect
+from app.services.user_loader import UserLoader
+
+
+def _engines(count: int) -> list[AsyncEngine]:
+    return [create_async_engine(f"sqlite+aiosqlite:///replica{i}.db") for i in range(count)]
+
+
+def test_round_robin_skips_ejected_replicas_until_they_recover():
+    now = [0.0]
+    replicas = ReplicaSet(_engines(3), eject_seconds=10, clock=lambda: now[0])
+    assert [replicas.choose() for _ in range(3)] == [0, 1, 2]
+
+    replicas.eject(1)
+    assert {replicas.choose() for _ in range(4)} == {0, 2}
+    now[0] = 11
+    assert 1 in {replicas.choose() for _ in range(3)}
+
+
+def test_choose_returns_none_when_all_ejected():
+    replicas = ReplicaSet(_engines(1))
+    replicas.eject(0)
+    assert replicas.choose() is None
+    assert ReplicaSet([]).choose() is None
+
+
+def test_is_disconnect_follows_cause_chain():
+    error = OperationalError("SELECT 1", {}, ConnectionRefusedError())
+    wrapped = HTTPException(status_code=500)
+    wrapped.__cause__ = error
+    assert is_disconnect(wrapped)
+    assert is_disconnect(
+        OperationalError("SELECT 1", {}, Exception("closed"), connection_invalidated=True)
+    )
+    assert not is_disconnect(HTTPException(status_code=404))
+
+
+def test_is_disconnect_ignores_timeouts_and_cancellations():
+    for orig in (Exception("canceling statement due to statement timeout"), TimeoutError()):
+        assert not is_disconnect(OperationalError("SELECT 1", {}, orig))
+
+
+@pytest.fixture
+def routing_app(monkeypatch: pytest.MonkeyPatch) -> FastAPI:
+    replicas = ReplicaSet(_engines(2))
+    monkeypatch.setattr(deps, "replicas", replicas)
+    app = FastAPI()
+
+    @app.get("/read")
+    async def read(db: Annotated[AsyncSession, Depends(deps.get_read_db)]) -> dict[str, str]:
+        return {"url": str(db.get_bind().url)}
+
+    @app.post("/write")
+    async def write(db: Annotated[AsyncSession, Depends(deps.get_db)]) -> dict[str, str]:
+        return {"url": str(db.get_bind().url)}
+
+    @app.get("/auth-loader")
+    async def auth_loader(
+        loader: Annotated[UserLoader, Depends(deps.get_primary_user_loader)],
+    ) -> dict[str, str]:
+        return {"url": str(loader.service.db.get_bind().url)}
+
+    return app
+
+
+async def test_reads_go_to_replicas_until_a_write_pins_the_primary(routing_app: FastAPI):
+    transport = ASGITransport(app=routing_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        urls = {(await client.get("/read")).json()["url"] for _ in range(2)}
+        assert urls == {"sqlite+aiosqlite:///replica0.db", "sqlite+aiosqlite:///replica1.db"}
+
+        primary = (await client.post("/write")).json()["url"]
+        assert deps.READ_YOUR_WRITES_COOKIE in client.cookies
+        assert (await client.get("/read")).json()["url"] == primary
+
+
+async def test_authentication_loads_users_from_the_primary(routing_app: FastAPI):
+    transport = ASGITransport(app=routing_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        url = (await client.get("/auth-loader")).json()["url"]
+    assert "replica" not in url
@@ -0,0 +1,56 @@
+from httpx import AsyncClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateIndex
+
+from app.models.user import User
+
+
+async def _seed(db: AsyncSession) -> None:
+    db.add_all(
+        [
+            User(email="alice@example.com", full_name="Alice Smith", password_hash="x"),
+            User(email="bob@example.com", full_name="Bob Alison", password_hash="x"),
+            User(email="carol@example.com", full_name=None, password_hash="x"),
+            User(email="ali@example.com", full_name="Ali", password_hash="x"),
+            User(email="under_score@example.com", full_name="Under", password_hash="x"),
+        ]
+    )
+    await db.commit()
+
+
+async def test_search_matches_email_and_name_and_honors_limit(
+    client: AsyncClient, db: AsyncSession
+):
+    await _seed(db)
+
+    res = await client.get("/users/search", params={"q": "ali"})
+    assert res.status_code == 200
+    emails = [u["email"] for u in res.json()]
+    # Prefix matches rank ahead of substring matches
+    assert emails[:2] == ["ali@example.com", "alice@example.com"]
+    assert set(emails) == {"ali@example.com", "alice@example.com", "bob@example.com"}
+
+    res = await client.get("/users/search", params={"q": "ali", "limit": 1})
+    assert len(res.json()) == 1
+
+
+async def test_search_prefix_mode(client: AsyncClient, db: AsyncSession):
+    await _seed(db)
+
+    res = await client.get("/users/search", params={"q": "ali", "prefix": True})
+    assert {u["email"] for u in res.json()} == {"ali@example.com", "alice@example.com"}
+
+
+async def test_search_escapes_like_wildcards(client: AsyncClient, db: AsyncSession):
+    await _seed(db)
+
+    res = await client.get("/users/search", params={"q": "_"})
+    assert [u["email"] for u in res.json()] == ["under_score@example.com"]
+
+
+def test_trigram_indexes_declared_for_postgres():
+    indexes = {ix.name: ix for ix in User.__table__.indexes}
+    ddl = str(CreateIndex(indexes["ix_users_email_trgm"]).compile(dialect=postgresql.dialect()))
+    assert "USING gin" in ddl
+    assert "gin_trgm_ops" in ddl
@@ -0,0 +1,115 @@
+import io
+import re
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from alembic import command
+from app.core.replicas import ReplicaSet
+from app.core.startup import (
+    SCHEMA_REVISION,
+    SchemaMismatchError,
+    prepare_database,
+    verify_schema,
+    warm_pool,
+    warm_replicas,
+)
+from app.models import import_all
+from app.models.mixins import Base
+from app.services.user_service import UserService
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+@pytest.fixture
+async def file_engine(tmp_path: Path) -> AsyncGenerator[AsyncEngine, None]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/startup.db")
+    yield engine
+    await engine.dispose()
+
+
+def test_schema_revision_matches_alembic_head():
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    assert ScriptDirectory.from_config(config).get_current_head() == SCHEMA_REVISION
+
+
+def _migrated_columns(sql: str) -> dict[str, set[str]]:
+    """Columns per table after the CREATE/ALTER TABLE statements of an offline upgrade"""
+    tables: dict[str, set[str]] = {}
+    for table, body in re.findall(r"CREATE TABLE (\w+) \((.*?)\n\);", sql, re.DOTALL):
+        tables[table] = set()
+        for line in body.strip().splitlines():
+            name = line.split()[0].strip('"')
+            if name not in ("PRIMARY", "UNIQUE", "FOREIGN", "CONSTRAINT", "CHECK"):
+                tables[table].add(name)
+    for table, column in re.findall(r"ALTER TABLE (\w+) ADD COLUMN (\w+)", sql):
+        assert column not in tables[table], f"{table}.{column} is added twice"
+        tables[table].add(column)
+    for table, column in re.findall(r"ALTER TABLE (\w+) DROP COLUMN (\w+)", sql):
+        tables[table].remove(column)
+    return tables
+
+
+def test_migration_chain_builds_the_model_schema(monkeypatch: pytest.MonkeyPatch):
+    # Offline (--sql) mode renders every migration for Postgres without a server
+    monkeypatch.setenv("DATABASE_URL_SYNC", "postgresql+psycopg://u:p@localhost/app")
+    output = io.StringIO()
+    config = Config(str(PROJECT_ROOT / "alembic.ini"), output_buffer=output)
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    command.upgrade(config, "head", sql=True)
+
+    migrated = _migrated_columns(output.getvalue())
+    import_all()
+    for table in Base.metadata.sorted_tables:
+        assert migrated.get(table.name) == {column.name for column in table.columns}, table.name
+
+
+async def test_verify_schema(file_engine: AsyncEngine):
+    with pytest.raises(SchemaMismatchError, match="alembic upgrade head"):
+        await verify_schema(file_engine)
+
+    async with file_engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32))"))
+        await conn.execute(text("INSERT INTO alembic_version VALUES ('0001_create_users')"))
+    with pytest.raises(SchemaMismatchError, match="0001_create_users"):
+        await verify_schema(file_engine)
+
+    async with file_engine.begin() as conn:
+        await conn.execute(
+            text("UPDATE alembic_version SET version_num = :rev"), {"rev": SCHEMA_REVISION}
+        )
+    assert await verify_schema(file_engine) == SCHEMA_REVISION
+
+
+async def test_prepare_database_creates_schema_and_warms_pool(file_engine: AsyncEngine):
+    warmed: list[AsyncSession] = []
+
+    async def warm(session: AsyncSession) -> None:
+        await UserService(session).warm_up()
+        warmed.append(session)
+
+    report = await prepare_database(file_engine, "create_all", min_pool_size=3, warm=warm)
+    assert report["mode"] == "create_all"
+    assert report["warmed_connections"] == 3
+    assert len(warmed) == 3
+    assert report["total_ms"] >= report["schema_ms"]
+    assert file_engine.pool.checkedin() == 3  # type: ignore[attr-defined]
+
+
+async def test_warm_pool_is_capped_at_pool_size(file_engine: AsyncEngine):
+    assert await warm_pool(file_engine, 50) == file_engine.pool.size()  # type: ignore[attr-defined]
+    assert await warm_pool(file_engine, 0) == 0
+
+
+async def test_unreachable_replica_is_ejected_at_startup(file_engine: AsyncEngine, tmp_path: Path):
+    unreachable = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db")
+    replicas = ReplicaSet([unreachable, file_engine])
+    assert await warm_replicas(replicas, 2) == 2
+    assert replicas.healthy() == [1]
+    await unreachable.dispose()
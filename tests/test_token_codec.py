@@ -0,0 +1,129 @@
+import time
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+)
+from httpx import ASGITransport, AsyncClient
+from jose import jwt
+
+from app.core.token_codec import (
+    HmacKey,
+    InvalidTokenError,
+    SigningKey,
+    TokenCodec,
+    b64url_encode,
+    load_pem_key,
+)
+from app.main import app
+
+
+def _ed25519() -> SigningKey:
+    private = ed25519.Ed25519PrivateKey.generate()
+    pem = private.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption())
+    return load_pem_key(pem)
+
+
+def _es256_pems() -> tuple[bytes, bytes]:
+    private = ec.generate_private_key(ec.SECP256R1())
+    return (
+        private.private_bytes(Encoding.PEM, PrivateFormat.PKCS8, NoEncryption()),
+        private.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo),
+    )
+
+
+def _claims(**extra: object) -> dict[str, object]:
+    return {"sub": "1", "exp": datetime.now(tz=UTC) + timedelta(minutes=5), **extra}
+
+
+@pytest.mark.parametrize("key", ["hs256", "es256", "eddsa"])
+def test_roundtrip_and_tampering(key: str):
+    signing_key = {
+        "hs256": lambda: HmacKey("secret"),
+        "es256": lambda: load_pem_key(_es256_pems()[0]),
+        "eddsa": _ed25519,
+    }[key]()
+    codec = TokenCodec(signing_key)
+    token = codec.encode(_claims(iat=round(time.time(), 3), roles=["admin"]))
+    claims = codec.decode(token)
+    assert claims["sub"] == "1" and claims["roles"] == ["admin"]
+    assert isinstance(claims["exp"], int)
+
+    header, payload, signature = token.split(".")
+    forged = b64url_encode(b'{"sub":"2","exp":9999999999}').decode()
+    for bad in (f"{header}.{forged}.{signature}", f"{header}.{payload}.", "a.b", "x.y.z"):
+        with pytest.raises(InvalidTokenError):
+            codec.decode(bad)
+
+
+def test_expired_and_not_yet_valid():
+    codec = TokenCodec(HmacKey("secret"))
+    with pytest.raises(InvalidTokenError, match="expired"):
+        codec.decode(codec.encode({"sub": "1", "exp": time.time() - 1}))
+    with pytest.raises(InvalidTokenError, match="not yet"):
+        codec.decode(codec.encode({"sub": "1", "nbf": time.time() + 60}))
+    with pytest.raises(InvalidTokenError, match="time claim"):
+        codec.decode(codec.encode({"sub": "1", "exp": "soon"}))
+
+
+def test_interoperates_with_jose():
+    codec = TokenCodec(HmacKey("secret"))
+    # Tokens issued before the codec (no kid) keep verifying
+    legacy = jwt.encode(_claims(), "secret", algorithm="HS256")
+    assert codec.decode(legacy)["sub"] == "1"
+    assert jwt.decode(codec.encode(_claims()), "secret", algorithms=["HS256"])["sub"] == "1"
+
+    private_pem, public_pem = _es256_pems()
+    es_codec = TokenCodec(load_pem_key(private_pem))
+    token = es_codec.encode(_claims())
+    assert jwt.decode(token, public_pem.decode(), algorithms=["ES256"])["sub"] == "1"
+
+
+def test_algorithm_is_bound_to_the_key():
+    private_pem, public_pem = _es256_pems()
+    codec = TokenCodec(load_pem_key(private_pem))
+    # HS256 "signed" with the public key must not pass as the ES256 key
+    kid = codec.signing_key.kid
+    header = b64url_encode(b'{"alg":"HS256","kid":"%s"}' % kid.encode())
+    signing_input = header + b"." + b64url_encode(b'{"sub":"1"}')
+    forged = b64url_encode(HmacKey(public_pem).sign(signing_input))
+    confused = (signing_input + b"." + forged).decode()
+    with pytest.raises(InvalidTokenError, match="Algorithm"):
+        codec.decode(confused)
+    unsigned = b64url_encode(b'{"alg":"none","kid":"%s"}' % kid.encode()).decode()
+    with pytest.raises(InvalidTokenError):
+        codec.decode(f"{unsigned}.{b64url_encode(b'{}').decode()}.")
+
+
+def test_rotation_by_kid_and_jwks():
+    old, new = _ed25519(), _ed25519()
+    old_codec = TokenCodec(old)
+    old_token = old_codec.encode(_claims())
+
+    # Next key published first, then promoted; the old one still verifies until dropped
+    rotated = TokenCodec(new, verify_keys=[old])
+    assert rotated.decode(old_token)["sub"] == "1"
+    with pytest.raises(InvalidTokenError, match="Unknown key"):
+        old_codec.decode(rotated.encode(_claims()))
+    with pytest.raises(InvalidTokenError, match="Unknown key"):
+        TokenCodec(new).decode(old_token)
+
+    keys = rotated.jwks()["keys"]
+    assert {key["kid"] for key in keys} == {old.kid, new.kid}
+    assert all(key["kty"] == "OKP" and key["alg"] == "EdDSA" for key in keys)
+    assert TokenCodec(HmacKey("secret")).jwks() == {"keys": []}
+    with pytest.raises(ValueError):
+        TokenCodec(load_pem_key(_es256_pems()[1]))
+
+
+async def test_jwks_endpoint():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        res = await client.get("/.well-known/jwks.json")
+    assert res.status_code == 200
+    assert res.json() == {"keys": []}
+    assert res.headers["Cache-Control"] == "public, max-age=300"
@@ -0,0 +1,141 @@
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from httpx import AsyncClient
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.job import Job
+from app.models.token import RefreshToken, TokenRevocation
+from app.services.jobs import JobRunner, job_runner
+from app.services.tokens import (
+    PURGE_REFRESH_TOKENS_JOB,
+    RevocationList,
+    revocations,
+    schedule_refresh_token_purge,
+)
+
+
+def _bearer(tokens: dict[str, Any]) -> dict[str, str]:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+async def test_refresh_rotates_and_detects_reuse(
+    client: AsyncClient,
+    db: AsyncSession,
+    login: Callable[..., Awaitable[dict[str, Any]]],
+):
+    tokens = await login()
+    assert tokens["expires_in"] == 15 * 60
+
+    res = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert res.status_code == 200
+    rotated = res.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    assert (await client.get("/auth/me", headers=_bearer(rotated))).status_code == 200
+
+    # Replaying the spent token fails and revokes the successor issued from it
+    res = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert res.status_code == 401
+    res = await client.post("/auth/refresh", json={"refresh_token": rotated["refresh_token"]})
+    assert res.status_code == 401
+    families = set(await db.scalars(select(RefreshToken.family)))
+    assert len(families) == 1
+    assert None not in set(await db.scalars(select(RefreshToken.used_at)))
+
+
+async def test_unknown_and_expired_refresh_tokens_rejected(
+    client: AsyncClient,
+    db: AsyncSession,
+    login: Callable[..., Awaitable[dict[str, Any]]],
+):
+    res = await client.post("/auth/refresh", json={"refresh_token": "nope"})
+    assert res.status_code == 401
+
+    tokens = await login()
+    token = (await db.scalars(select(RefreshToken))).one()
+    token.expires_at = datetime.now(tz=UTC) - timedelta(seconds=1)
+    await db.commit()
+    res = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert res.status_code == 401
+
+
+async def test_expired_refresh_tokens_are_purged_by_a_recurring_job(
+    db: AsyncSession,
+    session_factory: async_sessionmaker[AsyncSession],
+    login: Callable[..., Awaitable[dict[str, Any]]],
+):
+    for _ in range(3):
+        await login()
+    spent, expired, live = (await db.scalars(select(RefreshToken))).all()
+    now = datetime.now(tz=UTC)
+    spent.used_at = now
+    expired.expires_at = now - timedelta(seconds=1)
+    await db.commit()
+    kept = {spent.token_hash, live.token_hash}
+
+    await schedule_refresh_token_purge(db)
+    await schedule_refresh_token_purge(db)
+    await db.commit()
+    assert len((await db.scalars(select(Job))).all()) == 1
+
+    runner = JobRunner(session_factory)
+    runner.handlers = job_runner.handlers
+    assert await runner.run_once()
+    db.expire_all()
+    # Spent but unexpired tokens stay for reuse detection
+    remaining = set(await db.scalars(select(RefreshToken.token_hash)))
+    assert remaining == kept
+    jobs = (await db.scalars(select(Job).order_by(Job.id))).all()
+    assert [(job.kind, job.status) for job in jobs] == [
+        (PURGE_REFRESH_TOKENS_JOB, "succeeded"),
+        (PURGE_REFRESH_TOKENS_JOB, "queued"),
+    ]
+    assert jobs[1].run_at.replace(tzinfo=UTC) > now + timedelta(minutes=59)
+
+
+async def test_deleting_user_revokes_access_and_refresh_tokens(
+    client: AsyncClient,
+    db: AsyncSession,
+    login: Callable[..., Awaitable[dict[str, Any]]],
+):
+    tokens = await login()
+    me = (await client.get("/auth/me", headers=_bearer(tokens))).json()
+    rejected = revocations.rejected
+
+    assert (await client.delete(f"/users/{me['id']}")).status_code == 200
+    # Cached principal dropped and the token now fails the in-memory revocation check
+    assert (await client.get("/auth/me", headers=_bearer(tokens))).status_code == 401
+    assert revocations.rejected == rejected + 1
+    res = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert res.status_code == 401
+    revocation = await db.get(TokenRevocation, me["id"])
+    assert revocation is not None
+
+
+async def test_revocation_list_syncs_within_horizon(
+    session_factory: async_sessionmaker[AsyncSession],
+):
+    now = datetime.now(tz=UTC)
+    async with session_factory() as session:
+        await session.execute(
+            insert(TokenRevocation),
+            [
+                {"user_id": 1, "revoked_at": now},
+                {"user_id": 2, "revoked_at": now - timedelta(hours=1)},
+            ],
+        )
+        await session.commit()
+
+    revoked = RevocationList(session_factory, horizon=15 * 60)
+    await revoked.sync()
+    issued_before = (now - timedelta(seconds=1)).timestamp()
+    issued_after = (now + timedelta(seconds=1)).timestamp()
+    assert revoked.is_revoked(1, issued_before)
+    assert revoked.is_revoked(1, None)
+    assert not revoked.is_revoked(1, issued_after)
+    # Older than any live access token, so not loaded
+    assert not revoked.is_revoked(2, issued_before)
+    stats = revoked.stats()
+    assert stats["revoked_users"] == 1 and stats["rejected"] == 2 and stats["syncs"] == 1
@@ -0,0 +1,236 @@
+import asyncio
+import fcntl
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.cache_backends import (
+    MemoryBackend,
+    RedisBackend,
+    SharedMemoryBackend,
+    _read_reply,
+    create_backend,
+)
+from app.schemas.user import User
+from app.services.user_cache import UserCache, user_cache
+
+
+class FakeRedis:
+    """In-memory server speaking enough RESP for RedisBackend (GET, SET PX, DEL, SELECT)"""
+
+    def __init__(self) -> None:
+        self.data: dict[bytes, tuple[bytes, float]] = {}
+        self.commands: list[bytes] = []
+        self.server: asyncio.Server | None = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port: int = self.server.sockets[0].getsockname()[1]
+        return port
+
+    async def stop(self) -> None:
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                command = await _read_reply(reader)
+                assert isinstance(command, list)
+                name, *args = command
+                assert isinstance(name, bytes)
+                self.commands.append(name)
+                if name == b"GET":
+                    value, expires_at = self.data.get(args[0], (b"", 0.0))
+                    if expires_at > loop.time():
+                        writer.write(b"$%d\r\n%s\r\n" % (len(value), value))
+                    else:
+                        writer.write(b"$-1\r\n")
+                elif name == b"SET":
+                    self.data[args[0]] = (args[1], loop.time() + int(args[3]) / 1000)
+                    writer.write(b"+OK\r\n")
+                elif name == b"DEL":
+                    removed = sum(self.data.pop(key, None) is not None for key in args)
+                    writer.write(b":%d\r\n" % removed)
+                elif name == b"SELECT":
+                    writer.write(b"+OK\r\n")
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+
+
+@pytest.fixture
+async def fake_redis() -> AsyncGenerator[FakeRedis, None]:
+    server = FakeRedis()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+def _user(user_id: int = 1, email: str = "a@example.com") -> User:
+    return User(id=user_id, email=email, full_name="A", version=1)
+
+
+class CountingLoader:
+    def __init__(self, user: User | None, delay: float = 0.0) -> None:
+        self.user = user
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self) -> User | None:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.user
+
+
+async def test_cache_aside_hits_after_first_load():
+    cache = UserCache(MemoryBackend())
+    load = CountingLoader(_user())
+
+    assert await cache.get_by_id(1, load) == _user()
+    assert await cache.get_by_id(1, load) == _user()
+    assert load.calls == 1
+
+    await cache.invalidate(user_ids=[1])
+    await cache.get_by_id(1, load)
+    assert load.calls == 2
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = UserCache(MemoryBackend())
+    load = CountingLoader(_user(), delay=0.01)
+
+    users = await asyncio.gather(*(cache.get_by_id(1, load) for _ in range(20)))
+    assert users == [_user()] * 20
+    assert load.calls == 1
+    assert cache.stats()["coalesced"] == 19
+
+
+async def test_missing_users_are_cached_negatively():
+    clock = [0.0]
+    cache = UserCache(MemoryBackend(clock=lambda: clock[0]), negative_ttl=5.0)
+    load = CountingLoader(None)
+
+    assert await cache.get_by_id(404, load) is None
+    assert await cache.get_by_id(404, load) is None
+    assert load.calls == 1
+
+    clock[0] = 6.0
+    await cache.get_by_id(404, load)
+    assert load.calls == 2
+
+
+async def test_email_index_ignores_a_renamed_user():
+    cache = UserCache(MemoryBackend())
+    await cache.get_by_email("a@example.com", CountingLoader(_user()), lambda _: None)
+    # The user changes email; only the id entry is invalidated
+    await cache.invalidate(user_ids=[1], emails=["b@example.com"])
+
+    renamed = CountingLoader(_user(email="b@example.com"))
+    by_email = CountingLoader(None)
+    assert await cache.get_by_email("a@example.com", by_email, lambda _: renamed()) is None
+    assert renamed.calls == 1
+    assert by_email.calls == 1
+
+
+async def test_backend_errors_fall_back_to_the_loader():
+    # Nothing listens on port 1, so every backend call fails
+    backend = RedisBackend(port=1, timeout=0.2)
+    cache = UserCache(backend)
+    load = CountingLoader(_user())
+
+    assert await cache.get_by_id(1, load) == _user()
+    assert cache.stats()["errors"] >= 1
+    await backend.close()
+
+
+async def test_shared_memory_backend_is_shared_between_mappings(tmp_path: Path):
+    path = str(tmp_path / "cache")
+    clock = [100.0]
+    first = SharedMemoryBackend(path, slots=64, slot_size=128, clock=lambda: clock[0])
+    second = SharedMemoryBackend(path, slots=64, slot_size=128, clock=lambda: clock[0])
+
+    await first.set("user:id:1", b"payload", ttl=10)
+    assert await second.get("user:id:1") == b"payload"
+    await second.delete("user:id:1")
+    assert await first.get("user:id:1") is None
+
+    await first.set("user:id:2", b"x" * 200, ttl=10)
+    assert await first.get("user:id:2") is None
+    assert first.stats()["oversized"] == 1
+
+    await first.set("user:id:3", b"", ttl=10)
+    assert await second.get("user:id:3") == b""
+    clock[0] = 111.0
+    assert await second.get("user:id:3") is None
+
+    await first.close()
+    await second.close()
+
+
+async def test_shared_memory_lock_contention_does_not_block_the_loop(tmp_path: Path):
+    path = tmp_path / "cache"
+    backend = SharedMemoryBackend(str(path), slots=64, slot_size=128)
+    await backend.set("user:id:1", b"payload", ttl=10)
+
+    # Another worker holding the lock: a separate open file description
+    with path.open("rb") as other:
+        fcntl.flock(other.fileno(), fcntl.LOCK_EX)
+        pending = asyncio.create_task(backend.get("user:id:1"))
+        await asyncio.sleep(0.02)
+        assert not pending.done() and backend.stats()["lock_waits"] >= 1
+        fcntl.flock(other.fileno(), fcntl.LOCK_UN)
+        assert await asyncio.wait_for(pending, 1) == b"payload"
+    await backend.close()
+
+
+async def test_redis_backend_against_fake_server(fake_redis: FakeRedis):
+    assert fake_redis.server is not None
+    port = fake_redis.server.sockets[0].getsockname()[1]
+    backend = create_backend(f"redis://127.0.0.1:{port}/2")
+    assert isinstance(backend, RedisBackend)
+
+    await backend.set("k1", b"v1", ttl=10)
+    results = await asyncio.gather(*(backend.get(key) for key in ("k1", "k2", "k1")))
+    assert results == [b"v1", None, b"v1"]
+    await backend.delete("k1", "k2")
+    assert await backend.get("k1") is None
+    assert fake_redis.commands[0] == b"SELECT"
+    await backend.close()
+
+
+def test_create_backend_parses_urls(tmp_path: Path):
+    assert create_backend("") is None
+    memory = create_backend("memory://?size=5")
+    assert isinstance(memory, MemoryBackend)
+    assert memory.stats()["max_size"] == 5
+    shm = create_backend(f"shm://{tmp_path}/cache?slots=8&slot_size=64")
+    assert isinstance(shm, SharedMemoryBackend)
+    assert (shm.slots, shm.slot_size) == (8, 64)
+    with pytest.raises(ValueError):
+        create_backend("memcached://localhost")
+
+
+async def test_service_invalidates_on_write(client: AsyncClient):
+    assert (await client.get("/users/1")).status_code == 404
+    res = await client.post("/users", json={"email": "c@example.com", "password": "pw"})
+    assert res.status_code == 201
+    user_id = res.json()["id"]
+
+    # The cached 404 was dropped by the insert
+    assert (await client.get(f"/users/{user_id}")).status_code == 200
+    await client.patch(f"/users/{user_id}", json={"email": "d@example.com"})
+    assert (await client.get(f"/users/{user_id}")).json()["email"] == "d@example.com"
+    assert (await client.get("/users/email/c@example.com")).status_code == 404
+
+    await client.delete(f"/users/{user_id}")
+    assert (await client.get(f"/users/{user_id}")).status_code == 404
+    hits = user_cache.stats()["hits"]
+    assert (await client.get(f"/users/{user_id}")).status_code == 404
+    assert user_cache.stats()["hits"] == hits + 1
@@ -0,0 +1,78 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User as UserModel
+from app.services.user_loader import UserLoader
+from app.services.user_service import UserService
+
+
+async def _seed(db: AsyncSession) -> list[int]:
+    users = [
+        UserModel(email=f"load{i}@example.com", full_name=f"Load {i}", password_hash="x")
+        for i in range(3)
+    ]
+    db.add_all(users)
+    await db.commit()
+    return [user.id for user in users]
+
+
+async def test_concurrent_loads_share_one_query(db: AsyncSession, count_statements: list[str]):
+    ids = await _seed(db)
+    loader = UserLoader(UserService(db))
+    count_statements.clear()
+
+    by_id, by_email, repeated, missing = await asyncio.gather(
+        loader.load_many(ids),
+        loader.load_by_email("load2@example.com"),
+        loader.load(ids[0]),
+        loader.load(999),
+    )
+
+    assert [user.id for user in by_id if user] == ids
+    assert by_email is not None and by_email.id == ids[2]
+    assert repeated == by_id[0]
+    assert missing is None
+    assert len(count_statements) == 1
+    assert loader.batches == 1
+
+    # Memoized for the rest of the request
+    assert await loader.load(ids[1]) == by_id[1]
+    assert len(count_statements) == 1
+
+
+async def test_cached_ids_skip_the_database(db: AsyncSession, count_statements: list[str]):
+    ids = await _seed(db)
+    await UserLoader(UserService(db)).load_many([*ids, 999])
+    count_statements.clear()
+
+    users = await UserLoader(UserService(db)).load_many([*ids, 999])
+    assert [user.id for user in users if user] == ids
+    assert count_statements == []
+
+
+async def test_cached_emails_skip_the_database(db: AsyncSession, count_statements: list[str]):
+    ids = await _seed(db)
+    emails = ["load0@example.com", "nobody@example.com"]
+    first = UserLoader(UserService(db))
+    await asyncio.gather(*(first.load_by_email(email) for email in emails))
+    count_statements.clear()
+
+    second = UserLoader(UserService(db))
+    found, missing = await asyncio.gather(*(second.load_by_email(email) for email in emails))
+    assert found is not None and found.id == ids[0]
+    assert missing is None
+    assert count_statements == []
+
+
+async def test_failures_propagate_to_every_caller(db: AsyncSession, monkeypatch):
+    loader = UserLoader(UserService(db))
+
+    async def broken(*args: object, **kwargs: object) -> None:
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(loader.service, "find_many", broken)
+    results = await asyncio.gather(
+        loader.load(1), loader.load_by_email("x@example.com"), return_exceptions=True
+    )
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,57 @@
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+
+
+async def _seed(db: AsyncSession) -> None:
+    db.add_all(
+        [
+            User(email="a@example.com", full_name="A", password_hash="x"),
+            User(email="b@example.com", full_name="B", password_hash="x"),
+        ]
+    )
+    await db.commit()
+
+
+async def test_update_is_one_statement_and_bumps_version(
+    client: AsyncClient, db: AsyncSession, count_statements: list[str]
+):
+    await _seed(db)
+
+    count_statements.clear()
+    res = await client.put("/users/1", json={"full_name": "Alice"})
+    body = res.json()
+    assert body.pop("updated_at") is not None
+    assert body == {"id": 1, "email": "a@example.com", "full_name": "Alice", "version": 2}
+    assert len(count_statements) == 1 and count_statements[0].startswith("UPDATE")
+    assert "updated_at=" in count_statements[0]
+
+
+async def test_stale_version_is_rejected(client: AsyncClient, db: AsyncSession):
+    await _seed(db)
+
+    assert (
+        await client.patch("/users/1", json={"full_name": "X", "version": 1})
+    ).status_code == 200
+    res = await client.patch("/users/1", json={"full_name": "Y", "version": 1})
+    assert res.status_code == 409
+    assert (await client.delete("/users/1", params={"version": 1})).status_code == 409
+    assert (await client.delete("/users/1", params={"version": 2})).status_code == 200
+
+
+async def test_patch_only_writes_fields_sent(client: AsyncClient, db: AsyncSession):
+    await _seed(db)
+
+    res = await client.patch("/users/1", json={"full_name": None})
+    assert res.json()["full_name"] is None
+    assert res.json()["email"] == "a@example.com"
+
+
+async def test_missing_user_and_duplicate_email(client: AsyncClient, db: AsyncSession):
+    await _seed(db)
+
+    assert (await client.put("/users/99", json={"full_name": "X"})).status_code == 404
+    assert (await client.delete("/users/99")).status_code == 404
+    res = await client.put("/users/1", json={"email": "b@example.com"})
+    assert res.status_code == 409